@@ -4,10 +4,19 @@ import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_registry import (
+    EVENT_ENTITY_REGISTRY_UPDATED,
+)
 
 from .coordinator import SaurCoordinator
-from .helpers.const import DOMAIN, PLATFORMS
+from .helpers.const import (
+    DATA_DB_MANAGER,
+    DOMAIN,
+    ENTRY_SHARED_DATABASE,
+    PLATFORMS,
+)
 from .helpers.saur_db import SaurDatabaseHelper
+from .helpers.saur_manager import SaurDatabaseManager
 from .recorder import SaurRecorder
 
 _LOGGER = logging.getLogger(__name__)
@@ -17,7 +26,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up the component."""
     hass.data.setdefault(DOMAIN, {})
 
-    db_helper = SaurDatabaseHelper(hass, entry.entry_id)
+    db_helper = await _async_acquire_database(hass, entry)
     recorder = SaurRecorder(hass)
     coordinator = SaurCoordinator(hass, entry, db_helper, recorder)
 
@@ -27,7 +36,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "unique_id": entry.entry_id,
     }
 
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        await _async_release_database(hass, entry.entry_id, db_helper)
+        raise
 
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(
@@ -42,9 +55,44 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
     )
 
+    # Oublie les curseurs du journal des statistiques supprimées
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            EVENT_ENTITY_REGISTRY_UPDATED,
+            coordinator.async_entity_registry_updated,
+        )
+    )
+
     return True
 
 
+async def _async_acquire_database(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> SaurDatabaseHelper:
+    """Ouvre la base d'une entrée, partagée sauf si l'option est désactivée."""
+    if entry.options.get(ENTRY_SHARED_DATABASE, True):
+        # Une seule base, un seul thread d'écriture pour toutes les entrées
+        manager: SaurDatabaseManager = hass.data[DOMAIN].setdefault(
+            DATA_DB_MANAGER, SaurDatabaseManager(hass)
+        )
+        return await manager.async_acquire(entry.entry_id)
+    db_helper = SaurDatabaseHelper(hass, entry.entry_id)
+    await db_helper.async_check_integrity()
+    return db_helper
+
+
+async def _async_release_database(
+    hass: HomeAssistant, entry_id: str, db_helper: SaurDatabaseHelper
+) -> None:
+    """Libère la base d'une entrée, partagée ou propre à l'entrée."""
+    manager: SaurDatabaseManager | None = hass.data[DOMAIN].get(DATA_DB_MANAGER)
+    # L'option a pu changer depuis l'ouverture : seul le gestionnaire sait
+    if manager is not None and entry_id in manager.entries:
+        await manager.async_release(entry_id)
+    else:
+        await db_helper.async_close()
+
+
 async def _async_entry_refresher(hass: HomeAssistant, entry_id: str) -> None:
     """Refresh a config entry."""
     await hass.config_entries.async_reload(entry_id)
@@ -67,7 +115,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
     await coordinator.async_shutdown()
 
-    # 3. Supprimer l'entrée du stockage hass.data
+    # 3. Libérer la base (la base partagée après la dernière entrée)
+    await _async_release_database(hass, entry.entry_id, coordinator.db_helper)
+
+    # 4. Supprimer l'entrée du stockage hass.data
     hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
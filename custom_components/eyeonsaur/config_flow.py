@@ -26,6 +26,7 @@ from .helpers.const import (
     ENTRY_COMPTEURID,
     ENTRY_LOGIN,
     ENTRY_PASS,
+    ENTRY_SHARED_DATABASE,
     ENTRY_TOKEN,
     ENTRY_UNDERSTAND,
 )
@@ -53,6 +54,7 @@ STEP_OPTIONS_DATA_SCHEMA = vol.Schema(
     {
         vol.Required("water_m3_price"): float,
         vol.Required("hours_between_reading"): int,
+        vol.Optional(ENTRY_SHARED_DATABASE, default=True): bool,
     }
 )
 
@@ -8,11 +8,14 @@ from datetime import datetime, timedelta
 
 from aiohttp import ClientResponseError
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
-from homeassistant.helpers.entity_registry import async_get
+from homeassistant.helpers.entity_registry import (
+    EventEntityRegistryUpdatedData,
+    async_get,
+)
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
 )
@@ -38,20 +41,20 @@ from .helpers.const import (
     ENTRY_TOKEN,
     POLLING_INTERVAL,
 )
-from .helpers.dateutils import find_missing_dates, sync_reduce_missing_dates
-from .helpers.saur_db import SaurDatabaseHelper
+from .helpers.dateutils import from_epoch_day
+from .helpers.intervals import DayIntervals
+from .helpers.saur_coverage import CoverageFlag
+from .helpers.saur_db import SaurDatabaseError, SaurDatabaseHelper
 from .models import (
     ConsumptionData,
     ConsumptionDatas,
     Contract,
     Contracts,
     ContratId,
-    MissingDates,
     RelevePhysique,
     SaurData,
     SectionId,
     StrDate,
-    TheoreticalConsumptionDatas,
 )
 from .recorder import SaurRecorder
 
@@ -98,9 +101,11 @@ class SaurCoordinator(DataUpdateCoordinator[SaurData]):
         )
         self._last_update_time: datetime = datetime.min
 
-        # Ajout de la blacklist
-        self.blacklisted_months: set[tuple[int, int]] = set()
         self._background_tasks: list[Task[None]] = []
+        # Consommateurs du journal utilisés pour injecter les statistiques
+        self._recorder_consumers: set[str] = set()
+        # Mois déjà relus depuis l'API pendant le cycle en cours
+        self._fetched_months: set[tuple[SectionId, int, int]] = set()
 
     async def async_shutdown(self) -> None:
         """
@@ -110,12 +115,14 @@ class SaurCoordinator(DataUpdateCoordinator[SaurData]):
             task.cancel()
         if self.client:
             await self.client.close_session()
+        # La base est fermée au déchargement de l'entrée
+        await self.db_helper.async_flush()
 
     async def async_config_entry_first_refresh(self) -> None:
         """Handle the first refresh."""
 
         _LOGGER.debug("🔥🔥 async_config_entry_first_refresh 🔥🔥")
-        await self.db_helper.async_init_db()
+        # La base a été ouverte et vérifiée par async_setup_entry
 
         response_contrats: SaurResponseContracts = (
             await self.client.get_contracts()
@@ -197,6 +204,15 @@ class SaurCoordinator(DataUpdateCoordinator[SaurData]):
                 )
             )
             self._background_tasks.append(task)
+
+            # Mois perdus signalés par le contrôle d'intégrité
+            if months := self.db_helper.take_rebuild_months(
+                compteur.sectionId
+            ):
+                task = self.hass.async_create_task(
+                    self._async_rebuild_months(months, compteur)
+                )
+                self._background_tasks.append(task)
         # await asyncio.gather(*self._background_tasks)
         await super().async_config_entry_first_refresh()
 
@@ -228,6 +244,19 @@ class SaurCoordinator(DataUpdateCoordinator[SaurData]):
             )
             self._background_tasks.append(task)
         await asyncio.gather(*self._background_tasks)
+        self._fetched_months.clear()
+
+        # Sauvegarde quotidienne de l'historique, sans bloquer la base
+        try:
+            await self.db_helper.async_backup_if_due()
+        except (SaurDatabaseError, OSError) as err:
+            _LOGGER.warning("Sauvegarde de la base impossible : %s", err)
+
+        # Archivage des années closes et VACUUM, si la base est inactive
+        try:
+            await self.db_helper.async_maintenance_if_due()
+        except SaurDatabaseError as err:
+            _LOGGER.warning("Maintenance de la base impossible : %s", err)
 
         return self._cached_data
 
@@ -259,13 +288,14 @@ class SaurCoordinator(DataUpdateCoordinator[SaurData]):
                     ]
                 )
 
-                # Écrire les données dans la base de données
-                await self.db_helper.async_write_consumptions(
+                # Mise en attente : les jours recouvrant le rattrapage
+                # mensuel sont écrits une seule fois
+                await self.db_helper.async_buffer_consumptions(
                     consumptiondatas, SectionId(compteur.sectionId)
                 )
                 _LOGGER.debug(
-                    "🔥🔥 Données hebdomadaires stockées dans la base"
-                    "de données pour %s 🔥🔥",
+                    "🔥🔥 Données hebdomadaires mises en attente d'écriture"
+                    " pour %s 🔥🔥",
                     compteur.sectionId,
                 )
             else:
@@ -324,8 +354,10 @@ class SaurCoordinator(DataUpdateCoordinator[SaurData]):
                 await self.client.get_monthly_data(year, month, section_id)
             )
         except ClientResponseError:
-            # Ajoute à la blacklist en cas d'erreur
-            self.blacklisted_months.add((year, month))
+            # Ajoute à la blacklist en cas d'erreur, conservée en base
+            await self.db_helper.async_set_month_flags(
+                section_id, year, month, CoverageFlag.BLACKLISTED
+            )
             _LOGGER.warning(
                 f"""Mois blacklisted ({year}, {month})
                 car non disponible"""
@@ -343,9 +375,21 @@ class SaurCoordinator(DataUpdateCoordinator[SaurData]):
                 for item in monthly_data["consumptions"]
             ]
         )
-        await self.db_helper.async_write_consumptions(
+        result = await self.db_helper.async_write_consumptions(
             consumptiondatas, section_id
         )
+        _LOGGER.debug(
+            "Mois %s/%s stocké pour %s : %s", month, year, section_id, result
+        )
+        # Un mois estimé reste à relire jusqu'aux relevés définitifs
+        if monthly_data.get("isEstimateConsumption"):
+            await self.db_helper.async_set_month_flags(
+                section_id, year, month, CoverageFlag.ESTIMATED
+            )
+        else:
+            await self.db_helper.async_clear_month_flags(
+                section_id, year, month, CoverageFlag.ESTIMATED
+            )
 
     # async def _async_fetch_monthly_data(
     #     self, year: int, month: int, compteur: Compteur
@@ -362,38 +406,71 @@ class SaurCoordinator(DataUpdateCoordinator[SaurData]):
             month,
             compteur.sectionId,
         )
-        await self._async_apifetch_and_sqlstore_monthly_data(
-            year, month, compteur.sectionId
-        )
-        _LOGGER.debug(
-            "🔥🔥 async_get_all_consumptions_with_absolute  %s 🔥🔥",
-            compteur.sectionId,
-        )
-        # Get all consumptions from SQLITE
-        all_consumptions: TheoreticalConsumptionDatas = (
-            await self.db_helper.async_get_all_consumptions_with_absolute(
-                compteur.sectionId
+        if await self.db_helper.async_is_month_complete(
+            compteur.sectionId, year, month
+        ):
+            # Tous les jours du mois sont déjà en base
+            _LOGGER.debug(
+                "Mois %s/%s déjà complet pour %s",
+                month,
+                year,
+                compteur.sectionId,
             )
-        )
-        _LOGGER.debug(
-            "🔥🔥 TheoreticalConsumptionDatas  %s 🔥🔥",
-            all_consumptions,
-        )
-        # Recalculate all historical data
-        await self._async_inject_historical_data(all_consumptions, compteur)
+        elif (compteur.sectionId, year, month) in self._fetched_months:
+            # Déjà relu pendant ce cycle (reconstruction ou jours
+            # manquants) : relancer la recherche des trous bouclerait
+            _LOGGER.debug(
+                "Mois %s/%s déjà relu pendant ce cycle pour %s",
+                month,
+                year,
+                compteur.sectionId,
+            )
+            return
+        else:
+            self._fetched_months.add((compteur.sectionId, year, month))
+            await self._async_apifetch_and_sqlstore_monthly_data(
+                year, month, compteur.sectionId
+            )
+        # Injecte les jours modifiés depuis le dernier import, quelle que
+        # soit l'écriture qui les a modifiés
+        await self._async_inject_historical_data(compteur)
 
         # Détecte et traite les jours manquants
-        await self._async_handle_missing_dates(all_consumptions, compteur)
+        await self._async_handle_missing_dates(compteur)
 
-    async def _async_inject_historical_data(
-        self,
-        all_consumptions: TheoreticalConsumptionDatas,
-        compteur: Compteur,
+    async def _async_rebuild_months(
+        self, months: list[tuple[int, int]], compteur: Compteur
     ) -> None:
-        """Injecte les données historiques dans le recorder."""
-        if not all_consumptions:
-            return
+        """Relit depuis l'API des mois perdus par la base, un par un.
 
+        Les mois déjà relus pendant le cycle, par exemple par la
+        recherche des jours manquants, ne sont pas redemandés.
+        """
+        months = [
+            (year, month)
+            for year, month in months
+            if (compteur.sectionId, year, month) not in self._fetched_months
+        ]
+        if not months:
+            return
+        _LOGGER.warning(
+            "Reconstruction de %s mois pour %s",
+            len(months),
+            compteur.sectionId,
+        )
+        for year, month in months:
+            await self._async_fetch_monthly_data(year, month, compteur)
+
+    async def _async_inject_historical_data(self, compteur: Compteur) -> None:
+        """Injecte dans le recorder les index modifiés depuis le dernier import.
+
+        Le curseur du consommateur "recorder:<statistic_id>" dans le
+        journal des modifications sert de filigrane : seuls les jours
+        dont l'index a changé depuis le dernier import, du premier au
+        dernier jour modifié, sont relus et injectés. Un nouveau jour en
+        fin d'historique ne coûte qu'une ligne ; une statistique sans
+        curseur reçoit tout l'historique.
+        """
         # Accéder à l'enregistrement des entités
         entity_registry = async_get(self.hass)
 
@@ -415,41 +492,74 @@ class SaurCoordinator(DataUpdateCoordinator[SaurData]):
             )
             return
 
-        # default_section_id = f"{compteur.sectionId}"
-        # entity_entry = f"{compteur.serial_number}"
-        for a_consumption in all_consumptions:
-            date_formatted = datetime.fromisoformat(a_consumption.date)
+        consumer = f"recorder:{entity_entry}"
+        self._recorder_consumers.add(consumer)
+        changes = await self.db_helper.async_get_changes(consumer)
+        days = changes.ranges.get(compteur.sectionId)
+        if days is not None:
+            first_day, last_day = days
+            rows = self.db_helper.async_iter_consumptions(
+                compteur.sectionId,
+                start=None if first_day is None else from_epoch_day(first_day),
+                end=None if last_day is None else from_epoch_day(last_day),
+            )
+            series = [
+                (datetime.fromisoformat(a_consumption.date), index_value)
+                async for a_consumption in rows
+                if (index_value := a_consumption.indexValue) is not None
+            ]
+            injected = await self.recorder.async_inject_statistics(
+                entity_entry, series
+            )
             _LOGGER.debug(
-                "🔥🔥 all_consumptions compteur.sectionId: %s %s %s 🔥🔥",
+                "🔥🔥 %s statistiques injectées pour %s (jours %s) 🔥🔥",
+                injected,
                 compteur.sectionId,
-                date_formatted,
-                a_consumption.indexValue,
+                days,
             )
-            await self.recorder.async_inject_historical_data(
-                entity_entry,
-                date_formatted,
-                a_consumption.indexValue,
+        await self.db_helper.async_ack_changes(consumer, changes.seq)
+
+    @callback
+    def async_entity_registry_updated(
+        self, event: Event[EventEntityRegistryUpdatedData]
+    ) -> None:
+        """Oublie le curseur d'une statistique supprimée ou renommée.
+
+        Sans cela, le curseur de l'ancien nom n'avancerait plus et
+        bloquerait la purge du journal des modifications.
+        """
+        data = event.data
+        if data["action"] == "remove":
+            entity_id = data["entity_id"]
+        elif data["action"] == "update" and "old_entity_id" in data:
+            entity_id = data["old_entity_id"]
+        else:
+            return
+        consumer = f"recorder:{entity_id}"
+        if consumer not in self._recorder_consumers:
+            return
+        self._recorder_consumers.discard(consumer)
+        self._background_tasks.append(
+            self.hass.async_create_task(
+                self.db_helper.async_reset_cursor(consumer)
             )
+        )
 
     async def _async_handle_missing_dates(
         self,
-        all_consumptions: TheoreticalConsumptionDatas,
         compteur: Compteur,
     ) -> None:
         """Gère les dates manquantes."""
-        _LOGGER.debug("🔥🔥 missing_dates 1/3: %s 🔥🔥", all_consumptions)
-        missing_dates: MissingDates = find_missing_dates(all_consumptions)
-        _LOGGER.debug("🔥🔥 missing_dates 2/3: %s 🔥🔥", missing_dates)
-
-        reduced_missing_dates = sync_reduce_missing_dates(
-            missing_dates, self.blacklisted_months
-        )
-        _LOGGER.debug(
-            "🔥🔥 reduced_missing_dates 3/3: %s 🔥🔥", reduced_missing_dates
+        gaps = await self.db_helper.async_get_gaps(compteur.sectionId)
+        # La blacklist est lue en base : elle survit aux redémarrages
+        blacklisted = await self.db_helper.async_get_flagged_months(
+            compteur.sectionId, CoverageFlag.BLACKLISTED
         )
-        if reduced_missing_dates and len(reduced_missing_dates) > 0:
-            # y, m, d = reduced_missing_dates.pop()
-            missing_date = reduced_missing_dates.pop()
+        missing = gaps.subtract(DayIntervals.from_months(blacklisted))
+        _LOGGER.debug("🔥🔥 missing_dates: %s 🔥🔥", missing)
+        if missing.last_day is not None:
+            # Le mois manquant le plus récent est récupéré en premier
+            missing_date = from_epoch_day(missing.last_day)
             y, m = missing_date.year, missing_date.month
             delay = random.uniform(8, 35)
             _LOGGER.debug("Temporisation de %s secondes", delay)
@@ -30,6 +30,24 @@ DEV_POLLING_INTERVAL = timedelta(minutes=5)
 
 POLLING_INTERVAL = DEV_POLLING_INTERVAL if DEV else DEFAULT_POLLING_INTERVAL
 
+DB_SHARED_FILE: Final = "consommation_saur.db"  # Base commune aux entrées
+DATA_DB_MANAGER: Final = "db_manager"  # Clé du gestionnaire dans hass.data
+DB_STATEMENT_CACHE_SIZE: Final = 256  # Requêtes préparées par connexion
+DB_STORAGE_PROFILE: Final = "balanced"  # Voir helpers/saur_storage.py
+DB_WORKER_SLOW_JOB: Final = 1.0  # Seuil (s) de trace des tâches SQLite
+LITRES_PER_CUBIC_METER: Final = 1000  # Volumes stockés en litres entiers
+DB_CHUNK_SIZE: Final = 366  # Lignes lues par requête lors d'un parcours
+DB_CACHE_MAX_BYTES: Final = 4 * 1024 * 1024  # Budget du cache d'historique
+DB_WRITE_BUFFER_ROWS: Final = 512  # Jours en attente déclenchant un vidage
+DB_WRITE_BUFFER_DELAY: Final = 30.0  # Attente maximale (s) avant un vidage
+DB_BACKUP_DIR: Final = "eyeonsaur_backups"  # Sous-répertoire des sauvegardes
+DB_BACKUP_INTERVAL: Final = timedelta(days=1)  # Écart entre deux sauvegardes
+DB_BACKUP_KEEP: Final = 3  # Nombre de sauvegardes conservées
+DB_ARCHIVE_GRACE: Final = timedelta(days=90)  # Délai avant clôture d'une année
+DB_JOURNAL_MAX_ROWS: Final = 1000  # Retard maximal d'un curseur du journal
+DB_MAINTENANCE_INTERVAL: Final = timedelta(days=7)  # Écart entre deux VACUUM
+RECORDER_SUM_TOLERANCE: Final = 0.0005  # Écart (m³) d'une somme inchangée
+
 ENTRY_LOGIN: Final = CONF_EMAIL
 ENTRY_PASS: Final = CONF_PASSWORD
 ENTRY_UNDERSTAND: Final = CONF_DISCOVERY
@@ -40,6 +58,7 @@ ENTRY_MODEL: Final = ATTR_MODEL
 ENTRY_SERIAL_NUMBER: Final = ATTR_SERIAL_NUMBER
 ENTRY_CREATED_AT: Final = "created_at"
 ENTRY_ABSOLUTE_CONSUMPTION: Final = "absolute_consumption"
+ENTRY_SHARED_DATABASE: Final = "shared_database"  # Option : base partagée
 ENTRY_CLIENTID: Final = CONF_CLIENT_ID
 
 USERNAME: Final = "john@example.com"  # Adresse email du client
@@ -1,114 +1,49 @@
 """Date manipulator for the EyeOnSaur integration."""
 
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime
+from typing import Final
 
-from ..models import MissingDate, MissingDates, TheoreticalConsumptionDatas
+from ..models import StrDate
 
 _LOGGER = logging.getLogger(__name__)
 
+_EPOCH_ORDINAL: Final = date(1970, 1, 1).toordinal()
 
-def find_missing_dates(
-    consumption_datas: TheoreticalConsumptionDatas,
-) -> MissingDates:
-    """Identifie les dates manquantes.
 
-    Identifie les dates manquantes dans un tableau de données de
-    type [(date, valeur)].
-    Retourne les dates manquantes entre la première date existante et
-    la dernière date existante, en excluant les dates où des données existent.
+def to_epoch_day(value: date | str) -> int:
+    """Convertit une date en nombre de jours depuis le 1er janvier 1970.
 
     Args:
-        consumption_datas: Liste de tuples, où chaque tuple contient une date
-        au format "YYYY-MM-DD HH:MM:SS" et une valeur (float) associée.
+        value: Une date, un datetime ou une chaîne ISO
+               ("AAAA-MM-JJ", "AAAA-MM-JJ HH:MM:SS", "AAAA-MM-JJTHH:MM:SS").
+               Seule la partie date est prise en compte.
 
     Returns:
-        Une liste de tuples, où chaque tuple contient l'année, le mois et
-        le jour des dates manquantes, sous la forme (année, mois, jour).
+        Le jour epoch correspondant.
 
     """
-    if not consumption_datas:
-        response: MissingDates = MissingDates([])
-        return response
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal() - _EPOCH_ORDINAL
 
-    # Convertir les dates en objets datetime
-    dates = [
-        datetime.fromisoformat(consumption_data.date)
-        for consumption_data in consumption_datas
-    ]
 
-    # Trier les dates
-    dates.sort()
+def from_epoch_day(day: int) -> date:
+    """Convertit un jour epoch en date."""
+    return date.fromordinal(day + _EPOCH_ORDINAL)
 
-    # Créer un ensemble de toutes les dates manquantes
-    missing_dates: MissingDates = MissingDates([])
 
-    # La première date existante
-    current_date = dates[0]
+def epoch_day_to_strdate(day: int) -> StrDate:
+    """Convertit un jour epoch au format "AAAA-MM-JJ 00:00:00"."""
+    return StrDate(f"{from_epoch_day(day).isoformat()} 00:00:00")
 
-    # Parcourir les dates et trouver celles manquantes
-    for i in range(1, len(dates)):
-        next_date = dates[i]
 
-        # Ajouter les dates manquantes entre current_date et next_date
-        while current_date + timedelta(days=1) < next_date:
-            current_date += timedelta(days=1)
-            missing_date = MissingDate(
-                current_date.year, current_date.month, current_date.day
-            )
-            missing_dates.append(missing_date)
-
-        # Passer à la prochaine date
-        current_date = next_date
-
-    return missing_dates
-
-
-def sync_reduce_missing_dates(
-    unreduced_dates: MissingDates, blacklisted_months: set[tuple[int, int]]
-) -> MissingDates:
-    """Optimise les dates manquantes.
-
-    Optmise les dates manquantes en ne gardant que celles qui sont
-    séparées par plus de 6 jours par rapport à la précédente date ajoutée.
-
-    Args:
-        unreduced_dates: Liste de tuples contenant les dates manquantes sous
-        forme (année, mois, jour).
-
-    Returns:
-        Une liste optimisée de dates manquantes.
-
-    """
-    if not unreduced_dates:
-        return MissingDates([])
-
-    optimized_dates: MissingDates = MissingDates([])
-    last_added_date: datetime | None = None
-
-    # Trier les dates avant de commencer
-    sorted_dates = sorted(
-        unreduced_dates,
-        key=lambda missing_date: datetime(
-            missing_date.year, missing_date.month, missing_date.day
-        ),
+def month_bounds(year: int, month: int) -> tuple[int, int]:
+    """Premier et dernier jour epoch d'un mois."""
+    first = date(year, month, 1)
+    following = (
+        date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
     )
-
-    for date in sorted_dates:
-        # Vérifier si le mois est blacklisté
-        if (date.year, date.month) in blacklisted_months:
-            continue  # Passe à la date suivante si le mois est blacklisté
-
-        # Convertir la date (année, mois, jour) en un objet datetime
-        current_date = datetime(date.year, date.month, date.day)
-
-        if last_added_date is None:
-            # Ajouter la première date sans vérification
-            optimized_dates.append(date)
-            last_added_date = current_date
-        # Vérifier si l'écart est supérieur à 6 jours
-        elif current_date > last_added_date + timedelta(days=6):
-            optimized_dates.append(date)
-            last_added_date = current_date
-
-    return optimized_dates
+    return to_epoch_day(first), to_epoch_day(following) - 1
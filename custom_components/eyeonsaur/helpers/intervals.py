@@ -0,0 +1,124 @@
+"""Ensembles d'intervalles de jours pour l'intégration EyeOnSaur."""
+
+from collections.abc import Iterable, Iterator
+
+from .dateutils import from_epoch_day, month_bounds
+
+
+class DayIntervals:
+    """Ensemble trié d'intervalles fermés de jours epoch.
+
+    Les intervalles sont disjoints et non contigus : [1, 3] et [4, 6]
+    sont fusionnés en [1, 6]. Un trou de trois ans tient donc en un
+    seul intervalle. L'ensemble est immuable.
+    """
+
+    __slots__ = ("_intervals",)
+
+    def __init__(self, intervals: Iterable[tuple[int, int]] = ()) -> None:
+        """Construit l'ensemble, en triant et fusionnant les intervalles."""
+        merged: list[tuple[int, int]] = []
+        for first, last in sorted(
+            interval for interval in intervals if interval[0] <= interval[1]
+        ):
+            if merged and first <= merged[-1][1] + 1:
+                if last > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], last)
+            else:
+                merged.append((first, last))
+        self._intervals = tuple(merged)
+
+    @classmethod
+    def from_months(cls, months: Iterable[tuple[int, int]]) -> "DayIntervals":
+        """Ensemble des jours de mois (année, mois)."""
+        return cls(month_bounds(year, month) for year, month in months)
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        """Parcourt les intervalles (premier jour, dernier jour)."""
+        return iter(self._intervals)
+
+    def __len__(self) -> int:
+        """Nombre d'intervalles."""
+        return len(self._intervals)
+
+    def __bool__(self) -> bool:
+        """Indique si l'ensemble contient au moins un jour."""
+        return bool(self._intervals)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare deux ensembles."""
+        if not isinstance(other, DayIntervals):
+            return NotImplemented
+        return self._intervals == other._intervals
+
+    def __hash__(self) -> int:
+        """Empreinte de l'ensemble."""
+        return hash(self._intervals)
+
+    def __repr__(self) -> str:
+        """Représentation lisible, en dates."""
+        ranges = ", ".join(
+            f"{from_epoch_day(first)}..{from_epoch_day(last)}"
+            for first, last in self._intervals
+        )
+        return f"DayIntervals({ranges})"
+
+    @property
+    def days(self) -> int:
+        """Nombre total de jours."""
+        return sum(last - first + 1 for first, last in self._intervals)
+
+    @property
+    def first_day(self) -> int | None:
+        """Premier jour de l'ensemble."""
+        return self._intervals[0][0] if self._intervals else None
+
+    @property
+    def last_day(self) -> int | None:
+        """Dernier jour de l'ensemble."""
+        return self._intervals[-1][1] if self._intervals else None
+
+    def union(self, other: "DayIntervals") -> "DayIntervals":
+        """Jours présents dans l'un ou l'autre ensemble."""
+        return DayIntervals((*self._intervals, *other._intervals))
+
+    def subtract(self, other: "DayIntervals") -> "DayIntervals":
+        """Jours de cet ensemble absents de other."""
+        result: list[tuple[int, int]] = []
+        removed = other._intervals
+        position = 0
+        for first, last in self._intervals:
+            # Les intervalles retirés qui finissent avant first sont passés
+            while position < len(removed) and removed[position][1] < first:
+                position += 1
+            start = first
+            index = position
+            while index < len(removed) and removed[index][0] <= last:
+                if removed[index][0] > start:
+                    result.append((start, removed[index][0] - 1))
+                start = max(start, removed[index][1] + 1)
+                index += 1
+            if start <= last:
+                result.append((start, last))
+        return DayIntervals(result)
+
+    def intersection(self, other: "DayIntervals") -> "DayIntervals":
+        """Jours présents dans les deux ensembles."""
+        return self.subtract(self.subtract(other))
+
+    def by_month(self) -> dict[tuple[int, int], "DayIntervals"]:
+        """Projection par mois : les jours de chaque mois (année, mois)."""
+        months: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        for first, last in self._intervals:
+            day = first
+            while day <= last:
+                current = from_epoch_day(day)
+                _, month_last = month_bounds(current.year, current.month)
+                months.setdefault((current.year, current.month), []).append(
+                    (day, min(last, month_last))
+                )
+                day = month_last + 1
+        return {
+            month: DayIntervals(intervals)
+            for month, intervals in months.items()
+        }
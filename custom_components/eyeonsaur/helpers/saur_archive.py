@@ -0,0 +1,240 @@
+"""Archivage compressé des années closes de consommations Saur.
+
+Une année close dont les jours connus sont contigus est déplacée de la
+table consumptions vers une unique ligne de consumption_archive : les
+litres journaliers y sont rangés dans un tableau d'entiers 32 bits
+compressé par zlib, accompagné de leur somme exacte qui sert de somme
+de contrôle. La vue daily_consumptions réunit les deux tables ; les
+lectures passent par elle et décodent les archives à la volée grâce à la
+fonction SQL saur_unpack, enregistrée sur chaque connexion.
+
+Les jours archivés n'ont plus de ligne dans absolute_index : leur index
+est reconstitué par les sommes préfixes en mémoire. Une écriture sur une
+année archivée la réintègre entière dans consumptions, avec son index.
+"""
+
+import sqlite3
+import sys
+import zlib
+from array import array
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple
+
+from ..models import SectionId
+from .dateutils import from_epoch_day, to_epoch_day
+from .saur_index import sync_refresh_absolute_index
+
+
+class ArchiveResult(NamedTuple):
+    """Bilan d'un archivage."""
+
+    years: int
+    """Nombre d'années de compteur archivées."""
+    days: int
+    """Nombre de jours déplacés."""
+
+
+def pack_litres(values: list[int]) -> bytes:
+    """Compresse des litres journaliers en tableau d'entiers 32 bits."""
+    packed = array("i", values)
+    if sys.byteorder == "big":
+        # Stockage petit-boutiste, quelle que soit la machine
+        packed.byteswap()
+    return zlib.compress(packed.tobytes())
+
+
+@lru_cache(maxsize=32)
+def unpack_litres(blob: bytes, total: int) -> array:
+    """Décompresse une archive et vérifie sa somme de contrôle.
+
+    Raises:
+        ValueError: Si la somme des jours ne vaut pas total.
+
+    """
+    values = array("i")
+    values.frombytes(zlib.decompress(blob))
+    if sys.byteorder == "big":
+        values.byteswap()
+    if sum(values) != total:
+        raise ValueError("Somme de contrôle de l'archive invalide")
+    return values
+
+
+def _sql_unpack(blob: bytes, total: int, position: int) -> int | None:
+    """Fonction SQL saur_unpack : litres du jour position d'une archive."""
+    values = unpack_litres(blob, total)
+    return values[position] if position < len(values) else None
+
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    """Enregistre les fonctions SQL utilisées par daily_consumptions."""
+    conn.create_function("saur_unpack", 3, _sql_unpack, deterministic=True)
+
+
+def sync_compact(conn: sqlite3.Connection, before_day: int) -> ArchiveResult:
+    """Archive les années qui se terminent avant before_day.
+
+    Seules les années dont les jours connus sont contigus sont
+    archivées ; une année incomplète reste dans consumptions. Une
+    archive existante de l'année est fusionnée avec les nouveaux jours.
+
+    Args:
+        conn: Connexion d'écriture, dans la transaction en cours.
+        before_day: Premier jour epoch qui n'est pas clos.
+
+    """
+    years = days = 0
+    for section_id, year in conn.execute(
+        """
+        SELECT DISTINCT section_id,
+            CAST(strftime('%Y', day * 86400, 'unixepoch') AS INTEGER)
+        FROM consumptions
+        WHERE day < ?
+        """,
+        (before_day,),
+    ).fetchall():
+        year_first = to_epoch_day(date(year, 1, 1))
+        year_last = to_epoch_day(date(year + 1, 1, 1)) - 1
+        if year_last >= before_day:
+            continue
+        sync_thaw(conn, section_id, year_first, year_last)
+        rows = conn.execute(
+            """
+            SELECT day, litres FROM consumptions
+            WHERE section_id = ? AND day BETWEEN ? AND ?
+            ORDER BY day
+            """,
+            (section_id, year_first, year_last),
+        ).fetchall()
+        first_day, last_day = rows[0][0], rows[-1][0]
+        if len(rows) != last_day - first_day + 1:
+            continue
+        values = [litres for _, litres in rows]
+        conn.execute(
+            """
+            INSERT INTO consumption_archive (
+                section_id, year, first_day, days, litres, total
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                section_id,
+                year,
+                first_day,
+                len(values),
+                pack_litres(values),
+                sum(values),
+            ),
+        )
+        for table in ("consumptions", "absolute_index"):
+            conn.execute(
+                f"""
+                DELETE FROM {table}
+                WHERE section_id = ? AND day BETWEEN ? AND ?
+                """,  # noqa: S608
+                (section_id, first_day, last_day),
+            )
+        years += 1
+        days += len(values)
+    # Index des jours archivés laissé par une version précédente
+    conn.execute(
+        """
+        DELETE FROM absolute_index
+        WHERE EXISTS (
+            SELECT 1 FROM consumption_archive a
+            WHERE a.section_id = absolute_index.section_id
+                AND absolute_index.day
+                    BETWEEN a.first_day AND a.first_day + a.days - 1
+        )
+        """
+    )
+    return ArchiveResult(years, days)
+
+
+def sync_thaw(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    first_day: int,
+    last_day: int,
+) -> int:
+    """Réintègre dans consumptions les années archivées touchant une plage.
+
+    Appelée avant toute écriture, pour qu'une correction sur une année
+    archivée porte sur des lignes ordinaires. L'année est réintégrée
+    entière, même si la plage déborde des jours archivés : une année
+    n'a jamais à la fois une archive et des lignes ordinaires. L'index
+    absolu des jours réintégrés est reconstruit.
+
+    Returns:
+        Le nombre de jours réintégrés.
+
+    """
+    thawed: list[int] = []
+    for year, start, blob, total in conn.execute(
+        """
+        SELECT year, first_day, litres, total FROM consumption_archive
+        WHERE section_id = ? AND year BETWEEN ? AND ?
+        """,
+        (
+            section_id,
+            from_epoch_day(first_day).year,
+            from_epoch_day(last_day).year,
+        ),
+    ).fetchall():
+        values = unpack_litres(blob, total)
+        conn.executemany(
+            """
+            INSERT INTO consumptions (section_id, day, litres)
+            VALUES (?, ?, ?)
+            """,
+            [
+                (section_id, start + offset, litres)
+                for offset, litres in enumerate(values)
+            ],
+        )
+        conn.execute(
+            """
+            DELETE FROM consumption_archive
+            WHERE section_id = ? AND year = ?
+            """,
+            (section_id, year),
+        )
+        thawed.extend(range(start, start + len(values)))
+    if thawed:
+        sync_refresh_absolute_index(conn, section_id, thawed)
+    return len(thawed)
+
+
+def sync_check_archives(conn: sqlite3.Connection) -> list[SectionId]:
+    """Supprime les archives illisibles ou à la somme de contrôle fausse.
+
+    Les jours d'une archive supprimée disparaissent de la base ; le
+    contrôle de couverture les signale ensuite comme à relire.
+
+    Returns:
+        Les compteurs dont une archive a été supprimée.
+
+    """
+    damaged: set[SectionId] = set()
+    for section_id, year, days, blob, total in conn.execute(
+        """
+        SELECT section_id, year, days, litres, total
+        FROM consumption_archive
+        """
+    ).fetchall():
+        try:
+            valid = len(unpack_litres(blob, total)) == days
+        except (ValueError, zlib.error):
+            valid = False
+        if valid:
+            continue
+        conn.execute(
+            """
+            DELETE FROM consumption_archive
+            WHERE section_id = ? AND year = ?
+            """,
+            (section_id, year),
+        )
+        damaged.add(SectionId(section_id))
+    return sorted(damaged)
@@ -0,0 +1,117 @@
+"""Sauvegardes en ligne de la base Saur.
+
+Les sauvegardes utilisent l'API de sauvegarde de SQLite sur la
+connexion du thread base de données, entre deux tâches : aucune
+écriture ne peut survenir pendant la copie. Une écriture faite par une
+autre connexion relancerait la copie depuis le début ; sur la même
+connexion, elle est copiée d'une traite, la base étant de petite taille.
+Une sauvegarde est d'abord écrite dans un fichier temporaire, renommé
+une fois complet : un instantané présent sur le disque est toujours
+cohérent.
+"""
+
+import logging
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from .const import DB_BACKUP_DIR
+
+_LOGGER = logging.getLogger(__name__)
+
+_SUFFIX = ".bak"
+_STAMP_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+
+def backup_dir(db_path: str) -> Path:
+    """Répertoire des sauvegardes d'une base."""
+    return Path(db_path).parent / DB_BACKUP_DIR
+
+
+def list_backups(db_path: str) -> list[Path]:
+    """Sauvegardes d'une base, de la plus récente à la plus ancienne."""
+    directory = backup_dir(db_path)
+    if not directory.is_dir():
+        return []
+    return sorted(
+        directory.glob(f"{Path(db_path).stem}.*{_SUFFIX}"), reverse=True
+    )
+
+
+def latest_backup_time(db_path: str) -> datetime | None:
+    """Date de la sauvegarde la plus récente d'une base, ou None."""
+    snapshots = list_backups(db_path)
+    if not snapshots:
+        return None
+    return datetime.fromtimestamp(snapshots[0].stat().st_mtime)
+
+
+def sync_backup(conn: sqlite3.Connection, db_path: str, when: datetime) -> Path:
+    """Copie la base dans un nouvel instantané.
+
+    Args:
+        conn: Connexion sur la base, hors transaction ; aucune autre
+              connexion ne doit y écrire pendant la copie.
+        db_path: Chemin de la base, qui situe les sauvegardes.
+        when: Horodatage de l'instantané, utilisé dans son nom.
+
+    Returns:
+        Le chemin de l'instantané.
+
+    """
+    directory = backup_dir(db_path)
+    directory.mkdir(exist_ok=True)
+    target = directory / (
+        f"{Path(db_path).stem}.{when.strftime(_STAMP_FORMAT)}{_SUFFIX}"
+    )
+    partial = target.with_suffix(".tmp")
+    try:
+        with closing(sqlite3.connect(partial)) as destination:
+            # En une seule étape : rien ne peut relancer la copie
+            conn.backup(destination)
+            # Un instantané est un fichier autonome, même d'une base WAL
+            destination.execute("PRAGMA journal_mode = DELETE")
+        partial.replace(target)
+    finally:
+        partial.unlink(missing_ok=True)
+    return target
+
+
+def sync_rotate(db_path: str, keep: int) -> list[Path]:
+    """Supprime les sauvegardes au-delà des keep plus récentes.
+
+    Returns:
+        Les sauvegardes supprimées.
+
+    """
+    removed = list_backups(db_path)[keep:]
+    for snapshot in removed:
+        snapshot.unlink(missing_ok=True)
+    return removed
+
+
+def sync_check(snapshot: Path) -> bool:
+    """Indique si un instantané passe PRAGMA quick_check."""
+    try:
+        with closing(
+            sqlite3.connect(f"{snapshot.resolve().as_uri()}?mode=ro", uri=True)
+        ) as conn:
+            return conn.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+    except sqlite3.DatabaseError as err:
+        _LOGGER.warning("Sauvegarde %s illisible : %s", snapshot, err)
+        return False
+
+
+def sync_restore(snapshot: Path, db_path: str) -> None:
+    """Remplace le contenu de la base par celui d'un instantané.
+
+    Aucune connexion ne doit être ouverte sur la base.
+    """
+    with (
+        closing(
+            sqlite3.connect(f"{snapshot.resolve().as_uri()}?mode=ro", uri=True)
+        ) as source,
+        closing(sqlite3.connect(db_path)) as destination,
+    ):
+        source.backup(destination)
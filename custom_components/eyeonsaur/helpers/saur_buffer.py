@@ -0,0 +1,81 @@
+"""Tampon d'écriture différée des consommations Saur.
+
+Les rafraîchissements hebdomadaires et les rattrapages mensuels écrivent
+des jours qui se recouvrent. Le tampon regroupe en mémoire les
+consommations par (compteur, jour) : un jour réécrit plusieurs fois
+avant le vidage ne coûte qu'une ligne, et tout le tampon est écrit en
+une seule transaction.
+"""
+
+from ..models import SectionId
+
+
+class SaurWriteBuffer:
+    """Consommations en attente d'écriture, regroupées par jour."""
+
+    def __init__(self, max_rows: int, max_delay: float) -> None:
+        """Initialise un tampon vide.
+
+        Args:
+            max_rows: Nombre de jours en attente déclenchant un vidage.
+            max_delay: Délai maximal (s) entre la mise en attente d'un
+                       jour et le vidage du tampon.
+
+        """
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._pending: dict[SectionId, dict[int, int]] = {}
+        self._rows = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        """Nombre de jours en attente, tous compteurs confondus."""
+        return self._rows
+
+    def __bool__(self) -> bool:
+        """Indique si des jours sont en attente."""
+        return self._rows > 0
+
+    @property
+    def is_full(self) -> bool:
+        """Indique si le seuil de taille est atteint."""
+        return self._rows >= self.max_rows
+
+    def add(self, section_id: SectionId, rows: dict[int, int]) -> None:
+        """Ajoute des consommations (jour epoch, litres) en attente.
+
+        Un jour déjà en attente est remplacé par sa nouvelle valeur.
+        """
+        if not rows:
+            return
+        pending = self._pending.setdefault(section_id, {})
+        before = len(pending)
+        pending.update(rows)
+        added = len(pending) - before
+        self.coalesced += len(rows) - added
+        self._rows += added
+
+    def take(self, section_id: SectionId) -> dict[int, int]:
+        """Retire et retourne les consommations en attente d'un compteur."""
+        pending = self._pending.pop(section_id, {})
+        self._rows -= len(pending)
+        return pending
+
+    def drain(self) -> dict[SectionId, dict[int, int]]:
+        """Retire et retourne toutes les consommations en attente."""
+        pending, self._pending = self._pending, {}
+        self._rows = 0
+        return pending
+
+    def restore(self, pending: dict[SectionId, dict[int, int]]) -> None:
+        """Remet en attente des consommations dont l'écriture a échoué.
+
+        Les valeurs ajoutées depuis le retrait sont plus récentes et
+        sont conservées.
+        """
+        for section_id, rows in pending.items():
+            current = self._pending.setdefault(section_id, {})
+            before = len(current)
+            for day, litres in rows.items():
+                current.setdefault(day, litres)
+            self._rows += len(current) - before
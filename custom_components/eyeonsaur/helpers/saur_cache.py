@@ -0,0 +1,163 @@
+"""Cache mémoire des historiques lus dans la base Saur."""
+
+import logging
+from collections import OrderedDict
+from collections.abc import Hashable, Sized
+from dataclasses import dataclass
+from typing import Any, Final
+
+from ..models import SectionId
+from .saur_index import DayRange
+
+_LOGGER = logging.getLogger(__name__)
+
+ENTRY_OVERHEAD: Final = 256
+"""Taille forfaitaire (octets) d'une entrée, hors lignes."""
+ROW_SIZE: Final = 120
+"""Taille estimée (octets) d'une ligne d'historique en mémoire."""
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    """Valeur en cache et plage de jours dont elle dépend."""
+
+    section_id: SectionId
+    first_day: int | None
+    last_day: int | None
+    value: Any
+    size: int
+
+
+class SaurHistoryCache:
+    """Cache LRU borné en mémoire, invalidé par plage de jours.
+
+    Chaque entrée déclare le compteur et la plage de jours epoch
+    [first_day, last_day] dont elle dépend (None pour une borne ouverte).
+    Une écriture sur une plage n'invalide que les entrées qui la
+    recouvrent.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialise un cache vide.
+
+        Args:
+            max_bytes: Budget mémoire estimé au-delà duquel les entrées
+                       les moins récemment utilisées sont évincées.
+
+        """
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, _CacheEntry] = OrderedDict()
+        self._generations: dict[SectionId, int] = {}
+        self._clear_count = 0
+
+    def __len__(self) -> int:
+        """Nombre d'entrées en cache."""
+        return len(self._entries)
+
+    def generation(self, section_id: SectionId) -> tuple[int, int]:
+        """Compteur d'invalidations d'un compteur, à relever avant lecture."""
+        return self._clear_count, self._generations.get(section_id, 0)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Retourne la valeur en cache, ou None (défaut de cache)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        section_id: SectionId,
+        days: DayRange,
+        generation: tuple[int, int],
+    ) -> None:
+        """Ajoute une valeur lue en base.
+
+        La valeur est ignorée si une écriture a invalidé le compteur
+        depuis que generation a été relevé : elle pourrait être périmée.
+
+        Args:
+            key: Clé de la lecture (compteur, requête, paramètres).
+            value: Résultat de la lecture ; une collection est comptée
+                   ligne par ligne dans le budget mémoire.
+            section_id: L'identifiant unique du compteur.
+            days: Plage de jours epoch dont dépend la valeur.
+            generation: Valeur de generation() relevée avant la lecture.
+
+        """
+        if generation != self.generation(section_id):
+            return
+        rows = len(value) if isinstance(value, Sized) else 1
+        size = ENTRY_OVERHEAD + rows * ROW_SIZE
+        if size > self.max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = _CacheEntry(section_id, *days, value, size)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def invalidate(
+        self,
+        section_id: SectionId,
+        first_day: int | None = None,
+        last_day: int | None = None,
+    ) -> None:
+        """Invalide les entrées d'un compteur qui recouvrent une plage.
+
+        Args:
+            section_id: L'identifiant unique du compteur.
+            first_day: Premier jour modifié, None pour le début.
+            last_day: Dernier jour modifié, None pour la fin.
+
+        """
+        self._generations[section_id] = self._generations.get(section_id, 0) + 1
+        stale = [
+            key
+            for key, entry in self._entries.items()
+            if entry.section_id == section_id
+            and (
+                first_day is None
+                or entry.last_day is None
+                or entry.last_day >= first_day
+            )
+            and (
+                last_day is None
+                or entry.first_day is None
+                or entry.first_day <= last_day
+            )
+        ]
+        for key in stale:
+            self._discard(key)
+        if stale:
+            _LOGGER.debug(
+                "%s entrées invalidées pour %s (%s..%s)",
+                len(stale),
+                section_id,
+                first_day,
+                last_day,
+            )
+
+    def clear(self) -> None:
+        """Vide le cache."""
+        self._clear_count += 1
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def _discard(self, key: Hashable) -> None:
+        """Retire une entrée si elle existe."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry.size
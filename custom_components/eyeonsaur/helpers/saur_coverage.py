@@ -0,0 +1,275 @@
+"""Index de couverture des consommations Saur, par compteur et par mois.
+
+La table coverage contient, pour chaque compteur et chaque mois, un
+masque de bits des jours présents en base (bit 0 pour le 1er du mois)
+et des indicateurs (mois blacklisté, données estimées). Savoir ce qui
+manque sur une plage revient à quelques opérations sur ces masques.
+"""
+
+import sqlite3
+from collections.abc import Iterable
+from enum import IntFlag
+
+from ..models import SectionId
+from .dateutils import from_epoch_day, month_bounds
+from .intervals import DayIntervals
+
+
+class CoverageFlag(IntFlag):
+    """Indicateurs d'un mois dans l'index de couverture."""
+
+    NONE = 0
+    BLACKLISTED = 1
+    """Mois indisponible côté Saur, à ne plus demander."""
+    ESTIMATED = 2
+    """Mois dont les consommations sont estimées, à relire."""
+
+
+def month_key(year: int, month: int) -> int:
+    """Clé d'un mois dans la table coverage."""
+    return year * 12 + month - 1
+
+
+def day_masks(days: Iterable[int]) -> dict[int, int]:
+    """Masques des jours epoch, par clé de mois."""
+    masks: dict[int, int] = {}
+    for day in days:
+        current = from_epoch_day(day)
+        key = month_key(current.year, current.month)
+        masks[key] = masks.get(key, 0) | 1 << (current.day - 1)
+    return masks
+
+
+def sync_mark_days(
+    conn: sqlite3.Connection, section_id: SectionId, days: Iterable[int]
+) -> None:
+    """Marque des jours comme présents en base."""
+    masks = day_masks(days)
+    conn.executemany(
+        """
+        INSERT INTO coverage (section_id, month, days, flags)
+        VALUES (?, ?, ?, 0)
+        ON CONFLICT(section_id, month) DO UPDATE SET
+        days = days | excluded.days
+        """,
+        [(section_id, key, mask) for key, mask in masks.items()],
+    )
+
+
+def sync_set_flags(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    year: int,
+    month: int,
+    flags: CoverageFlag,
+) -> None:
+    """Ajoute des indicateurs à un mois."""
+    conn.execute(
+        """
+        INSERT INTO coverage (section_id, month, days, flags)
+        VALUES (?, ?, 0, ?)
+        ON CONFLICT(section_id, month) DO UPDATE SET
+        flags = flags | excluded.flags
+        """,
+        (section_id, month_key(year, month), int(flags)),
+    )
+
+
+def sync_clear_flags(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    year: int,
+    month: int,
+    flags: CoverageFlag,
+) -> None:
+    """Retire des indicateurs d'un mois."""
+    conn.execute(
+        """
+        UPDATE coverage SET flags = flags & ~?
+        WHERE section_id = ? AND month = ?
+        """,
+        (int(flags), section_id, month_key(year, month)),
+    )
+
+
+def sync_get_flagged_months(
+    conn: sqlite3.Connection, section_id: SectionId, flags: CoverageFlag
+) -> list[tuple[int, int]]:
+    """Mois (année, mois) portant l'un des indicateurs donnés."""
+    return [
+        (year, month_index + 1)
+        for (key,) in conn.execute(
+            """
+            SELECT month FROM coverage
+            WHERE section_id = ? AND flags & ? != 0
+            ORDER BY month
+            """,
+            (section_id, int(flags)),
+        )
+        for year, month_index in (divmod(key, 12),)
+    ]
+
+
+def sync_get_missing(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    first_day: int,
+    last_day: int,
+    skip: CoverageFlag = CoverageFlag.BLACKLISTED,
+) -> DayIntervals:
+    """Jours absents de la base entre first_day et last_day inclus.
+
+    Args:
+        conn: Connexion SQLite.
+        section_id: L'identifiant unique du compteur.
+        first_day: Premier jour epoch de la plage.
+        last_day: Dernier jour epoch de la plage.
+        skip: Les mois portant l'un de ces indicateurs sont ignorés.
+
+    """
+    if first_day > last_day:
+        return DayIntervals()
+    first, last = from_epoch_day(first_day), from_epoch_day(last_day)
+    first_key = month_key(first.year, first.month)
+    last_key = month_key(last.year, last.month)
+    stored: dict[int, tuple[int, int]] = {
+        row[0]: (row[1], row[2])
+        for row in conn.execute(
+            """
+            SELECT month, days, flags FROM coverage
+            WHERE section_id = ? AND month BETWEEN ? AND ?
+            """,
+            (section_id, first_key, last_key),
+        )
+    }
+
+    missing: list[tuple[int, int]] = []
+    for key in range(first_key, last_key + 1):
+        days, flags = stored.get(key, (0, 0))
+        if flags & skip:
+            continue
+        start, end = _month_bounds_from_key(key)
+        low, high = max(start, first_day) - start, min(end, last_day) - start
+        wanted = (1 << (high + 1)) - (1 << low)
+        absent = wanted & ~days
+        missing.extend(_bit_runs(absent, start))
+    return DayIntervals(missing)
+
+
+def sync_is_month_complete(
+    conn: sqlite3.Connection, section_id: SectionId, year: int, month: int
+) -> bool:
+    """Indique si tous les jours d'un mois sont en base et définitifs.
+
+    Un mois estimé n'est jamais complet : il est relu jusqu'à ce que
+    Saur en publie les relevés définitifs.
+    """
+    start, end = month_bounds(year, month)
+    row = conn.execute(
+        """
+        SELECT days, flags FROM coverage
+        WHERE section_id = ? AND month = ?
+        """,
+        (section_id, month_key(year, month)),
+    ).fetchone()
+    return (
+        row is not None
+        and row[0] == (1 << (end - start + 1)) - 1
+        and not row[1] & CoverageFlag.ESTIMATED
+    )
+
+
+def sync_check_coverage(
+    conn: sqlite3.Connection,
+) -> dict[SectionId, list[tuple[int, int]]]:
+    """Aligne l'index de couverture sur les jours réellement en base.
+
+    Les jours présents mais absents de l'index y sont ajoutés. Les jours
+    annoncés par l'index mais introuvables sont retirés : leur mois est
+    à relire, sauf s'il est blacklisté.
+
+    Args:
+        conn: Connexion d'écriture, dans la transaction en cours.
+
+    Returns:
+        Les mois (année, mois) dont des jours ont disparu, par compteur,
+        du plus récent au plus ancien.
+
+    """
+    # Une ligne par jour : la somme des bits vaut leur union
+    actual: dict[tuple[SectionId, int], int] = {
+        (section_id, key): mask
+        for section_id, key, mask in conn.execute(
+            """
+            SELECT section_id,
+                CAST(strftime('%Y', day * 86400, 'unixepoch') AS INTEGER) * 12
+                + CAST(strftime('%m', day * 86400, 'unixepoch') AS INTEGER)
+                - 1,
+                SUM(1 << (
+                    CAST(strftime('%d', day * 86400, 'unixepoch') AS INTEGER)
+                    - 1
+                ))
+            FROM consumptions
+            GROUP BY 1, 2
+            """
+        )
+    }
+    for section_id, first_day, count in conn.execute(
+        "SELECT section_id, first_day, days FROM consumption_archive"
+    ):
+        for key, mask in day_masks(range(first_day, first_day + count)).items():
+            actual[section_id, key] = actual.get((section_id, key), 0) | mask
+    stored = {
+        (section_id, key): (mask, flags)
+        for section_id, key, mask, flags in conn.execute(
+            "SELECT section_id, month, days, flags FROM coverage"
+        )
+    }
+
+    repaired: list[tuple[int, SectionId, int]] = []
+    lost: dict[SectionId, list[tuple[int, int]]] = {}
+    for section_id, key in actual.keys() | stored.keys():
+        mask = actual.get((section_id, key), 0)
+        known, flags = stored.get((section_id, key), (0, 0))
+        if mask == known:
+            continue
+        repaired.append((mask, section_id, key))
+        if known & ~mask and not flags & CoverageFlag.BLACKLISTED:
+            year, month_index = divmod(key, 12)
+            lost.setdefault(SectionId(section_id), []).append(
+                (year, month_index + 1)
+            )
+    conn.executemany(
+        """
+        INSERT INTO coverage (section_id, month, days, flags)
+        VALUES (?2, ?3, ?1, 0)
+        ON CONFLICT(section_id, month) DO UPDATE SET days = excluded.days
+        """,
+        repaired,
+    )
+    return {
+        section_id: sorted(months, reverse=True)
+        for section_id, months in lost.items()
+    }
+
+
+def _month_bounds_from_key(key: int) -> tuple[int, int]:
+    """Premier et dernier jour epoch du mois d'une clé."""
+    year, month_index = divmod(key, 12)
+    return month_bounds(year, month_index + 1)
+
+
+def _bit_runs(mask: int, base_day: int) -> list[tuple[int, int]]:
+    """Suites de bits à 1 d'un masque, en jours epoch."""
+    runs: list[tuple[int, int]] = []
+    offset = 0
+    while mask:
+        # Saute les zéros de poids faible puis mesure la suite de uns
+        zeros = (mask & -mask).bit_length() - 1
+        mask >>= zeros
+        offset += zeros
+        ones = (~mask & (mask + 1)).bit_length() - 1
+        runs.append((base_day + offset, base_day + offset + ones - 1))
+        mask >>= ones
+        offset += ones
+    return runs
@@ -1,45 +1,359 @@
 # pylint: disable=E0401
 """Module de gestion de la base de données pour les consommations Saur."""
 
+import asyncio
 import logging
 import sqlite3
-from collections.abc import Sequence
-from datetime import datetime
-from typing import Any
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from contextlib import closing, contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Final, TypeVar
 
 from homeassistant.core import HomeAssistant
 
 from ..models import (
     ConsumptionDatas,
+    ConsumptionSummary,
+    ConsumptionWriteResult,
+    DailyConsumption,
+    IntegrityReport,
+    MaintenanceReport,
     RelevePhysique,
     SaurSqliteResponse,
     SectionId,
-    StrDate,
     TheoreticalConsumptionData,
     TheoreticalConsumptionDatas,
 )
+from .const import (
+    DB_ARCHIVE_GRACE,
+    DB_BACKUP_INTERVAL,
+    DB_BACKUP_KEEP,
+    DB_CACHE_MAX_BYTES,
+    DB_CHUNK_SIZE,
+    DB_MAINTENANCE_INTERVAL,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_STORAGE_PROFILE,
+    DB_WRITE_BUFFER_DELAY,
+    DB_WRITE_BUFFER_ROWS,
+    LITRES_PER_CUBIC_METER,
+)
+from .dateutils import epoch_day_to_strdate, to_epoch_day
+from .intervals import DayIntervals
+from .saur_archive import register_functions, sync_compact, sync_thaw
+from .saur_backup import (
+    latest_backup_time,
+    list_backups,
+    sync_backup,
+    sync_check,
+    sync_restore,
+    sync_rotate,
+)
+from .saur_buffer import SaurWriteBuffer
+from .saur_cache import SaurHistoryCache
+from .saur_coverage import (
+    CoverageFlag,
+    sync_clear_flags,
+    sync_get_flagged_months,
+    sync_get_missing,
+    sync_is_month_complete,
+    sync_mark_days,
+    sync_set_flags,
+)
+from .saur_index import (
+    DayRange,
+    merge_day_ranges,
+    sync_refresh_absolute_index,
+)
+from .saur_integrity import (
+    sync_check_consistency,
+    sync_quarantine,
+    sync_quick_check,
+    sync_salvage,
+)
+from .saur_journal import (
+    ChangeSet,
+    sync_ack_changes,
+    sync_get_changes,
+    sync_record_change,
+    sync_reset_cursor,
+)
+from .saur_prefix import SaurPrefixIndex, sync_build_prefix_index
+from .saur_rollup import sync_refresh_rollups, sync_summarize
+from .saur_schema import (
+    sync_get_meta,
+    sync_import_attached,
+    sync_migrate,
+    sync_set_meta,
+)
+from .saur_storage import StorageProfile, apply_profile, get_profile
+from .saur_worker import SaurDatabaseWorker, SaurWorkerStats
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+_MIN_DAY: Final = -(2**31)
+_MAX_DAY: Final = 2**31 - 1
+_LAST_MAINTENANCE: Final = "last_maintenance"
+
+_WriteOutcome = tuple[ConsumptionWriteResult, dict[int, int]]
+"""Bilan d'une écriture et jours modifiés."""
+
 
 class SaurDatabaseError(Exception):
     """Exception levée lors d'erreurs de base de données Saur."""
 
 
+def legacy_db_file(entry_id: str) -> str:
+    """Nom du fichier de base propre à une entrée de configuration."""
+    return f"consommation_saur_{entry_id}.db"
+
+
+def to_litres(volume: float) -> int:
+    """Convertit un volume en m³ en litres entiers."""
+    return round(volume * LITRES_PER_CUBIC_METER)
+
+
+def from_litres(litres: int) -> float:
+    """Convertit un volume en litres en m³."""
+    return litres / LITRES_PER_CUBIC_METER
+
+
+def _daily_rows(consumptions: ConsumptionDatas) -> dict[int, int]:
+    """Consommations journalières d'un lot, en litres par jour epoch."""
+    return {
+        to_epoch_day(conso.startDate): to_litres(conso.value)
+        for conso in consumptions
+        if conso.rangeType == "Day"
+    }
+
+
+def _sync_write_consumptions(
+    conn: sqlite3.Connection, section_id: SectionId, rows: dict[int, int]
+) -> _WriteOutcome:
+    """Compare des consommations à l'existant puis écrit la différence.
+
+    Les années archivées touchées sont d'abord réintégrées. Les
+    structures dérivées (index absolu, agrégats, couverture, journal)
+    sont mises à jour dans la même transaction.
+
+    Returns:
+        Le bilan de l'écriture et les jours modifiés.
+
+    """
+    sync_thaw(conn, section_id, min(rows), max(rows))
+    existing: dict[int, int] = dict(
+        conn.execute(
+            """
+            SELECT day, litres FROM consumptions
+            WHERE section_id = ? AND day BETWEEN ? AND ?
+            """,
+            (section_id, min(rows), max(rows)),
+        ).fetchall()
+    )
+    changes = [
+        (section_id, day, litres)
+        for day, litres in rows.items()
+        if existing.get(day) != litres
+    ]
+    conn.executemany(
+        """
+        INSERT INTO consumptions (section_id, day, litres)
+        VALUES (?, ?, ?)
+        ON CONFLICT(section_id, day) DO UPDATE SET
+        litres = excluded.litres
+        """,
+        changes,
+    )
+    dirty: DayRange | None = None
+    if changes:
+        changed_days = [change[1] for change in changes]
+        dirty = merge_day_ranges(
+            (min(changed_days), max(changed_days)),
+            sync_refresh_absolute_index(conn, section_id, changed_days),
+        )
+        sync_refresh_rollups(conn, section_id, changed_days)
+        sync_mark_days(conn, section_id, changed_days)
+        if dirty is not None:
+            sync_record_change(conn, section_id, dirty)
+    updated = sum(1 for change in changes if change[1] in existing)
+    result = ConsumptionWriteResult(
+        inserted=len(changes) - updated,
+        updated=updated,
+        unchanged=len(rows) - len(changes),
+    )
+    return result, {day: litres for _, day, litres in changes}
+
+
+class SaurConnectionManager:
+    """Connexion SQLite persistante vers la base Saur.
+
+    Tous les accès passent par le thread base de données, qui les
+    exécute un par un : une unique connexion, ouverte une fois pour
+    toutes, suffit et conserve son cache de requêtes préparées. Un verrou
+    en garantit l'usage exclusif.
+    """
+
+    def __init__(
+        self, db_path: str, profile: StorageProfile | None = None
+    ) -> None:
+        """Initialise le gestionnaire sans ouvrir de connexion.
+
+        Args:
+            db_path: Chemin du fichier de base de données.
+            profile: Profil de stockage, par défaut DB_STORAGE_PROFILE.
+
+        """
+        self.db_path = db_path
+        self.profile = profile or get_profile(DB_STORAGE_PROFILE)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Indique si la connexion est ouverte."""
+        return self._conn is not None
+
+    def open(self) -> None:
+        """Ouvre la connexion (et crée le fichier si besoin)."""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self.connect(self.db_path, self.profile)
+
+    def close(self) -> None:
+        """Ferme la connexion ; en mode WAL, le journal est alors reporté."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Fournit la connexion en exclusivité."""
+        with self._lock:
+            if self._conn is None:
+                raise SaurDatabaseError("La base de données n'est pas ouverte")
+            yield self._conn
+
+    @staticmethod
+    def connect(
+        database: str, profile: StorageProfile | None = None
+    ) -> sqlite3.Connection:
+        """Ouvre une connexion partageable entre threads.
+
+        Args:
+            database: Chemin du fichier de base de données.
+            profile: Profil de stockage à appliquer, aucun par défaut.
+
+        """
+        conn = sqlite3.connect(
+            database,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        register_functions(conn)
+        if profile is not None:
+            apply_profile(conn, profile)
+        return conn
+
+
 class SaurDatabaseHelper:
     """Classe utilitaire pour interagir avec la base de données Saur."""
 
-    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        db_file: str | None = None,
+        profile: str = DB_STORAGE_PROFILE,
+    ) -> None:
         """Initialise le SaurDatabaseHelper.
 
         Args:
             hass: L'instance de Home Assistant.
             entry_id: L'ID de l'entrée de configuration.
+            db_file: Nom du fichier de base, par défaut propre à l'entrée.
+            profile: Nom du profil de stockage (durable, balanced, flash).
+
+        Raises:
+            ValueError: Si le profil de stockage est inconnu.
 
         """
         self.hass = hass
-        self.db_file = f"consommation_saur_{entry_id}.db"
+        self.db_file = db_file or legacy_db_file(entry_id)
         self.db_path = hass.config.path(self.db_file)
+        self.storage_profile = get_profile(profile)
+        self._connections: SaurConnectionManager | None = None
+        self._worker = SaurDatabaseWorker(f"eyeonsaur_db_{entry_id}")
+        self.history_cache = SaurHistoryCache(DB_CACHE_MAX_BYTES)
+        self.prefix_index = SaurPrefixIndex()
+        self.write_buffer = SaurWriteBuffer(
+            DB_WRITE_BUFFER_ROWS, DB_WRITE_BUFFER_DELAY
+        )
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._last_maintenance: datetime | None = None
+        self._rebuild_months: dict[SectionId, set[tuple[int, int]]] = {}
+
+    def _get_connections(self) -> SaurConnectionManager:
+        """Retourne le gestionnaire de connexions, ouvert si besoin."""
+        if self._connections is None:
+            self._connections = SaurConnectionManager(
+                self.db_path, self.storage_profile
+            )
+        if not self._connections.is_open:
+            self._connections.open()
+        return self._connections
+
+    @property
+    def worker_stats(self) -> SaurWorkerStats:
+        """Profondeur de file et latences du thread base de données."""
+        return self._worker.stats
+
+    async def async_close(self) -> None:
+        """Vide le tampon, ferme les connexions et arrête le thread."""
+        self._cancel_flush()
+        if self.write_buffer and self._connections is not None:
+            try:
+                await self.async_flush()
+            except SaurDatabaseError:
+                _LOGGER.exception(
+                    "%s consommations en attente perdues à la fermeture",
+                    len(self.write_buffer),
+                )
+        if self._connections is not None:
+            connections, self._connections = self._connections, None
+            await self._worker.async_submit(connections.close)
+            _LOGGER.debug("Connexions à %s fermées", self.db_path)
+        await self._worker.async_stop()
+
+    async def _async_submit(self, job: Callable[[], _T]) -> _T:
+        """Exécute un traitement SQLite sur le thread base de données.
+
+        Args:
+            job: Fonction sans argument, appelée dans le thread.
+
+        Returns:
+            La valeur renvoyée par job.
+
+        Raises:
+            SaurDatabaseError: En cas d'erreur SQLite.
+
+        """
+
+        def run() -> _T:
+            """Exécute le traitement et traduit les erreurs SQLite."""
+            try:
+                return job()
+            except sqlite3.Error as err:
+                _LOGGER.exception("Erreur SQLite: %s", err)
+                raise SaurDatabaseError(
+                    f"Erreur de base de données: {err}"
+                ) from err
+
+        return await self._worker.async_submit(run)
 
     async def _async_execute_query(
         self,
@@ -48,6 +362,8 @@ class SaurDatabaseHelper:
     ) -> SaurSqliteResponse:
         """Exécute une requête SQL de manière asynchrone.
 
+        La requête est validée immédiatement.
+
         Args:
             query: La requête SQL à exécuter.
             params: Les paramètres à passer à la requête.
@@ -63,127 +379,618 @@ class SaurDatabaseHelper:
 
         def execute() -> SaurSqliteResponse:
             """Exécute la requête SQL dans un thread."""
-            try:
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.row_factory = sqlite3.Row
-                    cursor = conn.cursor()
-                    _LOGGER.debug(
-                        "Exécution de la requête SQL: %s avec params : %s",
-                        query,
-                        params,
-                    )
-                    cursor.execute(query, params)
-                    conn.commit()
+            with self._get_connections().connection() as conn:
+                _LOGGER.debug(
+                    "Exécution de la requête SQL: %s avec params : %s",
+                    query,
+                    params,
+                )
+                with conn:
+                    cursor = conn.execute(query, params)
                     result = cursor.fetchall()
-                    return tuple(result) if result else None
+                return tuple(result) if result else None
 
-            except sqlite3.Error as err:
-                _LOGGER.exception("Erreur SQLite: %s", err)
-                raise SaurDatabaseError(
-                    f"Erreur de base de données: {err}"
-                ) from err
+        return await self._async_submit(execute)
 
-        return await self.hass.async_add_executor_job(execute)
+    async def _async_read_query(
+        self,
+        query: str,
+        params: Sequence[Any] = (),
+    ) -> SaurSqliteResponse:
+        """Exécute une requête SQL en lecture de manière asynchrone.
+
+        Args:
+            query: La requête SQL (SELECT) à exécuter.
+            params: Les paramètres à passer à la requête.
+
+        Returns:
+            Les résultats de la requête, si applicables.
+
+        Raises:
+            SaurDatabaseError: En cas d'erreur lors de l'exécution
+                               de la requête.
+
+        """
+
+        def execute() -> SaurSqliteResponse:
+            """Exécute la lecture SQL dans un thread."""
+            with self._get_connections().connection() as conn:
+                _LOGGER.debug("Lecture SQL: %s avec params : %s", query, params)
+                result = conn.execute(query, params).fetchall()
+                return tuple(result) if result else None
+
+        return await self._async_submit(execute)
+
+    async def _async_read_transaction(
+        self, work: Callable[[sqlite3.Connection], _T]
+    ) -> _T:
+        """Exécute un traitement en lecture, hors transaction d'écriture.
+
+        Args:
+            work: Fonction recevant la connexion ; elle est appelée dans
+                  le thread base de données.
+
+        Returns:
+            La valeur renvoyée par work.
+
+        Raises:
+            SaurDatabaseError: En cas d'erreur SQLite.
+
+        """
+
+        def execute() -> _T:
+            """Exécute le traitement dans un thread."""
+            with self._get_connections().connection() as conn:
+                return work(conn)
+
+        return await self._async_submit(execute)
+
+    async def _async_write_transaction(
+        self, work: Callable[[sqlite3.Connection], _T]
+    ) -> _T:
+        """Exécute un traitement d'écriture dans une seule transaction.
+
+        Args:
+            work: Fonction recevant la connexion ; elle est appelée dans
+                  le thread base de données et validée en un seul commit.
+
+        Returns:
+            La valeur renvoyée par work.
+
+        Raises:
+            SaurDatabaseError: En cas d'erreur SQLite, la transaction
+                               est annulée.
+
+        """
+
+        def execute() -> _T:
+            """Exécute le traitement dans un thread."""
+            with self._get_connections().connection() as conn, conn:
+                return work(conn)
+
+        return await self._async_submit(execute)
 
     async def async_init_db(self) -> None:
-        """Initialise la base de données si elle n'existe pas."""
+        """Initialise la base de données et applique les migrations."""
         _LOGGER.debug(
             "Création/Mise à jour de la base de données à %s", self.db_path
         )
-        await self._async_execute_query(
-            """
-            CREATE TABLE IF NOT EXISTS consumptions (
-                date TEXT NOT NULL,
-                section_id TEXT NOT NULL,
-                relative_value REAL NOT NULL,
-                is_ancre INTEGER NOT NULL DEFAULT 0,
-                PRIMARY KEY (date, section_id)
-            );
-            """,
+        # Les sommes préfixes sont reconstruites depuis la base
+        await self._async_flush_pending()
+        version = await self._async_write_transaction(sync_migrate)
+        _LOGGER.debug("Schéma de la base en version %s", version)
+        self.history_cache.clear()
+        self.prefix_index = await self._async_write_transaction(
+            sync_build_prefix_index
         )
-        await self._async_execute_query(
-            """
-            CREATE TABLE IF NOT EXISTS anchor_value (
-                date TEXT NOT NULL,
-                section_id TEXT NOT NULL,
-                value REAL NOT NULL,
-                PRIMARY KEY (date, section_id)
-            );
-            """,
+
+    async def async_check_integrity(self) -> IntegrityReport:
+        """Vérifie la base puis l'initialise, à appeler au démarrage.
+
+        Une base saine ne coûte qu'un PRAGMA quick_check et un parcours
+        des jours présents. Une base abîmée est mise en quarantaine et
+        son contenu lisible recopié dans une base neuve. Dans tous les
+        cas, l'index de couverture est aligné sur les jours présents et
+        les mois dont des jours ont disparu sont mis de côté pour
+        take_rebuild_months.
+
+        Returns:
+            Le bilan du contrôle.
+
+        """
+        await self._async_flush_pending()
+
+        def quick_check() -> list[str]:
+            """Contrôle la structure du fichier dans un thread."""
+            try:
+                with self._get_connections().connection() as conn:
+                    return sync_quick_check(conn)
+            except sqlite3.DatabaseError as err:
+                return [str(err)]
+
+        errors = await self._async_submit(quick_check)
+        quarantined: Path | None = None
+        damaged: list[str] = []
+        if errors:
+            _LOGGER.error(
+                "Base %s abîmée, mise en quarantaine : %s",
+                self.db_path,
+                "; ".join(errors[:5]),
+            )
+            if self._connections is not None:
+                connections, self._connections = self._connections, None
+                await self._worker.async_submit(connections.close)
+
+            def salvage() -> tuple[Path, list[str]]:
+                """Met la base de côté et sauve son contenu dans un thread."""
+                target = sync_quarantine(self.db_path, datetime.now())
+                with self._get_connections().connection() as conn:
+                    with conn:
+                        sync_migrate(conn)
+                    return target, sync_salvage(conn, target)
+
+            quarantined, damaged = await self._async_submit(salvage)
+
+        await self.async_init_db()
+        rebuild = await self._async_write_transaction(sync_check_consistency)
+        for section_id, months in rebuild.items():
+            self._rebuild_months.setdefault(section_id, set()).update(months)
+        report = IntegrityReport(
+            errors=tuple(errors),
+            quarantined=str(quarantined) if quarantined else None,
+            damaged_tables=tuple(damaged),
+            rebuild=rebuild,
         )
+        if rebuild:
+            _LOGGER.warning(
+                "Mois à relire depuis l'API : %s",
+                {
+                    section_id: len(months)
+                    for section_id, months in rebuild.items()
+                },
+            )
+        return report
+
+    def take_rebuild_months(
+        self, section_id: SectionId
+    ) -> list[tuple[int, int]]:
+        """Retire les mois (année, mois) à relire d'un compteur.
+
+        Returns:
+            Les mois, du plus récent au plus ancien.
+
+        """
+        return sorted(self._rebuild_months.pop(section_id, ()), reverse=True)
+
+    async def async_backup(self) -> Path:
+        """Sauvegarde la base.
+
+        Le tampon d'écriture est d'abord vidé. La copie est une tâche du
+        thread base de données, sur sa connexion : les écritures
+        attendent la fin de la copie, qui n'est donc jamais relancée.
+        Seules les DB_BACKUP_KEEP sauvegardes les plus récentes sont
+        conservées.
+
+        Returns:
+            Le chemin de la nouvelle sauvegarde.
+
+        """
+        await self._async_flush_pending()
+        when = datetime.now()
+
+        def backup() -> Path:
+            """Copie la base dans un thread."""
+            with self._get_connections().connection() as conn:
+                return sync_backup(conn, self.db_path, when)
+
+        snapshot = await self._async_submit(backup)
+        removed = await self.hass.async_add_executor_job(
+            sync_rotate, self.db_path, DB_BACKUP_KEEP
+        )
+        _LOGGER.info(
+            "Base sauvegardée dans %s (%s anciennes sauvegardes supprimées)",
+            snapshot,
+            len(removed),
+        )
+        return snapshot
+
+    async def async_backup_if_due(
+        self, interval: timedelta = DB_BACKUP_INTERVAL
+    ) -> Path | None:
+        """Sauvegarde la base si la dernière sauvegarde est trop ancienne.
+
+        Args:
+            interval: Âge à partir duquel une sauvegarde est refaite.
+
+        Returns:
+            Le chemin de la nouvelle sauvegarde, ou None si aucune
+            n'était nécessaire.
+
+        """
+        latest = await self.hass.async_add_executor_job(
+            latest_backup_time, self.db_path
+        )
+        if latest is not None and datetime.now() - latest < interval:
+            return None
+        return await self.async_backup()
+
+    async def async_restore(self, snapshot: Path | None = None) -> Path:
+        """Restaure la base depuis une sauvegarde.
+
+        Les consommations en attente d'écriture sont abandonnées, les
+        connexions fermées le temps de la restauration puis la base est
+        réinitialisée (migrations, sommes préfixes).
+
+        Args:
+            snapshot: La sauvegarde à restaurer ; par défaut la plus
+                      récente qui passe PRAGMA quick_check.
+
+        Returns:
+            Le chemin de la sauvegarde restaurée.
+
+        Raises:
+            SaurDatabaseError: Si aucune sauvegarde valide n'est
+                               disponible.
+
+        """
+        candidates = (
+            [snapshot]
+            if snapshot is not None
+            else await self.hass.async_add_executor_job(
+                list_backups, self.db_path
+            )
+        )
+        for candidate in candidates:
+            if await self.hass.async_add_executor_job(sync_check, candidate):
+                break
+        else:
+            raise SaurDatabaseError("Aucune sauvegarde valide à restaurer")
+
+        self._cancel_flush()
+        if dropped := self.write_buffer.drain():
+            _LOGGER.warning(
+                "%s consommations en attente abandonnées par la restauration",
+                sum(len(rows) for rows in dropped.values()),
+            )
+        if self._connections is not None:
+            connections, self._connections = self._connections, None
+            await self._worker.async_submit(connections.close)
+
+        def restore() -> None:
+            """Restaure la sauvegarde dans un thread."""
+            sync_restore(candidate, self.db_path)
+
+        await self._async_submit(restore)
+        await self.async_init_db()
+        _LOGGER.warning("Base restaurée depuis %s", candidate)
+        return candidate
+
+    async def async_compact(
+        self, today: date | None = None
+    ) -> MaintenanceReport:
+        """Archive les années closes puis compacte la base.
+
+        Les années terminées depuis plus de DB_ARCHIVE_GRACE sont
+        compressées dans consumption_archive ; la base est ensuite
+        reconstruite (VACUUM) et ses statistiques mises à jour (ANALYZE).
+        Les lectures décodent les archives sans changement visible.
+
+        Args:
+            today: Date du jour, par défaut la date courante.
+
+        Returns:
+            Le bilan de l'archivage et l'espace récupéré.
+
+        """
+        await self._async_flush_pending()
+        before_day = to_epoch_day((today or date.today()) - DB_ARCHIVE_GRACE)
+        now = datetime.now()
+
+        def size(conn: sqlite3.Connection) -> int:
+            """Taille de la base en octets."""
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            return int(page_count * page_size)
+
+        def compact() -> MaintenanceReport:
+            """Archive puis compacte dans un thread."""
+            with self._get_connections().connection() as conn:
+                size_before = size(conn)
+                with conn:
+                    archived = sync_compact(conn, before_day)
+                    # Conservée en base : un redémarrage ne relance pas VACUUM
+                    sync_set_meta(conn, _LAST_MAINTENANCE, now.isoformat())
+                # VACUUM ne peut pas s'exécuter dans une transaction
+                conn.execute("VACUUM")
+                conn.execute("ANALYZE")
+                # En mode WAL, rend au disque l'espace du journal
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                return MaintenanceReport(
+                    archived_years=archived.years,
+                    archived_days=archived.days,
+                    size_before=size_before,
+                    size_after=size(conn),
+                )
+
+        report = await self._async_submit(compact)
+        self._last_maintenance = now
+        _LOGGER.info(
+            "Maintenance de %s : %s années archivées (%s jours), "
+            "%s octets récupérés",
+            self.db_path,
+            report.archived_years,
+            report.archived_days,
+            report.reclaimed,
+        )
+        return report
+
+    async def async_maintenance_if_due(
+        self, interval: timedelta = DB_MAINTENANCE_INTERVAL
+    ) -> MaintenanceReport | None:
+        """Lance async_compact si la base est inactive et la maintenance due.
+
+        La date de la dernière maintenance est conservée en base, de sorte
+        qu'un redémarrage ne la rend pas due.
+
+        Args:
+            interval: Écart minimal entre deux maintenances.
+
+        Returns:
+            Le bilan de la maintenance, ou None si elle n'a pas eu lieu.
+
+        """
+        if self.write_buffer or self._worker.stats.queue_depth:
+            return None
+        if self._last_maintenance is None:
+            stored = await self._async_read_transaction(
+                lambda conn: sync_get_meta(conn, _LAST_MAINTENANCE)
+            )
+            if stored is not None:
+                self._last_maintenance = datetime.fromisoformat(stored)
+        if (
+            self._last_maintenance is not None
+            and datetime.now() - self._last_maintenance < interval
+        ):
+            return None
+        return await self.async_compact()
+
+    async def async_import_database(self, path: str) -> list[SectionId]:
+        """Fusionne une autre base Saur dans celle-ci.
+
+        La base importée est d'abord migrée au schéma courant, puis
+        attachée à la connexion et fusionnée en une seule transaction.
+        Les sommes préfixes sont reconstruites.
+
+        Args:
+            path: Chemin de la base à importer ; elle n'est pas modifiée
+                  au-delà de sa migration.
+
+        Returns:
+            Les compteurs importés.
+
+        """
+        await self._async_flush_pending()
+
+        def import_database() -> list[SectionId]:
+            """Migre puis fusionne la base dans un thread."""
+            with (
+                closing(SaurConnectionManager.connect(path)) as legacy,
+                legacy,
+            ):
+                sync_migrate(legacy)
+            with self._get_connections().connection() as conn:
+                # ATTACH est interdit dans une transaction
+                conn.execute("ATTACH DATABASE ? AS imported", (path,))
+                try:
+                    with conn:
+                        return sync_import_attached(conn, "imported")
+                finally:
+                    conn.execute("DETACH DATABASE imported")
+
+        section_ids = await self._async_submit(import_database)
+        self.history_cache.clear()
+        self.prefix_index = await self._async_read_transaction(
+            sync_build_prefix_index
+        )
+        _LOGGER.info(
+            "Base %s importée dans %s : %s compteurs",
+            path,
+            self.db_path,
+            len(section_ids),
+        )
+        return section_ids
 
     async def async_write_consumptions(
         self, consumptions: ConsumptionDatas, section_id: SectionId
-    ) -> None:
+    ) -> ConsumptionWriteResult:
         """Écrit ou met à jour les consommations dans la base de données.
 
+        Toutes les lignes du lot, et celles du compteur encore dans le
+        tampon d'écriture, sont écrites dans une seule transaction ; les
+        jours dont la valeur est déjà connue ne sont pas réécrits. La
+        plage touchée est ajoutée au journal des modifications.
+
         Args:
             consumptions: Une liste de dictionnaires contenant les données
                           de consommation.
             section_id: L'identifiant unique du compteur.
 
+        Returns:
+            Le nombre de lignes insérées, mises à jour et inchangées.
+
         """
         _LOGGER.debug(
             "Début de la mise à jour des consommations dans la bdd pour %s",
             section_id,
         )
-        query = """
-            INSERT INTO consumptions (date, section_id,
-                relative_value, is_ancre)
-            VALUES (?, ?, ?, 0)
-            ON CONFLICT(date, section_id) DO UPDATE SET
-            relative_value = excluded.relative_value
-        """
+        pending = self.write_buffer.take(section_id)
+        if not self.write_buffer:
+            self._cancel_flush()
+        # Les valeurs du lot sont plus récentes que celles en attente
+        rows = {**pending, **_daily_rows(consumptions)}
 
-        count = 0
-        for conso in consumptions:
-            if conso.rangeType == "Day":
-                date_str = datetime.fromisoformat(conso.startDate).strftime(
-                    "%Y-%m-%d %H:%M:%S",
-                )
-                value = conso.value
-                _LOGGER.debug(
-                    "Préparation de l'insertion/mise à jour de la consommation"
-                    " pour date=%s, value=%s, section_id=%s",
-                    date_str,
-                    value,
-                    section_id,
-                )
-                await self._async_execute_query(
-                    query, (date_str, section_id, value)
-                )
-                count += 1
+        if not rows:
+            return ConsumptionWriteResult(inserted=0, updated=0, unchanged=0)
+
+        try:
+            result, changed = await self._async_write_transaction(
+                lambda conn: _sync_write_consumptions(conn, section_id, rows)
+            )
+        except SaurDatabaseError:
+            self.write_buffer.restore({section_id: pending})
+            raise
+        self._apply_written(section_id, changed)
         _LOGGER.debug(
-            "Mise à jour de %s consommations dans la base de données pour %s.",
-            count,
+            "Mise à jour des consommations pour %s : %s",
             section_id,
+            result,
         )
+        return result
+
+    async def async_buffer_consumptions(
+        self, consumptions: ConsumptionDatas, section_id: SectionId
+    ) -> None:
+        """Met des consommations en attente d'écriture.
+
+        Les jours sont regroupés en mémoire avec ceux déjà en attente,
+        puis écrits en une transaction lorsque le tampon est plein, au
+        bout de DB_WRITE_BUFFER_DELAY secondes, à la fermeture ou avant
+        la prochaine lecture en base. Les sommes préfixes en mémoire en
+        tiennent compte immédiatement.
+
+        Args:
+            consumptions: Les données de consommation.
+            section_id: L'identifiant unique du compteur.
+
+        """
+        rows = _daily_rows(consumptions)
+        if not rows:
+            return
+        self.write_buffer.add(section_id, rows)
+        self._apply_written(section_id, rows)
+        if self.write_buffer.is_full:
+            await self.async_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(
+                self.write_buffer.max_delay, self._scheduled_flush
+            )
+
+    async def async_flush(self) -> ConsumptionWriteResult:
+        """Écrit toutes les consommations en attente, en une transaction.
+
+        Returns:
+            Le bilan cumulé de l'écriture.
+
+        Raises:
+            SaurDatabaseError: En cas d'erreur SQLite ; les consommations
+                               restent alors en attente.
+
+        """
+        self._cancel_flush()
+        pending = self.write_buffer.drain()
+        if not pending:
+            return ConsumptionWriteResult(inserted=0, updated=0, unchanged=0)
+
+        def write(conn: sqlite3.Connection) -> dict[SectionId, _WriteOutcome]:
+            """Écrit les consommations de chaque compteur."""
+            return {
+                section_id: _sync_write_consumptions(conn, section_id, rows)
+                for section_id, rows in pending.items()
+            }
+
+        try:
+            written = await self._async_write_transaction(write)
+        except SaurDatabaseError:
+            self.write_buffer.restore(pending)
+            raise
+        inserted = updated = unchanged = 0
+        for section_id, (result, changed) in written.items():
+            self._apply_written(section_id, changed)
+            inserted += result.inserted
+            updated += result.updated
+            unchanged += result.unchanged
+        total = ConsumptionWriteResult(
+            inserted=inserted, updated=updated, unchanged=unchanged
+        )
+        _LOGGER.debug("Tampon d'écriture vidé : %s", total)
+        return total
+
+    def _cancel_flush(self) -> None:
+        """Annule le vidage programmé du tampon."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _scheduled_flush(self) -> None:
+        """Vide le tampon une fois le délai maximal écoulé."""
+        self._flush_handle = None
+        if self.write_buffer:
+            self.hass.async_create_task(self._async_flush_logged())
+
+    async def _async_flush_logged(self) -> None:
+        """Vide le tampon en journalisant une éventuelle erreur."""
+        try:
+            await self.async_flush()
+        except SaurDatabaseError:
+            _LOGGER.warning(
+                "Échec du vidage du tampon d'écriture, %s jours en attente",
+                len(self.write_buffer),
+            )
+
+    async def _async_flush_pending(self) -> None:
+        """Vide le tampon avant une lecture, pour lire ses propres écritures."""
+        if self.write_buffer:
+            await self.async_flush()
+
+    def _apply_written(
+        self, section_id: SectionId, changed: dict[int, int]
+    ) -> None:
+        """Reporte des jours modifiés sur les structures en mémoire."""
+        self.prefix_index.update(section_id, changed.items())
+        if changed:
+            self.history_cache.invalidate(
+                section_id, min(changed), max(changed)
+            )
 
     async def async_update_anchor(
         self, releve: RelevePhysique, section_id: SectionId
     ) -> None:
         """Met à jour la valeur d'ancrage dans la base de données.
 
+        Les relevés précédents sont conservés : seuls les segments de
+        l'index absolu voisins du nouveau relevé sont recalculés. Un
+        relevé identique à celui déjà connu n'est pas réécrit.
+
         Args:
             releve: Les données du relevé physique.
             section_id: L'identifiant unique du compteur.
 
         """
-        reading_date = datetime.fromisoformat(releve.date)
-        index_value = releve.valeur
-        query = """
-            INSERT INTO anchor_value (date, section_id, value)
-            VALUES (?, ?, ?)
-            ON CONFLICT(date, section_id) DO UPDATE SET value = excluded.value
-           """
-        await self._async_execute_query(
-            query,
-            (
-                reading_date.strftime("%Y-%m-%d %H:%M:%S"),
-                section_id,
-                index_value,
-            ),
-        )
+        reading_day = to_epoch_day(releve.date)
+        index_litres = to_litres(releve.valeur)
+        if self.prefix_index.anchor_at(section_id, reading_day) == index_litres:
+            _LOGGER.debug("Ancre inchangée pour %s", section_id)
+            return
+
+        def write(conn: sqlite3.Connection) -> None:
+            """Écrit l'ancre puis recalcule les segments voisins."""
+            conn.execute(
+                """
+                INSERT INTO anchor_value (section_id, day, litres)
+                VALUES (?, ?, ?)
+                ON CONFLICT(section_id, day) DO UPDATE SET
+                litres = excluded.litres
+                """,
+                (section_id, reading_day, index_litres),
+            )
+            dirty = sync_refresh_absolute_index(
+                conn, section_id, (), anchor_days=(reading_day,)
+            )
+            if dirty is not None:
+                sync_record_change(conn, section_id, dirty)
+
+        await self._async_write_transaction(write)
+        self.prefix_index.set_anchor(section_id, reading_day, index_litres)
 
         _LOGGER.info(
             "Ancre mise à jour dans la base de données pour %s.", section_id
@@ -194,6 +1001,10 @@ class SaurDatabaseHelper:
     ) -> float:
         """Récupère la consommation totale jusqu'à une date donnée.
 
+        La valeur est calculée sur les sommes préfixes en mémoire,
+        sans requête SQL : dernière ancre plus les consommations des
+        jours suivants jusqu'à la date cible.
+
         Args:
             target_date: La date cible pour calculer la consommation totale.
             section_id: L'identifiant unique du compteur.
@@ -202,97 +1013,288 @@ class SaurDatabaseHelper:
             La consommation totale.
 
         """
-        query = """
-           SELECT
-                COALESCE(
-                (
-                    SELECT value
-                    FROM anchor_value
-                    WHERE section_id = ?
-                    ORDER BY date DESC
-                    LIMIT 1
-                ), 0
-                )
-                + COALESCE(
-                    (
-                        SELECT SUM(relative_value)
-                        FROM consumptions
-                        WHERE date > (
-                            SELECT date
-                            FROM anchor_value
-                            WHERE section_id = ?
-                            ORDER BY date DESC
-                            LIMIT 1
-                        )
-                        AND date <= ?
-                        AND section_id = ?
-                        AND is_ancre = 0
-                    ),
-                0)
+        return from_litres(
+            self.prefix_index.total_at(section_id, to_epoch_day(target_date))
+        )
+
+    async def async_get_total_consumptions(
+        self,
+        target_dates: Sequence[date],
+        section_ids: Sequence[SectionId],
+    ) -> dict[SectionId, list[float]]:
+        """Variante groupée de async_get_total_consumption.
+
+        Toutes les dates sont traitées en une passe par compteur sur les
+        sommes préfixes en mémoire, sans requête SQL.
+
+        Args:
+            target_dates: Les dates cibles, triées par ordre croissant.
+            section_ids: Les identifiants des compteurs.
+
+        Returns:
+            Pour chaque compteur, les totaux dans l'ordre des dates.
+
+        Raises:
+            ValueError: Si les dates ne sont pas triées.
+
+        """
+        days = [to_epoch_day(target_date) for target_date in target_dates]
+        return {
+            section_id: [
+                from_litres(total)
+                for total in self.prefix_index.totals_at(section_id, days)
+            ]
+            for section_id in section_ids
+        }
+
+    def get_range_consumption(
+        self, section_id: SectionId, start: date, end: date
+    ) -> float:
+        """Consommation d'un compteur entre deux dates incluses, en m³.
+
+        Calculée sur les sommes préfixes en mémoire, sans requête SQL.
+        """
+        return from_litres(
+            self.prefix_index.range_sum(
+                section_id, to_epoch_day(start), to_epoch_day(end)
+            )
+        )
+
+    def get_index_at(self, section_id: SectionId, day: date) -> float | None:
+        """Valeur d'index reconstituée à une date, en m³.
+
+        Calculée sur les sommes préfixes en mémoire, sans requête SQL ;
+        None si aucun relevé physique n'est connu pour ce compteur.
+        """
+        litres = self.prefix_index.index_at(section_id, to_epoch_day(day))
+        return None if litres is None else from_litres(litres)
+
+    async def async_get_consumption_summary(
+        self, section_id: SectionId, start: date, end: date
+    ) -> ConsumptionSummary:
+        """Synthèse des consommations entre deux dates incluses.
+
+        La plage est couverte par les agrégats annuels, mensuels puis
+        hebdomadaires entiers qu'elle contient, complétés par les jours
+        restants : quelques lignes suffisent même sur plusieurs années.
+
+        Args:
+            section_id: L'identifiant unique du compteur.
+            start: Premier jour de la plage.
+            end: Dernier jour de la plage.
+
+        Returns:
+            Le total, le nombre de jours connus et les extrêmes
+            journaliers.
+
         """
-        result = await self._async_execute_query(
-            query,
-            (
-                section_id,
-                section_id,
-                target_date.strftime("%Y-%m-%d %H:%M:%S"),
-                section_id,
-            ),
+        await self._async_flush_pending()
+        first_day, last_day = to_epoch_day(start), to_epoch_day(end)
+        litres, days, minimum, maximum = await self._async_read_transaction(
+            lambda conn: sync_summarize(conn, section_id, first_day, last_day)
+        )
+        return ConsumptionSummary(
+            volume=from_litres(litres),
+            days=days,
+            min_volume=None if minimum is None else from_litres(minimum),
+            max_volume=None if maximum is None else from_litres(maximum),
         )
-        return float(result[0][0]) if result and result[0] else 0.0
+
+    async def async_get_missing(
+        self, section_id: SectionId, start: date, end: date
+    ) -> DayIntervals:
+        """Jours absents de la base entre deux dates incluses.
+
+        Calculé sur l'index de couverture : une ligne et quelques
+        opérations de bits par mois. Les mois blacklistés sont ignorés.
+
+        Args:
+            section_id: L'identifiant unique du compteur.
+            start: Premier jour de la plage.
+            end: Dernier jour de la plage.
+
+        Returns:
+            Les jours manquants.
+
+        """
+        await self._async_flush_pending()
+        first_day, last_day = to_epoch_day(start), to_epoch_day(end)
+        return await self._async_read_transaction(
+            lambda conn: sync_get_missing(conn, section_id, first_day, last_day)
+        )
+
+    async def async_is_month_complete(
+        self, section_id: SectionId, year: int, month: int
+    ) -> bool:
+        """Indique si tous les jours d'un mois sont en base, non estimés."""
+        await self._async_flush_pending()
+        return await self._async_read_transaction(
+            lambda conn: sync_is_month_complete(conn, section_id, year, month)
+        )
+
+    async def async_set_month_flags(
+        self,
+        section_id: SectionId,
+        year: int,
+        month: int,
+        flags: CoverageFlag,
+    ) -> None:
+        """Ajoute des indicateurs (blacklisté, estimé) à un mois."""
+        await self._async_write_transaction(
+            lambda conn: sync_set_flags(conn, section_id, year, month, flags)
+        )
+
+    async def async_clear_month_flags(
+        self,
+        section_id: SectionId,
+        year: int,
+        month: int,
+        flags: CoverageFlag,
+    ) -> None:
+        """Retire des indicateurs (blacklisté, estimé) d'un mois."""
+        await self._async_write_transaction(
+            lambda conn: sync_clear_flags(conn, section_id, year, month, flags)
+        )
+
+    async def async_get_flagged_months(
+        self, section_id: SectionId, flags: CoverageFlag
+    ) -> list[tuple[int, int]]:
+        """Mois (année, mois) d'un compteur portant l'un des indicateurs."""
+        return await self._async_read_transaction(
+            lambda conn: sync_get_flagged_months(conn, section_id, flags)
+        )
+
+    async def async_get_gaps(self, section_id: SectionId) -> DayIntervals:
+        """Trous dans l'historique des consommations d'un compteur.
+
+        Les trous sont détectés par SQLite, en comparant chaque jour au
+        précédent (LAG) le long de la clé (section_id, day) ; seules les
+        bornes sont renvoyées. Le résultat reste en cache jusqu'à la
+        prochaine écriture sur le compteur.
+
+        Args:
+            section_id: L'identifiant unique du compteur.
+
+        Returns:
+            Les jours manquants entre le premier et le dernier jour
+            connus.
+
+        """
+        await self._async_flush_pending()
+        key = (section_id, "gaps")
+        cached: DayIntervals | None = self.history_cache.get(key)
+        if cached is not None:
+            return DayIntervals(cached)
+        generation = self.history_cache.generation(section_id)
+
+        results = await self._async_read_query(
+            """
+            SELECT previous_day + 1, day - 1 FROM (
+                SELECT day, LAG(day) OVER (ORDER BY day) AS previous_day
+                FROM daily_consumptions
+                WHERE section_id = ?
+            )
+            WHERE day - previous_day > 1
+            """,
+            (section_id,),
+        )
+        gaps = DayIntervals(
+            (first_day, last_day) for first_day, last_day in results or ()
+        )
+        self.history_cache.put(
+            key,
+            gaps,
+            section_id=section_id,
+            days=(None, None),
+            generation=generation,
+        )
+        return DayIntervals(gaps)
+
+    async def async_get_changes(self, consumer: str) -> ChangeSet:
+        """Plages de jours modifiées depuis le curseur d'un consommateur.
+
+        Un consommateur sans curseur reçoit tout l'historique de chaque
+        compteur. Une fois les plages traitées, il appelle
+        async_ack_changes avec le numéro renvoyé.
+
+        Args:
+            consumer: Nom du consommateur, par exemple "recorder".
+
+        Returns:
+            Les plages modifiées par compteur et le numéro de la dernière
+            entrée du journal.
+
+        """
+        await self._async_flush_pending()
+        return await self._async_read_transaction(
+            lambda conn: sync_get_changes(conn, consumer)
+        )
+
+    async def async_ack_changes(self, consumer: str, seq: int) -> None:
+        """Avance le curseur d'un consommateur jusqu'à seq inclus."""
+        await self._async_write_transaction(
+            lambda conn: sync_ack_changes(conn, consumer, seq)
+        )
+
+    async def async_reset_cursor(self, consumer: str) -> None:
+        """Oublie le curseur d'un consommateur (retraitement complet)."""
+        await self._async_write_transaction(
+            lambda conn: sync_reset_cursor(conn, consumer)
+        )
+
+    def _index_litres(
+        self, section_id: SectionId, row: sqlite3.Row
+    ) -> int | None:
+        """Index en litres d'une ligne jointe à absolute_index.
+
+        Les jours archivés n'ont pas de ligne dans absolute_index : leur
+        index est reconstitué par les sommes préfixes.
+        """
+        if (index_litres := row["index_litres"]) is not None:
+            return index_litres
+        return self.prefix_index.index_at(section_id, row["day"])
 
     async def async_get_all_consumptions_with_absolute(
         self, section_id: SectionId
     ) -> TheoreticalConsumptionDatas:
         """
-        Récupère toutes les consommations avec leur valeur
-        absolue en utilisant une seule requête SQL.
+        Récupère toutes les consommations avec leur valeur absolue.
+
+        Les valeurs sont lues dans la table absolute_index, maintenue à
+        chaque écriture de consommation ou d'ancre ; celles des jours
+        archivés sont reconstituées par les sommes préfixes.
 
         Args:
             section_id: L'identifiant unique du compteur.
 
         Returns:
-            Une liste de TheoreticalConsumptionData.
+            Une liste de TheoreticalConsumptionData, du plus récent
+            au plus ancien.
         """
 
         _LOGGER.debug(
             "async_get_all_consumptions_with_absolute pour %s", section_id
         )
 
-        query = """
-            WITH Anchor AS (
-            SELECT date, value FROM anchor_value WHERE section_id = ?
-            ),
-            ConsumptionsWithCumulative AS (
-            SELECT
-                c.date,
-                c.relative_value,
-                SUM(c.relative_value) OVER (ORDER BY c.date ASC)
-                AS cumulative_relative
-            FROM consumptions c WHERE c.section_id = ?
-            ),
-            AbsoluteValues AS (
-            SELECT
-                cw.date, cw.relative_value,
-                CASE
-                WHEN cw.date = (SELECT date FROM Anchor)
-                THEN (SELECT value FROM Anchor)
-                ELSE (SELECT value FROM Anchor) + cw.cumulative_relative
-                - (SELECT cumulative_relative
-                    FROM ConsumptionsWithCumulative
-                    WHERE date = (SELECT date FROM Anchor))
-                END AS absolute_value
-            FROM ConsumptionsWithCumulative cw
-            )
-            SELECT date, relative_value, absolute_value FROM AbsoluteValues
-            ORDER BY date DESC;
-        """
-
-        results = await self._async_execute_query(
-            query, (section_id, section_id)
+        await self._async_flush_pending()
+        results = await self._async_read_query(
+            """
+            SELECT c.day, a.litres AS index_litres
+            FROM daily_consumptions c
+            LEFT JOIN absolute_index a
+                ON a.section_id = c.section_id AND a.day = c.day
+            WHERE c.section_id = ?
+            ORDER BY c.day DESC
+            """,
+            (section_id,),
         )
+        values = [
+            (row["day"], litres)
+            for row in results or ()
+            if (litres := self._index_litres(section_id, row)) is not None
+        ]
 
-        nb_results = len(results) if results else 0
+        nb_results = len(values)
         _LOGGER.debug(
             "Récupération de %s consommations avec les "
             "valeurs absolues pour %s.",
@@ -300,34 +1302,74 @@ class SaurDatabaseHelper:
             section_id,
         )
 
-        formatted_results: TheoreticalConsumptionDatas = (
-            TheoreticalConsumptionDatas([])
-        )  # Assuming this is how you create an empty object
+        return TheoreticalConsumptionDatas(
+            [
+                TheoreticalConsumptionData(
+                    date=epoch_day_to_strdate(day),
+                    indexValue=from_litres(litres),
+                )
+                for day, litres in values
+            ]
+        )
 
-        if results:
-            for row in results:
-                try:
-                    date_str: StrDate = StrDate(
-                        datetime.fromisoformat(row["date"]).strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        )
-                    )
-                    absolute_value: float = float(row["absolute_value"])
-
-                    data_point: TheoreticalConsumptionData = (
-                        TheoreticalConsumptionData(
-                            date=date_str, indexValue=absolute_value
-                        )
-                    )
-                    formatted_results.append(
-                        data_point
-                    )  # Assuming append is the correct method
-                except ValueError as e:
-                    print(f"⚠️ Date invalide détectée : {row['date']} -> {e}")
-                except Exception as e:
-                    print(
-                        "⚠️ Erreur lors de la création du "
-                        f"TheoreticalConsumptionData : {e}"
-                    )
-
-        return formatted_results
+    async def async_iter_consumptions(
+        self,
+        section_id: SectionId,
+        start: date | None = None,
+        end: date | None = None,
+        descending: bool = False,
+        chunk_size: int = DB_CHUNK_SIZE,
+    ) -> AsyncIterator[DailyConsumption]:
+        """Parcourt les consommations d'un compteur sur une période.
+
+        Les lignes sont lues par paquets de chunk_size, chaque paquet
+        repartant du dernier jour lu : la mémoire utilisée ne dépend pas
+        de la longueur de l'historique.
+
+        Args:
+            section_id: L'identifiant unique du compteur.
+            start: Premier jour inclus, None pour le début de l'historique.
+            end: Dernier jour inclus, None pour la fin de l'historique.
+            descending: True pour parcourir du plus récent au plus ancien.
+            chunk_size: Nombre de lignes lues par requête.
+
+        Yields:
+            Les DailyConsumption de la période, dans l'ordre demandé.
+
+        """
+        await self._async_flush_pending()
+        low = to_epoch_day(start) if start is not None else _MIN_DAY
+        high = to_epoch_day(end) if end is not None else _MAX_DAY
+        query = f"""
+            SELECT c.day, c.litres, a.litres AS index_litres
+            FROM daily_consumptions c
+            LEFT JOIN absolute_index a
+                ON a.section_id = c.section_id AND a.day = c.day
+            WHERE c.section_id = ? AND c.day BETWEEN ? AND ?
+            ORDER BY c.day {"DESC" if descending else "ASC"}
+            LIMIT ?
+        """  # noqa: S608
+
+        while low <= high:
+            rows = await self._async_read_query(
+                query, (section_id, low, high, chunk_size)
+            )
+            if not rows:
+                return
+            for row in rows:
+                index_litres = self._index_litres(section_id, row)
+                yield DailyConsumption(
+                    date=epoch_day_to_strdate(row["day"]),
+                    value=from_litres(row["litres"]),
+                    indexValue=(
+                        None
+                        if index_litres is None
+                        else from_litres(index_litres)
+                    ),
+                )
+            if len(rows) < chunk_size:
+                return
+            if descending:
+                high = rows[-1]["day"] - 1
+            else:
+                low = rows[-1]["day"] + 1
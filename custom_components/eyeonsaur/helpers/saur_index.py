@@ -0,0 +1,274 @@
+"""Maintenance de l'index absolu matérialisé des compteurs Saur.
+
+La table absolute_index contient, pour chaque compteur et chaque jour
+(jour epoch), la valeur d'index en litres reconstituée à partir des
+ancres (relevés physiques) et des consommations journalières. Les jours
+des années archivées n'y figurent pas. Ces fonctions s'exécutent sur la
+connexion d'écriture, dans la transaction qui modifie les données.
+"""
+
+import sqlite3
+from bisect import bisect_left
+from collections.abc import Collection
+from typing import Final
+
+from ..models import SectionId
+
+_MIN_DAY: Final = -(2**31)
+_MAX_DAY: Final = 2**31 - 1
+
+DayRange = tuple[int | None, int | None]
+"""Plage de jours epoch [début, fin] ; None pour une borne ouverte."""
+
+
+def merge_day_ranges(*ranges: DayRange | None) -> DayRange | None:
+    """Retourne la plus petite plage couvrant toutes les plages données."""
+    present = [day_range for day_range in ranges if day_range is not None]
+    if not present:
+        return None
+    starts = [start for start, _ in present]
+    ends = [end for _, end in present]
+    return (
+        None if None in starts else min(s for s in starts if s is not None),
+        None if None in ends else max(e for e in ends if e is not None),
+    )
+
+
+def spread_drift(drift: int, elapsed: int, span: int) -> int:
+    """Part de l'écart entre deux relevés imputée après elapsed jours.
+
+    L'écart est réparti linéairement sur les span jours du segment,
+    arrondi au litre le plus proche ; il est entièrement imputé au jour
+    du relevé suivant.
+    """
+    return (2 * drift * elapsed + span) // (2 * span)
+
+
+def sync_refresh_absolute_index(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    changed_days: Collection[int] | None = None,
+    anchor_days: Collection[int] = (),
+) -> DayRange | None:
+    """Recalcule la partie de l'index absolu touchée par une écriture.
+
+    L'index est reconstitué segment par segment entre les relevés
+    physiques (ancres) A_i aux jours a_i :
+
+    - avant la première ancre, en remontant depuis A_0 ;
+    - entre a_i et a_i+1, en avançant depuis A_i ; l'écart entre
+      A_i + consommations et A_i+1 est réparti linéairement sur le
+      segment, de sorte que l'index vaut exactement A_i+1 au jour a_i+1 ;
+    - après la dernière ancre, en avançant depuis celle-ci.
+
+    Modifier un jour ne touche donc que son segment (ou les jours qui le
+    précèdent avant la première ancre, qui le suivent après la
+    dernière), et une nouvelle ancre que les deux segments voisins.
+
+    Args:
+        conn: Connexion d'écriture, dans la transaction en cours.
+        section_id: L'identifiant unique du compteur.
+        changed_days: Jours de consommation modifiés ; None pour tout
+                      recalculer (reconstruction).
+        anchor_days: Jours des ancres ajoutées ou modifiées.
+
+    Returns:
+        La plage de jours recalculée, ou None si rien n'a changé.
+
+    """
+    anchors: list[tuple[int, int]] = [
+        (row["day"], row["litres"])
+        for row in conn.execute(
+            """
+            SELECT day, litres FROM anchor_value
+            WHERE section_id = ? ORDER BY day ASC
+            """,
+            (section_id,),
+        )
+    ]
+    if not anchors or changed_days is None:
+        conn.execute(
+            "DELETE FROM absolute_index WHERE section_id = ?", (section_id,)
+        )
+        if anchors:
+            _sync_refresh_range(conn, section_id, anchors, _MIN_DAY, _MAX_DAY)
+        return (None, None)
+
+    known = [day for day, _ in anchors]
+    ranges = [_range_for_day(known, day) for day in changed_days]
+    ranges += [_range_for_anchor(known, day) for day in anchor_days]
+    refreshed: list[DayRange] = []
+    for first, last in _merge_overlapping(ranges):
+        _sync_refresh_range(conn, section_id, anchors, first, last)
+        refreshed.append(
+            (
+                None if first == _MIN_DAY else first,
+                None if last == _MAX_DAY else last,
+            )
+        )
+    return merge_day_ranges(*refreshed)
+
+
+def _range_for_day(anchor_days: list[int], day: int) -> tuple[int, int]:
+    """Jours dont l'index dépend de la consommation du jour day."""
+    position = bisect_left(anchor_days, day)
+    if position == 0:
+        return _MIN_DAY, day
+    if position == len(anchor_days):
+        return day, _MAX_DAY
+    return anchor_days[position - 1] + 1, anchor_days[position]
+
+
+def _range_for_anchor(anchor_days: list[int], day: int) -> tuple[int, int]:
+    """Jours dont l'index dépend de l'ancre du jour day."""
+    position = bisect_left(anchor_days, day)
+    first = _MIN_DAY if position == 0 else anchor_days[position - 1] + 1
+    last = (
+        _MAX_DAY
+        if position + 1 >= len(anchor_days)
+        else anchor_days[position + 1]
+    )
+    return first, last
+
+
+def _merge_overlapping(
+    ranges: list[tuple[int, int]],
+) -> list[tuple[int, int]]:
+    """Fusionne les plages qui se chevauchent ou se touchent."""
+    merged: list[tuple[int, int]] = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def _sync_refresh_range(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    anchors: list[tuple[int, int]],
+    first: int,
+    last: int,
+) -> None:
+    """Recalcule l'index des jours [first, last], segment par segment."""
+    rows: list[tuple[SectionId, int, int]] = []
+    first_anchor_day = anchors[0][0]
+    if first <= first_anchor_day:
+        rows += _sync_compute_before(
+            conn, section_id, anchors[0], (first, min(last, first_anchor_day))
+        )
+    for anchor, following in zip(anchors, [*anchors[1:], None], strict=True):
+        start = max(first, anchor[0] + 1)
+        end = min(last, _MAX_DAY if following is None else following[0])
+        if start <= end:
+            rows += _sync_compute_segment(
+                conn, section_id, anchor, following, (start, end)
+            )
+    # Les sommes couvrent les archives, mais leurs jours ne sont pas stockés
+    archived = conn.execute(
+        """
+        SELECT first_day, first_day + days - 1 FROM consumption_archive
+        WHERE section_id = ?
+        """,
+        (section_id,),
+    ).fetchall()
+    if archived:
+        rows = [
+            row
+            for row in rows
+            if not any(low <= row[1] <= high for low, high in archived)
+        ]
+    _sync_store(conn, rows)
+
+
+def _sync_compute_before(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    anchor: tuple[int, int],
+    days: tuple[int, int],
+) -> list[tuple[SectionId, int, int]]:
+    """Index des jours days, tous antérieurs à la première ancre."""
+    anchor_day, anchor_litres = anchor
+    first, last = days
+    offset: int = conn.execute(
+        """
+        SELECT COALESCE(SUM(litres), 0) FROM daily_consumptions
+        WHERE section_id = ? AND day > ? AND day <= ?
+        """,
+        (section_id, last, anchor_day),
+    ).fetchone()[0]
+    value = anchor_litres - offset
+    rows: list[tuple[SectionId, int, int]] = []
+    for day, litres in conn.execute(
+        """
+        SELECT day, litres FROM daily_consumptions
+        WHERE section_id = ? AND day BETWEEN ? AND ?
+        ORDER BY day DESC
+        """,
+        (section_id, first, last),
+    ):
+        rows.append((section_id, day, value))
+        value -= litres
+    return rows
+
+
+def _sync_compute_segment(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    anchor: tuple[int, int],
+    following: tuple[int, int] | None,
+    days: tuple[int, int],
+) -> list[tuple[SectionId, int, int]]:
+    """Index des jours days, entre une ancre et la suivante."""
+    anchor_day, anchor_litres = anchor
+    first, last = days
+    offset: int = conn.execute(
+        """
+        SELECT COALESCE(SUM(litres), 0) FROM daily_consumptions
+        WHERE section_id = ? AND day > ? AND day < ?
+        """,
+        (section_id, anchor_day, first),
+    ).fetchone()[0]
+    drift = span = 0
+    if following is not None:
+        span = following[0] - anchor_day
+        drift = (
+            following[1]
+            - anchor_litres
+            - conn.execute(
+                """
+                SELECT COALESCE(SUM(litres), 0) FROM daily_consumptions
+                WHERE section_id = ? AND day > ? AND day <= ?
+                """,
+                (section_id, anchor_day, following[0]),
+            ).fetchone()[0]
+        )
+    value = anchor_litres + offset
+    rows: list[tuple[SectionId, int, int]] = []
+    for day, litres in conn.execute(
+        """
+        SELECT day, litres FROM daily_consumptions
+        WHERE section_id = ? AND day BETWEEN ? AND ?
+        ORDER BY day ASC
+        """,
+        (section_id, first, last),
+    ):
+        value += litres
+        correction = spread_drift(drift, day - anchor_day, span) if drift else 0
+        rows.append((section_id, day, value + correction))
+    return rows
+
+
+def _sync_store(
+    conn: sqlite3.Connection, rows: list[tuple[SectionId, int, int]]
+) -> None:
+    """Écrit les valeurs d'index recalculées."""
+    conn.executemany(
+        """
+        INSERT INTO absolute_index (section_id, day, litres)
+        VALUES (?, ?, ?)
+        ON CONFLICT(section_id, day) DO UPDATE SET litres = excluded.litres
+        """,
+        rows,
+    )
@@ -0,0 +1,175 @@
+"""Contrôle d'intégrité de la base Saur et sauvetage d'une base abîmée.
+
+Au démarrage, PRAGMA quick_check vérifie la structure du fichier. Une
+base abîmée est mise en quarantaine (renommée avec ses fichiers annexes)
+puis une base neuve est remplie de ce qui reste lisible : chaque table
+est relue dans l'ordre de sa clé puis dans l'ordre inverse, de sorte que
+seules les lignes des pages endommagées sont perdues. Les structures
+dérivées (index absolu, agrégats) sont reconstruites.
+
+Les archives et l'index de couverture sont ensuite confrontés aux jours
+réellement présents ; les mois dont des jours ont disparu sont relus
+depuis l'API Saur par le chemin de rattrapage habituel.
+"""
+
+import logging
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Final
+
+from ..models import SectionId
+from .saur_archive import sync_check_archives
+from .saur_coverage import sync_check_coverage
+from .saur_index import sync_refresh_absolute_index
+from .saur_journal import sync_record_change
+from .saur_rollup import sync_refresh_rollups
+
+_LOGGER = logging.getLogger(__name__)
+
+_SALVAGED_TABLES: Final[dict[str, tuple[str, ...]]] = {
+    "consumptions": ("section_id", "day", "litres"),
+    "consumption_archive": (
+        "section_id",
+        "year",
+        "first_day",
+        "days",
+        "litres",
+        "total",
+    ),
+    "anchor_value": ("section_id", "day", "litres"),
+    "coverage": ("section_id", "month", "days", "flags"),
+}
+"""Tables sauvées et leurs colonnes ; les deux premières forment la clé.
+
+Les tables dérivées sont reconstruites, le journal et les curseurs
+repartent de zéro.
+"""
+
+_SIDE_FILES: Final = ("-wal", "-shm", "-journal")
+
+
+def sync_quick_check(conn: sqlite3.Connection) -> list[str]:
+    """Erreurs relevées par PRAGMA quick_check ; vide si la base est saine."""
+    messages = [row[0] for row in conn.execute("PRAGMA quick_check")]
+    return [] if messages == ["ok"] else messages
+
+
+def sync_quarantine(db_path: str, when: datetime) -> Path:
+    """Met une base de côté avec ses fichiers annexes.
+
+    Aucune connexion ne doit être ouverte sur la base.
+
+    Returns:
+        Le chemin de la base mise en quarantaine.
+
+    """
+    target = Path(f"{db_path}.corrupt-{when.strftime('%Y%m%d-%H%M%S')}")
+    for suffix in _SIDE_FILES:
+        side = Path(f"{db_path}{suffix}")
+        if side.exists():
+            side.replace(f"{target}{suffix}")
+    Path(db_path).replace(target)
+    return target
+
+
+def _sync_read_salvageable(
+    conn: sqlite3.Connection, schema: str, table: str, columns: tuple[str, ...]
+) -> tuple[list[tuple], bool]:
+    """Lit les lignes lisibles d'une table abîmée.
+
+    Returns:
+        Les lignes lues et un booléen indiquant si la table est intacte.
+
+    """
+    rows: dict[tuple, tuple] = {}
+    for order in ("ASC", "DESC"):
+        try:
+            cursor = conn.execute(
+                f"""
+                SELECT {", ".join(columns)} FROM {schema}.{table}
+                ORDER BY 1 {order}, 2 {order}
+                """  # noqa: S608
+            )
+            # Ligne à ligne : un lot interrompu par une erreur serait perdu
+            for row in cursor:
+                rows[tuple(row[:2])] = tuple(row)
+        except sqlite3.DatabaseError as err:
+            _LOGGER.warning("Table %s abîmée (%s) : %s", table, order, err)
+        else:
+            return list(rows.values()), order == "ASC"
+    return list(rows.values()), False
+
+
+def sync_salvage(conn: sqlite3.Connection, damaged_path: Path) -> list[str]:
+    """Remplit une base neuve avec le contenu lisible d'une base abîmée.
+
+    Args:
+        conn: Connexion d'écriture sur la base neuve, migrée et hors
+              transaction (ATTACH y est interdit).
+        damaged_path: Chemin de la base mise en quarantaine.
+
+    Returns:
+        Les tables dont des lignes n'ont pas pu être relues.
+
+    """
+    try:
+        conn.execute("ATTACH DATABASE ? AS damaged", (str(damaged_path),))
+    except sqlite3.DatabaseError as err:
+        _LOGGER.error("Base %s illisible : %s", damaged_path, err)
+        return list(_SALVAGED_TABLES)
+
+    damaged: list[str] = []
+    salvaged: dict[str, list[tuple]] = {}
+    try:
+        # Toutes les lectures précèdent la transaction d'écriture
+        for table, columns in _SALVAGED_TABLES.items():
+            salvaged[table], intact = _sync_read_salvageable(
+                conn, "damaged", table, columns
+            )
+            if not intact:
+                damaged.append(table)
+        with conn:
+            for table, columns in _SALVAGED_TABLES.items():
+                conn.executemany(
+                    f"""
+                    INSERT OR IGNORE INTO main.{table} ({", ".join(columns)})
+                    VALUES ({", ".join("?" * len(columns))})
+                    """,  # noqa: S608
+                    salvaged[table],
+                )
+            for (section_id,) in conn.execute(
+                """
+                SELECT section_id FROM main.daily_consumptions
+                UNION SELECT section_id FROM main.anchor_value
+                """
+            ).fetchall():
+                sync_refresh_absolute_index(conn, SectionId(section_id))
+                sync_refresh_rollups(conn, SectionId(section_id))
+    finally:
+        conn.execute("DETACH DATABASE damaged")
+    return damaged
+
+
+def sync_check_consistency(
+    conn: sqlite3.Connection,
+) -> dict[SectionId, list[tuple[int, int]]]:
+    """Contrôle les archives et la couverture d'une base saine.
+
+    Les archives invalides sont supprimées et les structures dérivées de
+    leurs compteurs reconstruites ; l'index de couverture est aligné sur
+    les jours présents.
+
+    Args:
+        conn: Connexion d'écriture, dans la transaction en cours.
+
+    Returns:
+        Les mois (année, mois) à relire depuis l'API, par compteur.
+
+    """
+    for section_id in sync_check_archives(conn):
+        _LOGGER.warning("Archive invalide supprimée pour %s", section_id)
+        sync_refresh_absolute_index(conn, section_id)
+        sync_refresh_rollups(conn, section_id)
+        sync_record_change(conn, section_id, (None, None))
+    return sync_check_coverage(conn)
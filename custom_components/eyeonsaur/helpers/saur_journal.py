@@ -0,0 +1,157 @@
+"""Journal des modifications de la base Saur et curseurs des consommateurs.
+
+Chaque écriture ajoute au journal la plage de jours qu'elle a rendue
+obsolète pour un compteur (consommations, index absolu). Un consommateur
+(injection dans le recorder, caches...) conserve un curseur : le numéro
+de la dernière entrée qu'il a traitée. Il demande ce qui a changé
+depuis, le traite, puis avance son curseur ; les entrées lues par tous
+les consommateurs sont purgées.
+
+Un consommateur qui cesse d'acquitter ne bloque pas la purge : au-delà
+de DB_JOURNAL_MAX_ROWS entrées de retard, son curseur est oublié et il
+repartira de tout l'historique.
+"""
+
+import sqlite3
+from typing import NamedTuple
+
+from ..models import SectionId
+from .const import DB_JOURNAL_MAX_ROWS
+from .saur_index import DayRange, merge_day_ranges
+
+
+class ChangeSet(NamedTuple):
+    """Modifications survenues depuis le curseur d'un consommateur."""
+
+    seq: int
+    """Numéro de la dernière entrée couverte, à passer à l'acquittement."""
+    ranges: dict[SectionId, DayRange]
+    """Plage de jours modifiée, par compteur."""
+
+
+def sync_record_change(
+    conn: sqlite3.Connection, section_id: SectionId, days: DayRange
+) -> None:
+    """Ajoute une plage modifiée au journal, dans la transaction en cours."""
+    conn.execute(
+        """
+        INSERT INTO change_journal (section_id, first_day, last_day)
+        VALUES (?, ?, ?)
+        """,
+        (section_id, *days),
+    )
+    _sync_prune(conn)
+
+
+def sync_get_changes(conn: sqlite3.Connection, consumer: str) -> ChangeSet:
+    """Plages modifiées depuis le curseur d'un consommateur.
+
+    Un consommateur sans curseur n'a encore rien traité : tout
+    l'historique de chaque compteur connu lui est signalé.
+
+    Args:
+        conn: Connexion SQLite.
+        consumer: Nom du consommateur.
+
+    Returns:
+        Les plages fusionnées par compteur et le numéro de la dernière
+        entrée du journal.
+
+    """
+    last_seq = _sync_last_seq(conn)
+    row = conn.execute(
+        "SELECT seq FROM journal_cursors WHERE consumer = ?", (consumer,)
+    ).fetchone()
+    if row is None:
+        return ChangeSet(
+            last_seq,
+            {
+                SectionId(section_id): (None, None)
+                for (section_id,) in conn.execute(
+                    """
+                    SELECT DISTINCT section_id FROM daily_consumptions
+                    UNION
+                    SELECT DISTINCT section_id FROM anchor_value
+                    """
+                )
+            },
+        )
+
+    ranges: dict[SectionId, DayRange] = {}
+    for section_id, first_day, last_day in conn.execute(
+        """
+        SELECT section_id, first_day, last_day FROM change_journal
+        WHERE seq > ? AND seq <= ?
+        """,
+        (row[0], last_seq),
+    ):
+        merged = merge_day_ranges(ranges.get(section_id), (first_day, last_day))
+        if merged is not None:
+            ranges[SectionId(section_id)] = merged
+    return ChangeSet(last_seq, ranges)
+
+
+def sync_ack_changes(conn: sqlite3.Connection, consumer: str, seq: int) -> None:
+    """Avance le curseur d'un consommateur puis purge le journal.
+
+    Les entrées déjà traitées par tous les consommateurs sont supprimées.
+    Si des entrées postérieures à seq ont déjà été purgées (curseur
+    oublié entre la lecture et l'acquittement), le curseur n'est pas
+    posé : le consommateur repartira de tout l'historique.
+    """
+    conn.execute(
+        """
+        INSERT INTO journal_cursors (consumer, seq) VALUES (?, ?)
+        ON CONFLICT(consumer) DO UPDATE SET
+        seq = MAX(seq, excluded.seq)
+        """,
+        (consumer, seq),
+    )
+    # Le journal couvre sans trou les numéros postérieurs à sa purge
+    conn.execute(
+        """
+        DELETE FROM journal_cursors WHERE consumer = ? AND seq < (
+            SELECT COALESCE(MIN(seq) - 1, ?) FROM change_journal
+        )
+        """,
+        (consumer, _sync_last_seq(conn)),
+    )
+    _sync_prune(conn)
+
+
+def sync_reset_cursor(conn: sqlite3.Connection, consumer: str) -> None:
+    """Oublie le curseur d'un consommateur, qui repartira de zéro."""
+    conn.execute("DELETE FROM journal_cursors WHERE consumer = ?", (consumer,))
+    _sync_prune(conn)
+
+
+def _sync_last_seq(conn: sqlite3.Connection) -> int:
+    """Numéro de la dernière entrée du journal, même purgée."""
+    # Les numéros ne sont jamais réutilisés, même après une purge
+    return conn.execute(
+        """
+        SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence
+        WHERE name = 'change_journal'
+        """
+    ).fetchone()[0]
+
+
+def _sync_prune(conn: sqlite3.Connection) -> None:
+    """Purge les entrées lues par tous les consommateurs.
+
+    Les curseurs en retard de plus de DB_JOURNAL_MAX_ROWS entrées sont
+    d'abord oubliés. Sans curseur, aucune entrée n'est utile : un
+    nouveau consommateur reçoit tout l'historique.
+    """
+    last_seq = _sync_last_seq(conn)
+    conn.execute(
+        "DELETE FROM journal_cursors WHERE seq < ?",
+        (last_seq - DB_JOURNAL_MAX_ROWS,),
+    )
+    conn.execute(
+        """
+        DELETE FROM change_journal
+        WHERE seq <= COALESCE((SELECT MIN(seq) FROM journal_cursors), ?)
+        """,
+        (last_seq,),
+    )
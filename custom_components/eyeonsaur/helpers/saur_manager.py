@@ -0,0 +1,97 @@
+# pylint: disable=E0401
+"""Base de données partagée entre les entrées de configuration Saur.
+
+Toutes les entrées utilisent le même fichier, les mêmes connexions et
+le même thread d'écriture : les compteurs (section_id) sont uniques d'un
+compte Saur à l'autre et partitionnent déjà les tables. Les bases
+propres à une entrée, créées par les versions précédentes, sont
+fusionnées dans la base partagée à la première utilisation.
+
+Le partage est une option de l'entrée (ENTRY_SHARED_DATABASE), activée
+par défaut. Une entrée qui la désactive retrouve sa base propre, ou en
+crée une neuve dont l'historique est relu depuis l'API ; ses données
+restent dans la base partagée, qui les lui rendra si elle la réactive.
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+from .const import DB_SHARED_FILE
+from .saur_db import SaurDatabaseError, SaurDatabaseHelper, legacy_db_file
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SaurDatabaseManager:
+    """Distribue une base Saur unique aux entrées de configuration."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise le gestionnaire sans ouvrir la base.
+
+        Args:
+            hass: L'instance de Home Assistant.
+
+        """
+        self.hass = hass
+        self._helper: SaurDatabaseHelper | None = None
+        self._entries: set[str] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def entries(self) -> frozenset[str]:
+        """Entrées de configuration utilisant la base."""
+        return frozenset(self._entries)
+
+    async def async_acquire(self, entry_id: str) -> SaurDatabaseHelper:
+        """Retourne la base partagée pour une entrée de configuration.
+
+        La base est ouverte, vérifiée et migrée à la première demande ;
+        la base propre à l'entrée, si elle existe, y est alors fusionnée
+        puis renommée en .migrated.
+
+        Args:
+            entry_id: L'ID de l'entrée de configuration.
+
+        Returns:
+            Le SaurDatabaseHelper partagé.
+
+        """
+        async with self._lock:
+            if self._helper is None:
+                helper = SaurDatabaseHelper(
+                    self.hass, "shared", db_file=DB_SHARED_FILE
+                )
+                try:
+                    await helper.async_check_integrity()
+                except SaurDatabaseError:
+                    # La demande suivante reprendra le contrôle
+                    await helper.async_close()
+                    raise
+                self._helper = helper
+            helper = self._helper
+            legacy_path = Path(self.hass.config.path(legacy_db_file(entry_id)))
+            if await self.hass.async_add_executor_job(legacy_path.exists):
+                await helper.async_import_database(str(legacy_path))
+                await self.hass.async_add_executor_job(
+                    legacy_path.rename,
+                    legacy_path.with_name(f"{legacy_path.name}.migrated"),
+                )
+                _LOGGER.info(
+                    "Base de l'entrée %s fusionnée dans %s",
+                    entry_id,
+                    helper.db_path,
+                )
+            self._entries.add(entry_id)
+            return helper
+
+    async def async_release(self, entry_id: str) -> None:
+        """Libère la base pour une entrée ; la ferme après la dernière."""
+        async with self._lock:
+            self._entries.discard(entry_id)
+            if self._entries or self._helper is None:
+                return
+            helper, self._helper = self._helper, None
+            await helper.async_close()
@@ -0,0 +1,261 @@
+"""Sommes préfixes en mémoire des consommations journalières Saur.
+
+Pour chaque compteur, un arbre de Fenwick indexé par jour epoch répond
+aux sommes sur une plage de jours et aux valeurs d'index à une date en
+O(log n), sans requête SQL. Il est reconstruit depuis la base au
+démarrage puis tenu à jour après chaque écriture.
+"""
+
+import sqlite3
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from itertools import pairwise
+
+from ..models import SectionId
+from .saur_index import spread_drift
+
+
+class FenwickTree:
+    """Arbre de Fenwick (binary indexed tree) de sommes d'entiers."""
+
+    __slots__ = ("_tree",)
+
+    def __init__(self, values: Sequence[int] = ()) -> None:
+        """Construit l'arbre en O(n) à partir des valeurs initiales."""
+        tree = [0, *values]
+        size = len(tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def __len__(self) -> int:
+        """Nombre de positions."""
+        return len(self._tree) - 1
+
+    def add(self, position: int, delta: int) -> None:
+        """Ajoute delta à la valeur d'une position."""
+        size = len(self._tree)
+        i = position + 1
+        while i < size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, end: int) -> int:
+        """Somme des positions [0, end)."""
+        i = min(end, len(self._tree) - 1)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, start: int, end: int) -> int:
+        """Somme des positions [start, end)."""
+        if end <= start:
+            return 0
+        return self.prefix_sum(end) - self.prefix_sum(max(start, 0))
+
+
+class _MeterPrefixSums:
+    """Consommations d'un compteur, en litres, depuis first_day."""
+
+    __slots__ = ("first_day", "tree", "values")
+
+    def __init__(self, first_day: int, values: list[int]) -> None:
+        self.first_day = first_day
+        self.values = values
+        self.tree = FenwickTree(values)
+
+    def set(self, day: int, litres: int) -> None:
+        """Fixe la consommation d'un jour, en agrandissant si besoin."""
+        position = day - self.first_day
+        if position < 0:
+            # Jour rattrapé avant le début connu : reconstruction
+            self.values[:0] = [0] * -position
+            self.first_day = day
+            position = 0
+            self.values[0] = litres
+            self.tree = FenwickTree(self.values)
+            return
+        if position >= len(self.values):
+            # Capacité doublée pour amortir les ajouts en fin d'historique
+            capacity = max(position + 1, 2 * len(self.values))
+            self.values.extend([0] * (capacity - len(self.values)))
+            self.values[position] = litres
+            self.tree = FenwickTree(self.values)
+            return
+        delta = litres - self.values[position]
+        if delta:
+            self.values[position] = litres
+            self.tree.add(position, delta)
+
+    def sum_between(self, first_day: int, last_day: int) -> int:
+        """Somme des jours [first_day, last_day]."""
+        return self.tree.range_sum(
+            first_day - self.first_day, last_day - self.first_day + 1
+        )
+
+
+class SaurPrefixIndex:
+    """Sommes préfixes et ancres de chaque compteur."""
+
+    def __init__(self) -> None:
+        """Initialise un index vide."""
+        self._meters: dict[SectionId, _MeterPrefixSums] = {}
+        self._anchors: dict[SectionId, list[tuple[int, int]]] = {}
+
+    def __contains__(self, section_id: object) -> bool:
+        """Indique si le compteur a des consommations connues."""
+        return section_id in self._meters
+
+    def load(
+        self, section_id: SectionId, rows: Iterable[tuple[int, int]]
+    ) -> None:
+        """Remplace les consommations d'un compteur.
+
+        Args:
+            section_id: L'identifiant unique du compteur.
+            rows: Couples (jour epoch, litres), dans un ordre quelconque.
+
+        """
+        days = dict(rows)
+        if not days:
+            self._meters.pop(section_id, None)
+            return
+        first_day = min(days)
+        values = [0] * (max(days) - first_day + 1)
+        for day, litres in days.items():
+            values[day - first_day] = litres
+        self._meters[section_id] = _MeterPrefixSums(first_day, values)
+
+    def update(
+        self, section_id: SectionId, rows: Iterable[tuple[int, int]]
+    ) -> None:
+        """Applique des consommations écrites, en O(log n) par jour."""
+        meter = self._meters.get(section_id)
+        for day, litres in rows:
+            if meter is None:
+                meter = _MeterPrefixSums(day, [litres])
+                self._meters[section_id] = meter
+            else:
+                meter.set(day, litres)
+
+    def set_anchor(self, section_id: SectionId, day: int, litres: int) -> None:
+        """Enregistre ou remplace le relevé d'un jour."""
+        anchors = self._anchors.setdefault(section_id, [])
+        position = bisect_left(anchors, (day,))
+        if position < len(anchors) and anchors[position][0] == day:
+            anchors[position] = (day, litres)
+        else:
+            anchors.insert(position, (day, litres))
+
+    def anchor_at(self, section_id: SectionId, day: int) -> int | None:
+        """Relevé connu d'un jour, en litres, ou None."""
+        anchors = self._anchors.get(section_id, [])
+        position = bisect_left(anchors, (day,))
+        if position < len(anchors) and anchors[position][0] == day:
+            return anchors[position][1]
+        return None
+
+    def range_sum(
+        self, section_id: SectionId, first_day: int, last_day: int
+    ) -> int:
+        """Consommation en litres des jours [first_day, last_day]."""
+        meter = self._meters.get(section_id)
+        if meter is None:
+            return 0
+        return meter.sum_between(first_day, last_day)
+
+    def total_at(self, section_id: SectionId, day: int) -> int:
+        """Ancre la plus récente plus les consommations jusqu'à day.
+
+        Même résultat que la requête historique : seuls les jours après
+        l'ancre s'ajoutent, un jour antérieur vaut donc l'ancre.
+        """
+        anchors = self._anchors.get(section_id)
+        if not anchors:
+            return 0
+        anchor_day, anchor_litres = anchors[-1]
+        return anchor_litres + self.range_sum(section_id, anchor_day + 1, day)
+
+    def totals_at(
+        self, section_id: SectionId, days: Sequence[int]
+    ) -> list[int]:
+        """Valeurs de total_at pour des jours croissants, en une passe.
+
+        Chaque total est déduit du précédent par la somme des jours qui
+        les séparent.
+
+        Raises:
+            ValueError: Si les jours ne sont pas triés.
+
+        """
+        if any(following < day for day, following in pairwise(days)):
+            raise ValueError("Les jours doivent être triés")
+        anchors = self._anchors.get(section_id)
+        if not anchors:
+            return [0] * len(days)
+        previous, total = anchors[-1]
+        totals: list[int] = []
+        for day in days:
+            if day > previous:
+                total += self.range_sum(section_id, previous + 1, day)
+                previous = day
+            totals.append(total)
+        return totals
+
+    def index_at(self, section_id: SectionId, day: int) -> int | None:
+        """Valeur d'index reconstituée à un jour, comme absolute_index.
+
+        Returns:
+            L'index en litres, ou None sans relevé pour ce compteur.
+
+        """
+        anchors = self._anchors.get(section_id)
+        if not anchors:
+            return None
+        position = bisect_left(anchors, (day,))
+        if position == 0:
+            anchor_day, anchor_litres = anchors[0]
+            return anchor_litres - self.range_sum(
+                section_id, day + 1, anchor_day
+            )
+        anchor_day, anchor_litres = anchors[position - 1]
+        value = anchor_litres + self.range_sum(section_id, anchor_day + 1, day)
+        if position == len(anchors):
+            return value
+        next_day, next_litres = anchors[position]
+        drift = (
+            next_litres
+            - anchor_litres
+            - self.range_sum(section_id, anchor_day + 1, next_day)
+        )
+        return value + spread_drift(
+            drift, day - anchor_day, next_day - anchor_day
+        )
+
+
+def sync_build_prefix_index(conn: sqlite3.Connection) -> SaurPrefixIndex:
+    """Construit l'index des sommes préfixes depuis la base."""
+    prefix_index = SaurPrefixIndex()
+    current: SectionId | None = None
+    rows: list[tuple[int, int]] = []
+    for section_id, day, litres in conn.execute(
+        "SELECT section_id, day, litres FROM daily_consumptions "
+        "ORDER BY section_id, day"
+    ):
+        if section_id != current:
+            if current is not None:
+                prefix_index.load(current, rows)
+            current, rows = SectionId(section_id), []
+        rows.append((day, litres))
+    if current is not None:
+        prefix_index.load(current, rows)
+
+    for section_id, day, litres in conn.execute(
+        "SELECT section_id, day, litres FROM anchor_value"
+    ):
+        prefix_index.set_anchor(SectionId(section_id), day, litres)
+    return prefix_index
@@ -0,0 +1,210 @@
+"""Agrégats hebdomadaires, mensuels et annuels des consommations Saur.
+
+La table consumption_rollups contient, pour chaque compteur et chaque
+période (semaine du lundi, mois, année civile), le total en litres, le
+nombre de jours connus et les consommations journalières minimale et
+maximale. Seules les périodes touchées par une écriture sont
+recalculées ; une plage quelconque est ensuite couverte par les
+périodes les plus grossières possibles, complétées jour par jour.
+"""
+
+import sqlite3
+from collections.abc import Collection
+from datetime import date
+from enum import IntEnum
+
+from ..models import SectionId
+from .dateutils import from_epoch_day, month_bounds, to_epoch_day
+
+
+class RollupPeriod(IntEnum):
+    """Granularité d'un agrégat, de la plus fine à la plus grossière."""
+
+    WEEK = 0
+    MONTH = 1
+    YEAR = 2
+
+
+RollupTotals = tuple[int, int, int | None, int | None]
+"""Litres, nombre de jours, minimum et maximum journaliers (litres)."""
+
+
+def period_bounds(period: RollupPeriod, day: int) -> tuple[int, int]:
+    """Premier et dernier jour epoch de la période contenant day."""
+    if period is RollupPeriod.WEEK:
+        # Le jour epoch 0 (01/01/1970) est un jeudi
+        start = day - (day + 3) % 7
+        return start, start + 6
+    current = from_epoch_day(day)
+    if period is RollupPeriod.MONTH:
+        return month_bounds(current.year, current.month)
+    return (
+        to_epoch_day(date(current.year, 1, 1)),
+        to_epoch_day(date(current.year + 1, 1, 1)) - 1,
+    )
+
+
+def sync_refresh_rollups(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    changed_days: Collection[int] | None = None,
+) -> None:
+    """Recalcule les agrégats des périodes touchées par une écriture.
+
+    Semaines et mois sont recalculés depuis les consommations, les
+    années depuis les mois.
+
+    Args:
+        conn: Connexion d'écriture, dans la transaction en cours.
+        section_id: L'identifiant unique du compteur.
+        changed_days: Jours modifiés ; None pour tout recalculer.
+
+    """
+    if changed_days is None:
+        conn.execute(
+            "DELETE FROM consumption_rollups WHERE section_id = ?",
+            (section_id,),
+        )
+        changed_days = [
+            row[0]
+            for row in conn.execute(
+                "SELECT day FROM daily_consumptions WHERE section_id = ?",
+                (section_id,),
+            )
+        ]
+
+    for period in RollupPeriod:
+        for start, end in sorted(
+            {period_bounds(period, day) for day in changed_days}
+        ):
+            _sync_refresh_period(conn, section_id, period, start, end)
+
+
+def _sync_refresh_period(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    period: RollupPeriod,
+    start: int,
+    end: int,
+) -> None:
+    """Recalcule l'agrégat d'une période."""
+    conn.execute(
+        """
+        DELETE FROM consumption_rollups
+        WHERE section_id = ? AND period = ? AND start_day = ?
+        """,
+        (section_id, period, start),
+    )
+    if period is RollupPeriod.YEAR:
+        conn.execute(
+            """
+            INSERT INTO consumption_rollups (
+                section_id, period, start_day,
+                litres, days, min_litres, max_litres
+            )
+            SELECT ?, ?, ?, SUM(litres), SUM(days),
+                MIN(min_litres), MAX(max_litres)
+            FROM consumption_rollups
+            WHERE section_id = ? AND period = ?
+            AND start_day BETWEEN ? AND ?
+            HAVING COUNT(*) > 0
+            """,
+            (
+                section_id,
+                period,
+                start,
+                section_id,
+                RollupPeriod.MONTH,
+                start,
+                end,
+            ),
+        )
+        return
+    conn.execute(
+        """
+        INSERT INTO consumption_rollups (
+            section_id, period, start_day,
+            litres, days, min_litres, max_litres
+        )
+        SELECT ?, ?, ?, SUM(litres), COUNT(*), MIN(litres), MAX(litres)
+        FROM daily_consumptions
+        WHERE section_id = ? AND day BETWEEN ? AND ?
+        HAVING COUNT(*) > 0
+        """,
+        (section_id, period, start, section_id, start, end),
+    )
+
+
+def plan_rollup_ranges(
+    first_day: int,
+    last_day: int,
+    period: RollupPeriod | None = RollupPeriod.YEAR,
+) -> list[tuple[RollupPeriod | None, int, int]]:
+    """Découpe une plage en périodes entières, les plus grossières d'abord.
+
+    Les périodes entières du niveau demandé sont retenues, puis les
+    restes de chaque côté sont découpés au niveau inférieur.
+
+    Returns:
+        Des triplets (période, premier jour, dernier jour) contigus ; la
+        période vaut None pour une suite de jours hors période entière.
+
+    """
+    if first_day > last_day:
+        return []
+    if period is None:
+        return [(None, first_day, last_day)]
+
+    finer = None if period is RollupPeriod.WEEK else RollupPeriod(period - 1)
+    start, end = period_bounds(period, first_day)
+    if start < first_day:
+        start, end = period_bounds(period, end + 1)
+    whole: list[tuple[RollupPeriod | None, int, int]] = []
+    while end <= last_day:
+        whole.append((period, start, end))
+        start, end = period_bounds(period, end + 1)
+    if not whole:
+        return plan_rollup_ranges(first_day, last_day, finer)
+    return [
+        *plan_rollup_ranges(first_day, whole[0][1] - 1, finer),
+        *whole,
+        *plan_rollup_ranges(whole[-1][2] + 1, last_day, finer),
+    ]
+
+
+def sync_summarize(
+    conn: sqlite3.Connection,
+    section_id: SectionId,
+    first_day: int,
+    last_day: int,
+) -> RollupTotals:
+    """Totalise les consommations des jours [first_day, last_day]."""
+    litres = days = 0
+    minimum: int | None = None
+    maximum: int | None = None
+    for period, start, end in plan_rollup_ranges(first_day, last_day):
+        if period is None:
+            row = conn.execute(
+                """
+                SELECT SUM(litres), COUNT(*), MIN(litres), MAX(litres)
+                FROM daily_consumptions
+                WHERE section_id = ? AND day BETWEEN ? AND ?
+                """,
+                (section_id, start, end),
+            ).fetchone()
+        else:
+            row = conn.execute(
+                """
+                SELECT litres, days, min_litres, max_litres
+                FROM consumption_rollups
+                WHERE section_id = ? AND period = ? AND start_day = ?
+                """,
+                (section_id, period, start),
+            ).fetchone()
+        if row is None or not row[1]:
+            continue
+        litres += row[0]
+        days += row[1]
+        minimum = row[2] if minimum is None else min(minimum, row[2])
+        maximum = row[3] if maximum is None else max(maximum, row[3])
+    return litres, days, minimum, maximum
@@ -0,0 +1,444 @@
+"""Migrations versionnées du schéma de la base Saur.
+
+La version du schéma est conservée dans PRAGMA user_version. Chaque
+migration fait passer la base de la version N-1 à la version N ; les
+migrations en attente sont appliquées au démarrage dans une seule
+transaction, de sorte qu'une migration interrompue laisse la base dans
+sa version précédente.
+"""
+
+import logging
+import sqlite3
+from collections.abc import Callable
+from typing import Final
+
+from ..models import SectionId
+from .saur_archive import sync_thaw
+from .saur_index import sync_refresh_absolute_index
+from .saur_journal import sync_record_change
+from .saur_rollup import sync_refresh_rollups
+
+_LOGGER = logging.getLogger(__name__)
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+def _migration_base_tables(conn: sqlite3.Connection) -> None:
+    """Version 1 : tables des consommations et des ancres."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS consumptions (
+            date TEXT NOT NULL,
+            section_id TEXT NOT NULL,
+            relative_value REAL NOT NULL,
+            is_ancre INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, section_id)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS anchor_value (
+            date TEXT NOT NULL,
+            section_id TEXT NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (date, section_id)
+        )
+        """
+    )
+
+
+def _migration_absolute_index(conn: sqlite3.Connection) -> None:
+    """Version 2 : table de l'index absolu matérialisé."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS absolute_index (
+            section_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (section_id, date)
+        )
+        """
+    )
+
+
+def _migration_meter_first_indexes(conn: sqlite3.Connection) -> None:
+    """Version 3 : index (section_id, date) couvrants.
+
+    Toutes les requêtes filtrent d'abord par compteur puis parcourent les
+    dates, ce que la clé primaire (date, section_id) ne permet pas.
+    """
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_consumptions_section_date
+        ON consumptions (section_id, date, relative_value)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_anchor_value_section_date
+        ON anchor_value (section_id, date, value)
+        """
+    )
+
+
+def _migration_compact_storage(conn: sqlite3.Connection) -> None:
+    """Version 4 : jours epoch entiers, litres entiers, WITHOUT ROWID.
+
+    Les tables sont reconstruites, groupées physiquement par compteur
+    puis par jour ; les index de la version 3 deviennent inutiles.
+    L'index absolu est vidé puis reconstruit après les migrations.
+    """
+    epoch_day = "CAST(julianday(substr(date, 1, 10)) - 2440587.5 AS INTEGER)"
+    conn.execute(
+        """
+        CREATE TABLE consumptions_v4 (
+            section_id TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            litres INTEGER NOT NULL,
+            PRIMARY KEY (section_id, day)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO consumptions_v4 (section_id, day, litres)
+        SELECT section_id, {epoch_day},
+            CAST(round(relative_value * 1000) AS INTEGER)
+        FROM consumptions ORDER BY date
+        """  # noqa: S608
+    )
+    conn.execute("DROP TABLE consumptions")
+    conn.execute("ALTER TABLE consumptions_v4 RENAME TO consumptions")
+
+    conn.execute(
+        """
+        CREATE TABLE anchor_value_v4 (
+            section_id TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            litres INTEGER NOT NULL,
+            PRIMARY KEY (section_id, day)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO anchor_value_v4 (section_id, day, litres)
+        SELECT section_id, {epoch_day}, CAST(round(value * 1000) AS INTEGER)
+        FROM anchor_value ORDER BY date
+        """  # noqa: S608
+    )
+    conn.execute("DROP TABLE anchor_value")
+    conn.execute("ALTER TABLE anchor_value_v4 RENAME TO anchor_value")
+
+    conn.execute("DROP TABLE absolute_index")
+    conn.execute(
+        """
+        CREATE TABLE absolute_index (
+            section_id TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            litres INTEGER NOT NULL,
+            PRIMARY KEY (section_id, day)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _migration_rollups(conn: sqlite3.Connection) -> None:
+    """Version 5 : agrégats par semaine, mois et année.
+
+    La table est remplie après les migrations.
+    """
+    conn.execute(
+        """
+        CREATE TABLE consumption_rollups (
+            section_id TEXT NOT NULL,
+            period INTEGER NOT NULL,
+            start_day INTEGER NOT NULL,
+            litres INTEGER NOT NULL,
+            days INTEGER NOT NULL,
+            min_litres INTEGER NOT NULL,
+            max_litres INTEGER NOT NULL,
+            PRIMARY KEY (section_id, period, start_day)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _migration_coverage(conn: sqlite3.Connection) -> None:
+    """Version 6 : index de couverture par compteur et par mois.
+
+    Le masque des jours présents est calculé à partir des consommations
+    existantes ; month vaut année * 12 + mois - 1.
+    """
+    conn.execute(
+        """
+        CREATE TABLE coverage (
+            section_id TEXT NOT NULL,
+            month INTEGER NOT NULL,
+            days INTEGER NOT NULL,
+            flags INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (section_id, month)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO coverage (section_id, month, days, flags)
+        SELECT section_id,
+            CAST(strftime('%Y', day * 86400, 'unixepoch') AS INTEGER) * 12
+            + CAST(strftime('%m', day * 86400, 'unixepoch') AS INTEGER) - 1,
+            SUM(1 << (
+                CAST(strftime('%d', day * 86400, 'unixepoch') AS INTEGER) - 1
+            )),
+            0
+        FROM consumptions
+        GROUP BY 1, 2
+        """
+    )
+
+
+def _migration_change_journal(conn: sqlite3.Connection) -> None:
+    """Version 7 : journal des plages modifiées et curseurs.
+
+    AUTOINCREMENT garantit qu'un numéro d'entrée n'est jamais réutilisé
+    après une purge du journal.
+    """
+    conn.execute(
+        """
+        CREATE TABLE change_journal (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            section_id TEXT NOT NULL,
+            first_day INTEGER,
+            last_day INTEGER
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE journal_cursors (
+            consumer TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _migration_archive(conn: sqlite3.Connection) -> None:
+    """Version 8 : archives compressées des années closes.
+
+    La vue daily_consumptions réunit les jours de consumptions et ceux
+    décodés des archives ; day_offsets énumère les positions d'une année
+    dans une archive.
+    """
+    conn.execute(
+        """
+        CREATE TABLE consumption_archive (
+            section_id TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            first_day INTEGER NOT NULL,
+            days INTEGER NOT NULL,
+            litres BLOB NOT NULL,
+            total INTEGER NOT NULL,
+            PRIMARY KEY (section_id, year)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE TABLE day_offsets (i INTEGER PRIMARY KEY)")
+    conn.execute(
+        """
+        WITH RECURSIVE seq(i) AS (
+            SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i < 365
+        )
+        INSERT INTO day_offsets (i) SELECT i FROM seq
+        """
+    )
+    conn.execute(
+        """
+        CREATE VIEW daily_consumptions (section_id, day, litres) AS
+        SELECT section_id, day, litres FROM consumptions
+        UNION ALL
+        SELECT a.section_id, a.first_day + n.i,
+            saur_unpack(a.litres, a.total, n.i)
+        FROM consumption_archive a
+        JOIN day_offsets n ON n.i < a.days
+        """
+    )
+
+
+def _migration_meta(conn: sqlite3.Connection) -> None:
+    """Version 9 : valeurs de service de la base, par clé."""
+    conn.execute(
+        """
+        CREATE TABLE db_meta (
+            key TEXT NOT NULL PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+
+
+MIGRATIONS: Final[tuple[Migration, ...]] = (
+    _migration_base_tables,
+    _migration_absolute_index,
+    _migration_meter_first_indexes,
+    _migration_compact_storage,
+    _migration_rollups,
+    _migration_coverage,
+    _migration_change_journal,
+    _migration_archive,
+    _migration_meta,
+)
+"""Migrations dans l'ordre : MIGRATIONS[N - 1] produit la version N."""
+
+SCHEMA_VERSION: Final = len(MIGRATIONS)
+
+
+def sync_get_schema_version(conn: sqlite3.Connection) -> int:
+    """Retourne la version du schéma enregistrée dans la base."""
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def sync_get_meta(conn: sqlite3.Connection, key: str) -> str | None:
+    """Valeur de service enregistrée sous une clé, ou None."""
+    row = conn.execute(
+        "SELECT value FROM db_meta WHERE key = ?", (key,)
+    ).fetchone()
+    return None if row is None else row[0]
+
+
+def sync_set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+    """Enregistre une valeur de service, dans la transaction en cours."""
+    conn.execute(
+        """
+        INSERT INTO db_meta (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """,
+        (key, value),
+    )
+
+
+def sync_migrate(conn: sqlite3.Connection) -> int:
+    """Applique les migrations en attente.
+
+    Args:
+        conn: Connexion d'écriture ; l'appelant valide la transaction.
+
+    Returns:
+        La version du schéma après migration.
+
+    """
+    version = sync_get_schema_version(conn)
+    if version > SCHEMA_VERSION:
+        _LOGGER.warning(
+            "Schéma de base en version %s, plus récent que la version %s "
+            "connue de cette intégration",
+            version,
+            SCHEMA_VERSION,
+        )
+        return version
+
+    if version < SCHEMA_VERSION and not conn.in_transaction:
+        # Le module sqlite3 n'ouvre pas de transaction avant un DDL
+        conn.execute("BEGIN")
+    for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        _LOGGER.debug("Migration du schéma vers la version %s", target)
+        migration(conn)
+        # PRAGMA n'accepte pas de paramètre lié
+        conn.execute(f"PRAGMA user_version = {target:d}")
+    if version < SCHEMA_VERSION:
+        _sync_backfill_absolute_index(conn)
+        _sync_backfill_rollups(conn)
+    return SCHEMA_VERSION
+
+
+def _sync_backfill_absolute_index(conn: sqlite3.Connection) -> None:
+    """Construit l'index absolu des compteurs qui n'en ont pas encore."""
+    for row in conn.execute(
+        """
+        SELECT DISTINCT section_id FROM daily_consumptions
+        WHERE section_id NOT IN (SELECT section_id FROM absolute_index)
+        """
+    ).fetchall():
+        sync_refresh_absolute_index(conn, SectionId(row["section_id"]))
+
+
+def _sync_backfill_rollups(conn: sqlite3.Connection) -> None:
+    """Construit les agrégats des compteurs qui n'en ont pas encore."""
+    for row in conn.execute(
+        """
+        SELECT DISTINCT section_id FROM daily_consumptions
+        WHERE section_id NOT IN (SELECT section_id FROM consumption_rollups)
+        """
+    ).fetchall():
+        sync_refresh_rollups(conn, SectionId(row["section_id"]))
+
+
+def sync_import_attached(
+    conn: sqlite3.Connection, schema: str
+) -> list[SectionId]:
+    """Fusionne une base attachée, au schéma courant, dans la base.
+
+    Les jours (archives comprises), relevés et indicateurs de couverture
+    de la base attachée remplacent ceux de la base pour les mêmes clés ;
+    l'index absolu et les agrégats des compteurs importés sont ensuite
+    reconstruits et leur historique signalé au journal.
+
+    Args:
+        conn: Connexion d'écriture, dans la transaction en cours.
+        schema: Nom sous lequel la base est attachée.
+
+    Returns:
+        Les compteurs importés.
+
+    """
+    ranges = conn.execute(
+        f"""
+        SELECT section_id, MIN(day), MAX(day)
+        FROM {schema}.daily_consumptions GROUP BY section_id
+        """  # noqa: S608
+    ).fetchall()
+    for section_id, first_day, last_day in ranges:
+        # Les archives recouvrant les jours importés redeviennent des lignes
+        sync_thaw(conn, SectionId(section_id), first_day, last_day)
+    conn.execute(
+        f"""
+        INSERT INTO main.consumptions (section_id, day, litres)
+        SELECT section_id, day, litres FROM {schema}.daily_consumptions
+        WHERE true
+        ON CONFLICT(section_id, day) DO UPDATE SET litres = excluded.litres
+        """  # noqa: S608
+    )
+    conn.execute(
+        f"""
+        INSERT INTO main.anchor_value (section_id, day, litres)
+        SELECT section_id, day, litres FROM {schema}.anchor_value WHERE true
+        ON CONFLICT(section_id, day) DO UPDATE SET litres = excluded.litres
+        """  # noqa: S608
+    )
+    conn.execute(
+        f"""
+        INSERT INTO main.coverage (section_id, month, days, flags)
+        SELECT section_id, month, days, flags FROM {schema}.coverage
+        WHERE true
+        ON CONFLICT(section_id, month) DO UPDATE SET
+        days = days | excluded.days, flags = flags | excluded.flags
+        """  # noqa: S608
+    )
+
+    section_ids = sorted(
+        {
+            SectionId(row[0])
+            for row in conn.execute(
+                f"""
+                SELECT section_id FROM {schema}.daily_consumptions
+                UNION SELECT section_id FROM {schema}.anchor_value
+                """  # noqa: S608
+            )
+        }
+    )
+    for section_id in section_ids:
+        sync_refresh_absolute_index(conn, section_id)
+        sync_refresh_rollups(conn, section_id)
+        sync_record_change(conn, section_id, (None, None))
+    return section_ids
@@ -0,0 +1,90 @@
+"""Profils de stockage SQLite de la base Saur.
+
+Un profil regroupe les réglages de journalisation et de cache appliqués
+à chaque connexion :
+
+- durable : journal d'annulation et synchronisation complète à chaque
+  validation, comme le réglage par défaut de SQLite. À réserver aux
+  bases posées sur un partage réseau, où le WAL n'est pas pris en charge.
+- balanced : journal WAL, synchronisation aux seuls points de contrôle,
+  cache et projection mémoire élargis. Une coupure de courant peut
+  perdre les dernières validations, jamais corrompre la base ; les
+  données perdues sont de toute façon relues depuis l'API Saur.
+- flash : comme balanced, avec des points de contrôle quatre fois plus
+  espacés, pour réécrire moins souvent le fichier principal sur une
+  carte SD.
+
+Les mesures de tools/bench_storage.py ont guidé le choix du profil par
+défaut (DB_STORAGE_PROFILE).
+"""
+
+import sqlite3
+from typing import NamedTuple
+
+
+class StorageProfile(NamedTuple):
+    """Réglages SQLite d'un profil de stockage."""
+
+    journal_mode: str
+    """Mode de journalisation (PRAGMA journal_mode)."""
+    synchronous: str
+    """Niveau de synchronisation (PRAGMA synchronous)."""
+    cache_size: int
+    """Taille du cache de pages par connexion, en Kio (PRAGMA cache_size)."""
+    mmap_size: int
+    """Taille maximale de la projection mémoire, en octets."""
+    wal_autocheckpoint: int
+    """Pages de WAL déclenchant un point de contrôle automatique."""
+
+
+STORAGE_PROFILES: dict[str, StorageProfile] = {
+    "durable": StorageProfile(
+        journal_mode="DELETE",
+        synchronous="FULL",
+        cache_size=2048,
+        mmap_size=0,
+        wal_autocheckpoint=1000,
+    ),
+    "balanced": StorageProfile(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=8192,
+        mmap_size=64 * 1024 * 1024,
+        wal_autocheckpoint=1000,
+    ),
+    "flash": StorageProfile(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=8192,
+        mmap_size=64 * 1024 * 1024,
+        wal_autocheckpoint=4000,
+    ),
+}
+
+
+def get_profile(name: str) -> StorageProfile:
+    """Retourne un profil de stockage par son nom.
+
+    Raises:
+        ValueError: Si le profil est inconnu.
+
+    """
+    try:
+        return STORAGE_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Profil de stockage inconnu : {name}") from None
+
+
+def apply_profile(conn: sqlite3.Connection, profile: StorageProfile) -> None:
+    """Applique un profil de stockage à une connexion.
+
+    Args:
+        conn: Connexion SQLite, hors transaction.
+        profile: Profil à appliquer.
+
+    """
+    conn.execute(f"PRAGMA cache_size = {-profile.cache_size}")
+    conn.execute(f"PRAGMA mmap_size = {profile.mmap_size}")
+    conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+    conn.execute(f"PRAGMA synchronous = {profile.synchronous}")
+    conn.execute(f"PRAGMA wal_autocheckpoint = {profile.wal_autocheckpoint}")
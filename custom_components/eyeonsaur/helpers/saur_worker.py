@@ -0,0 +1,162 @@
+"""Thread dédié aux accès SQLite de l'intégration EyeOnSaur."""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from .const import DB_WORKER_SLOW_JOB
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+@dataclass(slots=True)
+class SaurWorkerStats:
+    """Statistiques d'exécution du thread base de données."""
+
+    jobs: int = 0
+    """Nombre de tâches exécutées depuis le démarrage."""
+    queue_depth: int = 0
+    """Nombre de tâches en attente ou en cours."""
+    last_latency: float = 0.0
+    """Durée (s) entre la soumission et la fin de la dernière tâche."""
+    max_latency: float = 0.0
+    """Plus grande latence observée (s)."""
+    total_latency: float = 0.0
+    """Somme des latences observées (s)."""
+
+    @property
+    def average_latency(self) -> float:
+        """Latence moyenne par tâche (s)."""
+        return self.total_latency / self.jobs if self.jobs else 0.0
+
+
+@dataclass(slots=True)
+class _Job:
+    """Tâche en file d'attente pour le thread base de données."""
+
+    func: Callable[[], Any]
+    future: "asyncio.Future[Any]"
+    loop: asyncio.AbstractEventLoop
+    submitted_at: float
+
+
+class SaurDatabaseWorker:
+    """Exécute les tâches SQLite, dans l'ordre, sur un thread unique.
+
+    Les tâches sont soumises depuis la boucle asyncio et exécutées hors
+    de l'executor partagé de Home Assistant, ce qui évite à la fois de
+    le saturer et les écritures concurrentes sur la base.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialise le worker sans démarrer le thread.
+
+        Args:
+            name: Nom du thread, utile dans les traces.
+
+        """
+        self.name = name
+        self.stats = SaurWorkerStats()
+        self._queue: queue.SimpleQueue[_Job | None] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Indique si le thread est démarré."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def queue_depth(self) -> int:
+        """Nombre de tâches en attente ou en cours d'exécution."""
+        return self.stats.queue_depth
+
+    def start(self) -> None:
+        """Démarre le thread s'il ne tourne pas déjà."""
+        with self._lock:
+            if self.is_running:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    async def async_submit(self, func: Callable[[], _T]) -> _T:
+        """Met une tâche en file et attend son résultat.
+
+        Args:
+            func: Fonction synchrone exécutée sur le thread dédié.
+
+        Returns:
+            La valeur renvoyée par func.
+
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[_T] = loop.create_future()
+        with self._lock:
+            self.stats.queue_depth += 1
+        self._queue.put(_Job(func, future, loop, time.monotonic()))
+        return await future
+
+    async def async_stop(self) -> None:
+        """Termine les tâches en file puis arrête le thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        self._thread = None
+
+    def _run(self) -> None:
+        """Boucle du thread : exécute les tâches dans l'ordre d'arrivée."""
+        while (job := self._queue.get()) is not None:
+            self._execute(job)
+
+    def _execute(self, job: _Job) -> None:
+        """Exécute une tâche et transmet son résultat à la boucle."""
+        result: Any = None
+        error: BaseException | None = None
+        try:
+            result = job.func()
+        except BaseException as err:
+            error = err
+
+        latency = time.monotonic() - job.submitted_at
+        with self._lock:
+            self.stats.queue_depth -= 1
+            self.stats.jobs += 1
+            self.stats.last_latency = latency
+            self.stats.total_latency += latency
+            self.stats.max_latency = max(self.stats.max_latency, latency)
+        if latency > DB_WORKER_SLOW_JOB:
+            _LOGGER.debug(
+                "Tâche SQLite lente sur %s : %.3f s (file : %s)",
+                self.name,
+                latency,
+                self.stats.queue_depth,
+            )
+
+        if error is not None:
+            job.loop.call_soon_threadsafe(_set_exception, job.future, error)
+        else:
+            job.loop.call_soon_threadsafe(_set_result, job.future, result)
+
+
+def _set_result(future: "asyncio.Future[Any]", result: Any) -> None:
+    """Renseigne le résultat si l'appelant attend toujours."""
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future: "asyncio.Future[Any]", err: BaseException) -> None:
+    """Propage l'exception si l'appelant attend toujours."""
+    if not future.done():
+        future.set_exception(err)
@@ -31,6 +31,22 @@ class ConsumptionData:
     rangeType: str
 
 
+@dataclass(frozen=True, slots=True)
+class ConsumptionWriteResult:
+    """
+    Bilan d'une écriture groupée de consommations.
+
+    Attributes:
+        inserted (int): Nombre de jours nouvellement insérés.
+        updated (int): Nombre de jours dont la valeur a changé.
+        unchanged (int): Nombre de jours déjà connus avec la même valeur.
+    """
+
+    inserted: int
+    updated: int
+    unchanged: int
+
+
 @dataclass(frozen=True, slots=True)
 class AnchorData:
     """
@@ -62,19 +78,64 @@ class TheoreticalConsumptionData:
 
 
 @dataclass(frozen=True, slots=True)
-class MissingDate:
+class DailyConsumption:
+    """
+    Représente une consommation journalière stockée en base.
+
+    Attributes:
+        date (str): Jour de la consommation, au format
+            'AAAA-MM-JJ 00:00:00'.
+        value (float): Consommation du jour, en m³.
+        indexValue (float | None): Index absolu du compteur ce jour-là,
+            None tant qu'aucune ancre n'est connue.
+    """
+
+    date: StrDate
+    value: float
+    indexValue: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class ConsumptionSummary:
+    """
+    Synthèse des consommations d'un compteur sur une plage de dates.
+
+    Attributes:
+        volume (float): Consommation totale, en m³.
+        days (int): Nombre de jours dont la consommation est connue.
+        min_volume (float | None): Plus petite consommation journalière,
+            None si aucun jour n'est connu.
+        max_volume (float | None): Plus grande consommation journalière,
+            None si aucun jour n'est connu.
+    """
+
+    volume: float
+    days: int
+    min_volume: float | None
+    max_volume: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class MaintenanceReport:
     """
-    Représente une date manquante (année, mois, jour).
+    Bilan d'une maintenance de la base (archivage, VACUUM, ANALYZE).
 
     Attributes:
-        year (int): Année de la date manquante.
-        month (int): Mois de la date manquante.
-        day (int): Jour de la date manquante.
+        archived_years (int): Nombre d'années de compteur archivées.
+        archived_days (int): Nombre de jours déplacés dans les archives.
+        size_before (int): Taille de la base avant maintenance, en octets.
+        size_after (int): Taille de la base après maintenance, en octets.
     """
 
-    year: int
-    month: int
-    day: int
+    archived_years: int
+    archived_days: int
+    size_before: int
+    size_after: int
+
+    @property
+    def reclaimed(self) -> int:
+        """Espace disque récupéré, en octets."""
+        return self.size_before - self.size_after
 
 
 @dataclass(slots=True, frozen=True)
@@ -90,6 +151,32 @@ class RelevePhysique:
 ContratId = NewType("ContratId", str)
 SectionId = NewType("SectionId", str)
 
+
+@dataclass(frozen=True, slots=True)
+class IntegrityReport:
+    """
+    Bilan du contrôle d'intégrité de la base au démarrage.
+
+    Attributes:
+        errors (tuple[str, ...]): Erreurs relevées par PRAGMA quick_check.
+        quarantined (str | None): Chemin de la base abîmée mise de côté.
+        damaged_tables (tuple[str, ...]): Tables dont des lignes n'ont
+            pas pu être sauvées.
+        rebuild (dict[SectionId, list[tuple[int, int]]]): Mois
+            (année, mois) à relire depuis l'API, par compteur.
+    """
+
+    errors: tuple[str, ...]
+    quarantined: str | None
+    damaged_tables: tuple[str, ...]
+    rebuild: dict[SectionId, list[tuple[int, int]]]
+
+    @property
+    def healthy(self) -> bool:
+        """Indique si la base n'a demandé aucune réparation."""
+        return not self.errors and not self.rebuild
+
+
 # @dataclass(slots=True, frozen=True)
 # class Compteur:
 #     """Représente les données d'un compteur."""
@@ -180,14 +267,6 @@ ConsumptionDatas est un type distinct basé sur list[ConsumptionData],
 utilisé pour renforcer le typage et améliorer la clarté du code.
 """
 
-MissingDates = NewType("MissingDates", list[MissingDate])
-"""
-Représente une collection typée d'objets MissingDate.
-
-MissingDates est un type distinct basé sur list[MissingDate],
-utilisé pour renforcer le typage et améliorer la clarté du code.
-"""
-
 
 @dataclass(slots=True, frozen=True)
 class Contract:
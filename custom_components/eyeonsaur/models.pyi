@@ -16,6 +16,13 @@ class ConsumptionData:
         self, startDate: StrDate, value: float, rangeType: str
     ) -> None: ...
 
+@dataclass(frozen=True, slots=True)
+class ConsumptionWriteResult:
+    inserted: int
+    updated: int
+    unchanged: int
+    def __init__(self, inserted: int, updated: int, unchanged: int) -> None: ...
+
 @dataclass(frozen=True, slots=True)
 class AnchorData:
     readingDate: StrDate
@@ -29,11 +36,43 @@ class TheoreticalConsumptionData:
     def __init__(self, date: StrDate, indexValue: float) -> None: ...
 
 @dataclass(frozen=True, slots=True)
-class MissingDate:
-    year: int
-    month: int
-    day: int
-    def __init__(self, year: int, month: int, day: int) -> None: ...
+class DailyConsumption:
+    date: StrDate
+    value: float
+    indexValue: float | None
+    def __init__(
+        self, date: StrDate, value: float, indexValue: float | None
+    ) -> None: ...
+
+@dataclass(frozen=True, slots=True)
+class ConsumptionSummary:
+    volume: float
+    days: int
+    min_volume: float | None
+    max_volume: float | None
+    def __init__(
+        self,
+        volume: float,
+        days: int,
+        min_volume: float | None,
+        max_volume: float | None,
+    ) -> None: ...
+
+@dataclass(frozen=True, slots=True)
+class MaintenanceReport:
+    archived_years: int
+    archived_days: int
+    size_before: int
+    size_after: int
+    def __init__(
+        self,
+        archived_years: int,
+        archived_days: int,
+        size_before: int,
+        size_after: int,
+    ) -> None: ...
+    @property
+    def reclaimed(self) -> int: ...
 
 @dataclass(slots=True, frozen=True)
 class RelevePhysique:
@@ -47,6 +86,22 @@ class ContratId(str):
 class SectionId(str):
     pass
 
+@dataclass(frozen=True, slots=True)
+class IntegrityReport:
+    errors: tuple[str, ...]
+    quarantined: str | None
+    damaged_tables: tuple[str, ...]
+    rebuild: dict[SectionId, list[tuple[int, int]]]
+    def __init__(
+        self,
+        errors: tuple[str, ...],
+        quarantined: str | None,
+        damaged_tables: tuple[str, ...],
+        rebuild: dict[SectionId, list[tuple[int, int]]],
+    ) -> None: ...
+    @property
+    def healthy(self) -> bool: ...
+
 class JsonStr(str):
     pass
 
@@ -57,8 +112,6 @@ TheoreticalConsumptionDatas = NewType(
 )
 ConsumptionDatas = NewType("ConsumptionDatas", list[ConsumptionData])
 
-MissingDates = NewType("MissingDates", list[MissingDate])
-
 @dataclass(slots=True, frozen=True)
 class Contract:
     contract_id: ContratId
@@ -3,8 +3,10 @@
 # pylint: disable=E0401
 
 import logging
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 
+from homeassistant.components.recorder import get_instance
 from homeassistant.components.recorder.models import (
     StatisticData,
     StatisticMetaData,
@@ -13,11 +15,14 @@ from homeassistant.components.recorder.statistics import (
     # StatisticData,
     # StatisticMetaData,
     async_import_statistics,
+    statistics_during_period,
 )
 from homeassistant.const import UnitOfVolume
 from homeassistant.core import HomeAssistant
 from homeassistant.util.dt import as_local
 
+from .helpers.const import RECORDER_SUM_TOLERANCE
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -46,47 +51,101 @@ class SaurRecorder:
             date,
             value,
         )
+        await self.async_inject_statistics(entity_id, [(date, value)])
+
+    async def async_inject_statistics(
+        self,
+        statistic_id: str,
+        series: Sequence[tuple[datetime, float]],
+    ) -> int:
+        """Injecte une série d'index journaliers en un seul import.
+
+        Les statistiques déjà enregistrées sur la période sont lues en
+        une requête ; seuls les points dont la somme en diffère de plus
+        de RECORDER_SUM_TOLERANCE sont importés. Les métadonnées sont
+        construites une fois pour toute la série, transmise au recorder
+        dans un unique appel à async_import_statistics : une seule tâche
+        dans sa file et une seule transaction, aucune si rien n'a changé.
 
-        # statistic_id = "sensor.compteur_saur_" + entity_id
-        statistic_id = entity_id
-        epoch = datetime(1970, 1, 1, 0, 0, 0)
-        epoch = as_local(epoch)
-        start_of_day = datetime(date.year, date.month, date.day, 1, 0, 0)
-        start_of_day = as_local(start_of_day)
-        end_of_day = datetime(date.year, date.month, date.day, 23, 59, 59)
-        end_of_day = as_local(end_of_day)
-
-        metadata: StatisticMetaData = StatisticMetaData(
-            has_mean=False,
-            has_sum=True,
-            name=f"EyeOnSaur Consumption of {statistic_id}",
-            source="recorder",
-            statistic_id=statistic_id,
-            unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+        Args:
+            statistic_id: L'identifiant de la statistique.
+            series: Couples (jour, index en m³), un par jour.
+
+        Returns:
+            Le nombre de points injectés.
+
+        """
+        if not series:
+            return 0
+        points = [
+            (as_local(datetime(date.year, date.month, date.day, 1)), value)
+            for date, value in series
+        ]
+        starts = [start for start, _ in points]
+        existing = await self._async_get_sums(
+            statistic_id, min(starts), max(starts) + timedelta(hours=1)
         )
+        changed = [
+            (start, value)
+            for start, value in points
+            if (known := existing.get(start.timestamp())) is None
+            or abs(known - value) > RECORDER_SUM_TOLERANCE
+        ]
+        if not changed:
+            _LOGGER.debug(
+                "Statistics for %s already up to date (%s points)",
+                statistic_id,
+                len(points),
+            )
+            return 0
+
+        epoch = as_local(datetime(1970, 1, 1, 0, 0, 0))
+        stats: list[StatisticData] = [
+            StatisticData(start=start, last_reset=epoch, sum=value)
+            for start, value in changed
+        ]
+        async_import_statistics(self.hass, _metadata(statistic_id), stats)
 
-        interval = timedelta(hours=1)
-        stats: list[StatisticData] = []
-        current_time = start_of_day + 0 * interval
         _LOGGER.debug(
-            " 📜 for %s at %s with value %s",
+            "Injected %s of %s statistics for %s",
+            len(stats),
+            len(points),
             statistic_id,
-            current_time,
-            value,
-        )
-        stats.append(
-            StatisticData(
-                start=current_time,
-                last_reset=epoch,
-                sum=value,
-            ),
         )
+        return len(stats)
 
-        async_import_statistics(self.hass, metadata, stats)
+    async def _async_get_sums(
+        self, statistic_id: str, start: datetime, end: datetime
+    ) -> dict[float, float]:
+        """Sommes horaires déjà enregistrées, par horodatage de début.
 
-        _LOGGER.debug(
-            "Injected historical data for %s at %s with value %s",
-            statistic_id,
-            date,
-            value,
+        Une seule lecture des statistiques longue durée, exécutée dans
+        le thread du recorder.
+        """
+        rows = await get_instance(self.hass).async_add_executor_job(
+            statistics_during_period,
+            self.hass,
+            start,
+            end,
+            {statistic_id},
+            "hour",
+            None,
+            {"sum"},
         )
+        return {
+            row["start"]: row["sum"]
+            for row in rows.get(statistic_id, [])
+            if row.get("sum") is not None
+        }
+
+
+def _metadata(statistic_id: str) -> StatisticMetaData:
+    """Métadonnées des statistiques de consommation d'un compteur."""
+    return StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=f"EyeOnSaur Consumption of {statistic_id}",
+        source="recorder",
+        statistic_id=statistic_id,
+        unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+    )
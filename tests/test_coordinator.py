@@ -1,10 +1,13 @@
 """Test the SaurCoordinator."""
 
-from unittest.mock import AsyncMock, MagicMock
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.helpers.entity_registry import (
+    EVENT_ENTITY_REGISTRY_UPDATED,
+)
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.eyeonsaur.coordinator import SaurCoordinator
@@ -12,12 +15,22 @@ from custom_components.eyeonsaur.helpers.const import (
     CONF_EMAIL,
     CONF_PASSWORD,
     DOMAIN,
+    ENTRY_CLIENTID,
+    ENTRY_COMPTEURID,
     ENTRY_CREATED_AT,
     ENTRY_MANUFACTURER,
     ENTRY_MODEL,
     ENTRY_SERIAL_NUMBER,
+    ENTRY_TOKEN,
+)
+from custom_components.eyeonsaur.helpers.dateutils import to_epoch_day
+from custom_components.eyeonsaur.helpers.saur_coverage import CoverageFlag
+from custom_components.eyeonsaur.helpers.saur_journal import ChangeSet
+from custom_components.eyeonsaur.models import (
+    DailyConsumption,
+    SectionId,
+    StrDate,
 )
-from custom_components.eyeonsaur.helpers.saur_db import SaurDatabaseError
 
 pytestmark = pytest.mark.asyncio
 
@@ -116,7 +129,8 @@ async def test_async_config_entry_first_refresh_success(
 
     await coordinator.async_config_entry_first_refresh()
 
-    db_helper.async_init_db.assert_awaited_once()
+    # La base est ouverte et vérifiée par async_setup_entry
+    db_helper.async_init_db.assert_not_awaited()
     mock_saur_client.authenticate.assert_awaited_once()
     mock_saur_client.get_deliverypoints_data.assert_awaited_once()
 
@@ -133,17 +147,152 @@ async def test_async_config_entry_first_refresh_success(
     assert coordinator.base_data["serial_number"] == "TestSN"
 
 
-async def test_async_config_entry_first_refresh_db_failure(
+async def test_inject_only_changed_days(hass: HomeAssistant) -> None:
+    """Test that only the days changed since the last import are injected."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_EMAIL: "test@example.com",
+            CONF_PASSWORD: "password",
+            ENTRY_TOKEN: "token",
+            ENTRY_COMPTEURID: "123",
+            ENTRY_CLIENTID: "client",
+        },
+    )
+    db_helper = AsyncMock()
+    recorder = AsyncMock()
+    coordinator = SaurCoordinator(hass, entry, db_helper, recorder)
+    compteur = MagicMock(sectionId=SectionId("123"), serial_number="TestSN")
+    statistic_id = "sensor.testsn_water_statistics"
+    new_day = to_epoch_day("2024-01-12")
+    db_helper.async_get_changes.return_value = ChangeSet(
+        7, {SectionId("123"): (new_day, new_day)}
+    )
+
+    async def rows(*args, **kwargs):
+        yield DailyConsumption(
+            date=StrDate("2024-01-12 00:00:00"), value=1.0, indexValue=102.0
+        )
+
+    db_helper.async_iter_consumptions = MagicMock(side_effect=rows)
+    registry = MagicMock()
+    registry.async_get_entity_id.return_value = statistic_id
+
+    with patch(
+        "custom_components.eyeonsaur.coordinator.async_get",
+        return_value=registry,
+    ):
+        await coordinator._async_inject_historical_data(compteur)
+
+    db_helper.async_get_changes.assert_awaited_once_with(
+        f"recorder:{statistic_id}"
+    )
+    assert db_helper.async_iter_consumptions.call_args.kwargs == {
+        "start": date(2024, 1, 12),
+        "end": date(2024, 1, 12),
+    }
+    # Un nouveau jour ne coûte qu'une ligne
+    recorder.async_inject_statistics.assert_awaited_once_with(
+        statistic_id, [(datetime(2024, 1, 12), 102.0)]
+    )
+    db_helper.async_ack_changes.assert_awaited_once_with(
+        f"recorder:{statistic_id}", 7
+    )
+
+
+async def test_forget_cursor_of_removed_statistic(
+    hass: HomeAssistant, mock_config_entry
+) -> None:
+    """Test that renaming or removing the statistic drops its cursor."""
+    db_helper = AsyncMock()
+    recorder = AsyncMock()
+    coordinator = SaurCoordinator(hass, mock_config_entry, db_helper, recorder)
+    coordinator._recorder_consumers.add("recorder:sensor.old_statistics")
+    hass.bus.async_listen(
+        EVENT_ENTITY_REGISTRY_UPDATED,
+        coordinator.async_entity_registry_updated,
+    )
+
+    # Une entité étrangère à l'intégration est ignorée
+    hass.bus.async_fire(
+        EVENT_ENTITY_REGISTRY_UPDATED,
+        {"action": "remove", "entity_id": "sensor.other"},
+    )
+    hass.bus.async_fire(
+        EVENT_ENTITY_REGISTRY_UPDATED,
+        {
+            "action": "update",
+            "entity_id": "sensor.new_statistics",
+            "old_entity_id": "sensor.old_statistics",
+            "changes": {"entity_id": "sensor.old_statistics"},
+        },
+    )
+    await hass.async_block_till_done()
+
+    db_helper.async_reset_cursor.assert_awaited_once_with(
+        "recorder:sensor.old_statistics"
+    )
+    assert not coordinator._recorder_consumers
+
+
+async def test_estimated_month_is_flagged(
     hass: HomeAssistant, mock_config_entry, mock_saur_client
-):
-    """Test first refresh with database initialization failure."""
+) -> None:
+    """Test that estimated readings flag the month for a later fetch."""
+    db_helper = AsyncMock()
+    recorder = AsyncMock()
+    coordinator = SaurCoordinator(hass, mock_config_entry, db_helper, recorder)
+    coordinator.client = mock_saur_client
+    section_id = SectionId("123")
+
+    mock_saur_client.get_monthly_data.return_value = {
+        "consumptions": [],
+        "isEstimateConsumption": True,
+    }
+    await coordinator._async_apifetch_and_sqlstore_monthly_data(
+        2024, 1, section_id
+    )
+    db_helper.async_set_month_flags.assert_awaited_once_with(
+        section_id, 2024, 1, CoverageFlag.ESTIMATED
+    )
+
+    # Les relevés définitifs retirent l'indicateur
+    mock_saur_client.get_monthly_data.return_value = {
+        "consumptions": [],
+        "isEstimateConsumption": False,
+    }
+    await coordinator._async_apifetch_and_sqlstore_monthly_data(
+        2024, 1, section_id
+    )
+    db_helper.async_clear_month_flags.assert_awaited_once_with(
+        section_id, 2024, 1, CoverageFlag.ESTIMATED
+    )
+
+
+async def test_rebuild_skips_months_fetched_in_cycle(
+    hass: HomeAssistant, mock_config_entry, mock_saur_client
+) -> None:
+    """Test that a month is fetched at most once per update cycle."""
     db_helper = AsyncMock()
+    db_helper.async_is_month_complete.return_value = False
     recorder = AsyncMock()
     coordinator = SaurCoordinator(hass, mock_config_entry, db_helper, recorder)
     coordinator.client = mock_saur_client
-    db_helper.async_init_db.side_effect = SaurDatabaseError("Database error")
+    compteur = MagicMock(sectionId=SectionId("123"))
 
-    with pytest.raises(UpdateFailed) as excinfo:
-        await coordinator.async_config_entry_first_refresh()
+    with (
+        patch.object(coordinator, "_async_inject_historical_data"),
+        patch.object(coordinator, "_async_handle_missing_dates"),
+    ):
+        # Mois déjà relu par la recherche des jours manquants
+        await coordinator._async_fetch_monthly_data(2024, 1, compteur)
+        await coordinator._async_rebuild_months(
+            [(2024, 1), (2024, 2)], compteur
+        )
+        await coordinator._async_fetch_monthly_data(2024, 2, compteur)
 
-    assert "Error initializing database" in str(excinfo.value)
+    calls = mock_saur_client.get_monthly_data.await_args_list
+    assert [call.args for call in calls] == [
+        (2024, 1, SectionId("123")),
+        (2024, 2, SectionId("123")),
+    ]
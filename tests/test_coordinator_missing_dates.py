@@ -1,11 +1,15 @@
 """Test the SaurCoordinator for missing dates."""
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from homeassistant.core import HomeAssistant
 
 from custom_components.eyeonsaur.coordinator import SaurCoordinator
+from custom_components.eyeonsaur.helpers.dateutils import to_epoch_day
+from custom_components.eyeonsaur.helpers.intervals import DayIntervals
+from custom_components.eyeonsaur.helpers.saur_coverage import CoverageFlag
+from custom_components.eyeonsaur.models import SectionId
 
 pytestmark = pytest.mark.asyncio
 
@@ -31,9 +35,11 @@ async def test_async_handle_missing_dates(
         ]
     }
 
-    # Mock date utilities
-    mock_missing_dates = [(2024, 1, 10), (2024, 1, 12)]
-    mock_reduced_missing_dates = [(2024, 1, 10)]
+    db_helper.async_is_month_complete.return_value = False
+    # Un jour manquant en base
+    db_helper.async_get_gaps.return_value = DayIntervals(
+        [(to_epoch_day("2024-01-11"), to_epoch_day("2024-01-11"))]
+    )
 
     db_helper.async_get_all_consumptions_with_absolute.return_value = [
         ("2024-01-10 00:00:00", 100.0),
@@ -41,14 +47,6 @@ async def test_async_handle_missing_dates(
     ]
 
     with (
-        patch(
-            "custom_components.eyeonsaur.coordinator.find_missing_dates",
-            return_value=mock_missing_dates,
-        ),
-        patch(
-            "custom_components.eyeonsaur.coordinator.sync_reduce_missing_dates",
-            return_value=mock_reduced_missing_dates,
-        ),
         patch(
             "custom_components.eyeonsaur.coordinator.asyncio.sleep",
             new_callable=AsyncMock,
@@ -62,8 +60,41 @@ async def test_async_handle_missing_dates(
 
         # Vérifier que les fonctions de gestion des dates
         # manquantes ont été appelées
-        assert (
-            coordinator.db_helper.async_get_all_consumptions_with_absolute.call_count
-            == 1
-        )
-        coordinator.recorder.async_inject_historical_data.assert_awaited()
+        # Seuls les jours modifiés sont relus, pas tout l'historique
+        coordinator.db_helper.async_get_all_consumptions_with_absolute.assert_not_called()
+        coordinator.recorder.async_inject_statistics.assert_awaited()
+        coordinator.db_helper.async_get_gaps.assert_awaited()
+
+
+async def test_blacklist_survives_restart(
+    hass: HomeAssistant, mock_config_entry, mock_saur_client
+):
+    """Test that a month blacklisted before a restart is not requested."""
+    db_helper = AsyncMock()
+    recorder = AsyncMock()
+    # Coordinateur neuf : rien en mémoire, la blacklist vient de la base
+    coordinator = SaurCoordinator(hass, mock_config_entry, db_helper, recorder)
+    coordinator.client = mock_saur_client
+    compteur = MagicMock(sectionId=SectionId("123"))
+
+    db_helper.async_get_gaps.return_value = DayIntervals(
+        [(to_epoch_day("2023-12-20"), to_epoch_day("2024-01-31"))]
+    )
+    db_helper.async_get_flagged_months.return_value = [(2024, 1)]
+
+    with (
+        patch(
+            "custom_components.eyeonsaur.coordinator.asyncio.sleep",
+            new_callable=AsyncMock,
+        ),
+        patch.object(hass, "async_add_executor_job") as add_job,
+    ):
+        await coordinator._async_handle_missing_dates(compteur)
+
+    db_helper.async_get_flagged_months.assert_awaited_once_with(
+        SectionId("123"), CoverageFlag.BLACKLISTED
+    )
+    # Janvier est blacklisté : seul décembre est redemandé
+    add_job.assert_called_once_with(
+        coordinator._sync_fetch_monthly_data, 2023, 12, compteur
+    )
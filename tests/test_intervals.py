@@ -0,0 +1,55 @@
+"""Tests for the EyeOnSaur day interval sets."""
+
+from datetime import date
+
+from custom_components.eyeonsaur.helpers.dateutils import to_epoch_day
+from custom_components.eyeonsaur.helpers.intervals import DayIntervals
+
+
+def test_intervals_are_normalized() -> None:
+    """Test that intervals are sorted and merged when they touch."""
+    intervals = DayIntervals([(10, 12), (1, 3), (4, 6), (11, 20), (30, 29)])
+    assert list(intervals) == [(1, 6), (10, 20)]
+    assert len(intervals) == 2
+    assert intervals.days == 17
+    assert (intervals.first_day, intervals.last_day) == (1, 20)
+    assert not DayIntervals()
+    assert DayIntervals().last_day is None
+
+
+def test_union_and_subtract() -> None:
+    """Test the set operations."""
+    left = DayIntervals([(1, 10), (20, 30)])
+    right = DayIntervals([(5, 22), (40, 41)])
+
+    assert list(left.union(right)) == [(1, 30), (40, 41)]
+    assert list(left.subtract(right)) == [(1, 4), (23, 30)]
+    assert list(right.subtract(left)) == [(11, 19), (40, 41)]
+    assert list(left.intersection(right)) == [(5, 10), (20, 22)]
+    assert left.subtract(DayIntervals([(0, 100)])) == DayIntervals()
+    assert list(left.subtract(DayIntervals([(3, 3), (5, 6)]))) == [
+        (1, 2),
+        (4, 4),
+        (7, 10),
+        (20, 30),
+    ]
+
+
+def test_month_projection() -> None:
+    """Test that a long hole is one interval, split only when projected."""
+    hole = DayIntervals(
+        [(to_epoch_day(date(2021, 1, 15)), to_epoch_day(date(2024, 1, 14)))]
+    )
+    assert len(hole) == 1
+
+    months = hole.by_month()
+    assert len(months) == 37
+    assert list(months[(2021, 1)]) == [
+        (to_epoch_day(date(2021, 1, 15)), to_epoch_day(date(2021, 1, 31)))
+    ]
+    assert months[(2022, 2)].days == 28
+    assert sum(month.days for month in months.values()) == hole.days
+
+    blacklisted = DayIntervals.from_months([(2023, 12), (2024, 1)])
+    remaining = hole.subtract(blacklisted)
+    assert remaining.last_day == to_epoch_day(date(2023, 11, 30))
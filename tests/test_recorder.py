@@ -1,7 +1,7 @@
 """Tests for the EyeOnSaur recorder."""
 
 from datetime import datetime
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from homeassistant.core import HomeAssistant
@@ -17,9 +17,17 @@ def mock_recorder_module():
     """Mock the recorder module."""
     with (
         patch(
-            "custom_components.eyeonsaur.recorder.recorder", new_callable=Mock
+            "custom_components.eyeonsaur.recorder.recorder",
+            new_callable=Mock,
+            create=True,
         ),
         patch("custom_components.eyeonsaur.recorder.async_import_statistics"),
+        patch(
+            "custom_components.eyeonsaur.recorder.get_instance",
+            return_value=Mock(
+                async_add_executor_job=AsyncMock(return_value={})
+            ),
+        ),
         patch(
             "custom_components.eyeonsaur.recorder.StatisticData",
             new_callable=Mock,
@@ -44,3 +52,61 @@ async def test_async_inject_historical_data(hass: HomeAssistant) -> None:
 
     # Appeler la fonction à tester
     await saur_recorder.async_inject_historical_data(entity_id, date, value)
+
+
+async def test_async_inject_statistics(hass: HomeAssistant) -> None:
+    """Test that a whole series is imported in a single call."""
+    saur_recorder = SaurRecorder(hass)
+    series = [
+        (as_local(datetime(2024, 1, day)), 100.0 + day) for day in range(1, 32)
+    ]
+
+    with patch(
+        "custom_components.eyeonsaur.recorder.async_import_statistics"
+    ) as mock_import:
+        assert await saur_recorder.async_inject_statistics("123", series) == 31
+        assert await saur_recorder.async_inject_statistics("123", []) == 0
+
+    mock_import.assert_called_once()
+    _, _, stats = mock_import.call_args.args
+    assert len(stats) == 31
+
+
+async def test_async_inject_statistics_skips_unchanged(
+    hass: HomeAssistant,
+) -> None:
+    """Test that rows already held by the recorder are not imported."""
+    saur_recorder = SaurRecorder(hass)
+    series = [
+        (as_local(datetime(2024, 1, day)), 100.0 + day) for day in range(1, 11)
+    ]
+    existing = {
+        "123": [
+            {
+                "start": as_local(datetime(2024, 1, day, 1)).timestamp(),
+                "sum": 100.0 + day + 0.0001,
+            }
+            for day in range(1, 10)
+        ]
+    }
+    instance = Mock(async_add_executor_job=AsyncMock(return_value=existing))
+
+    with (
+        patch(
+            "custom_components.eyeonsaur.recorder.get_instance",
+            return_value=instance,
+        ),
+        patch(
+            "custom_components.eyeonsaur.recorder.async_import_statistics"
+        ) as mock_import,
+    ):
+        # Le 10 n'est pas encore enregistré, les autres jours sont à jour
+        assert await saur_recorder.async_inject_statistics("123", series) == 1
+        # Tout est à jour : aucune écriture
+        assert (
+            await saur_recorder.async_inject_statistics("123", series[:9]) == 0
+        )
+
+    mock_import.assert_called_once()
+    # Une seule lecture par import
+    assert instance.async_add_executor_job.await_count == 2
@@ -0,0 +1,23 @@
+"""Tests for the EyeOnSaur archive encoding."""
+
+import pytest
+
+from custom_components.eyeonsaur.helpers.saur_archive import (
+    pack_litres,
+    unpack_litres,
+)
+
+
+def test_pack_round_trip() -> None:
+    """Test that daily litres survive packing and compression."""
+    values = [0, 120, 3500, 2**31 - 1, 42] * 73
+    blob = pack_litres(values)
+    assert len(blob) < 4 * len(values)
+    assert list(unpack_litres(blob, sum(values))) == values
+
+
+def test_checksum_mismatch_is_detected() -> None:
+    """Test that a wrong exact-sum checksum is rejected."""
+    blob = pack_litres([1, 2, 3])
+    with pytest.raises(ValueError, match="Somme de contrôle"):
+        unpack_litres(blob, 7)
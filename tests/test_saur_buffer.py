@@ -0,0 +1,58 @@
+"""Tests for the EyeOnSaur write-behind buffer."""
+
+from custom_components.eyeonsaur.helpers.saur_buffer import SaurWriteBuffer
+from custom_components.eyeonsaur.models import SectionId
+
+SECTION: SectionId = SectionId("section")
+OTHER: SectionId = SectionId("other")
+
+
+def test_rows_are_coalesced_per_day() -> None:
+    """Test that a day written twice is kept once, with its last value."""
+    buffer = SaurWriteBuffer(max_rows=10, max_delay=30.0)
+    assert not buffer
+    buffer.add(SECTION, {1: 100, 2: 200})
+    buffer.add(SECTION, {2: 250, 3: 300})
+    buffer.add(OTHER, {2: 50})
+
+    assert len(buffer) == 4
+    assert buffer.coalesced == 1
+    assert buffer.drain() == {
+        SECTION: {1: 100, 2: 250, 3: 300},
+        OTHER: {2: 50},
+    }
+    assert not buffer
+
+
+def test_size_threshold() -> None:
+    """Test that the buffer reports when it must be flushed."""
+    buffer = SaurWriteBuffer(max_rows=3, max_delay=30.0)
+    buffer.add(SECTION, {1: 100, 2: 200})
+    assert not buffer.is_full
+    buffer.add(SECTION, {2: 100})
+    assert not buffer.is_full
+    buffer.add(OTHER, {1: 100})
+    assert buffer.is_full
+
+
+def test_take_one_meter() -> None:
+    """Test that pending rows of one meter can be taken alone."""
+    buffer = SaurWriteBuffer(max_rows=10, max_delay=30.0)
+    buffer.add(SECTION, {1: 100})
+    buffer.add(OTHER, {1: 10, 2: 20})
+
+    assert buffer.take(SECTION) == {1: 100}
+    assert buffer.take(SECTION) == {}
+    assert len(buffer) == 2
+
+
+def test_restore_keeps_newer_values() -> None:
+    """Test that rows put back after a failed flush do not win."""
+    buffer = SaurWriteBuffer(max_rows=10, max_delay=30.0)
+    buffer.add(SECTION, {1: 100, 2: 200})
+    pending = buffer.drain()
+    buffer.add(SECTION, {2: 999})
+
+    buffer.restore(pending)
+    assert len(buffer) == 2
+    assert buffer.drain() == {SECTION: {1: 100, 2: 999}}
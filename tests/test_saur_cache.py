@@ -0,0 +1,111 @@
+"""Tests for the EyeOnSaur history cache."""
+
+from custom_components.eyeonsaur.helpers.saur_cache import (
+    ENTRY_OVERHEAD,
+    ROW_SIZE,
+    SaurHistoryCache,
+)
+from custom_components.eyeonsaur.models import SectionId
+
+SECTION: SectionId = SectionId("section")
+OTHER: SectionId = SectionId("other")
+
+
+def test_get_counts_hits_and_misses() -> None:
+    """Test that lookups are counted."""
+    cache = SaurHistoryCache(10_000)
+    assert cache.get("key") is None
+    cache.put(
+        "key",
+        1.5,
+        section_id=SECTION,
+        days=(None, 10),
+        generation=cache.generation(SECTION),
+    )
+    assert cache.get("key") == 1.5
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    """Test that the memory budget evicts the least recently used entry."""
+    cache = SaurHistoryCache(2 * (ENTRY_OVERHEAD + 3 * ROW_SIZE))
+    for key in ("a", "b"):
+        cache.put(
+            key,
+            [1, 2, 3],
+            section_id=SECTION,
+            days=(None, None),
+            generation=cache.generation(SECTION),
+        )
+    cache.get("a")
+    cache.put(
+        "c",
+        [1, 2, 3],
+        section_id=SECTION,
+        days=(None, None),
+        generation=cache.generation(SECTION),
+    )
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1, 2, 3]
+    assert cache.get("c") == [1, 2, 3]
+    assert cache.evictions == 1
+    assert cache.size_bytes <= cache.max_bytes
+
+
+def test_invalidate_only_overlapping_ranges() -> None:
+    """Test that invalidation is limited to the meter and the day range."""
+    cache = SaurHistoryCache(10_000)
+    ranges = {"old": (None, 10), "recent": (20, 30), "all": (None, None)}
+    for key, days in ranges.items():
+        cache.put(
+            key,
+            key,
+            section_id=SECTION,
+            days=days,
+            generation=cache.generation(SECTION),
+        )
+    cache.put(
+        "other",
+        "other",
+        section_id=OTHER,
+        days=(None, None),
+        generation=cache.generation(OTHER),
+    )
+
+    cache.invalidate(SECTION, 15, 18)
+
+    assert cache.get("old") == "old"
+    assert cache.get("recent") == "recent"
+    assert cache.get("all") is None
+    assert cache.get("other") == "other"
+
+    cache.invalidate(SECTION, 25)
+    assert cache.get("recent") is None
+    assert cache.get("old") == "old"
+
+
+def test_stale_read_is_not_cached() -> None:
+    """Test that a read started before an invalidation is dropped."""
+    cache = SaurHistoryCache(10_000)
+    generation = cache.generation(SECTION)
+    cache.invalidate(SECTION, 5, 5)
+    cache.put(
+        "key",
+        "stale",
+        section_id=SECTION,
+        days=(None, None),
+        generation=generation,
+    )
+    assert len(cache) == 0
+
+    generation = cache.generation(SECTION)
+    cache.clear()
+    cache.put(
+        "key",
+        "stale",
+        section_id=SECTION,
+        days=(None, None),
+        generation=generation,
+    )
+    assert len(cache) == 0
@@ -1,21 +1,33 @@
 # tests/test_saur_db.py
 import asyncio
 import os
+import re
+import sqlite3
 from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
-from datetime import datetime
+from contextlib import asynccontextmanager, closing
+from datetime import date, datetime, timedelta
 from typing import Final
 
 import pytest
 from homeassistant.core import HomeAssistant
 
+from custom_components.eyeonsaur.helpers import saur_journal
+from custom_components.eyeonsaur.helpers.dateutils import to_epoch_day
+from custom_components.eyeonsaur.helpers.saur_backup import (
+    backup_dir,
+    list_backups,
+)
+from custom_components.eyeonsaur.helpers.saur_coverage import CoverageFlag
 from custom_components.eyeonsaur.helpers.saur_db import (
     SaurDatabaseError,
     SaurDatabaseHelper,
 )
+from custom_components.eyeonsaur.helpers.saur_schema import SCHEMA_VERSION
 from custom_components.eyeonsaur.models import (
     ConsumptionData,
     ConsumptionDatas,
+    ConsumptionSummary,
+    ConsumptionWriteResult,
     RelevePhysique,
     SaurSqliteResponse,
     SectionId,
@@ -36,14 +48,14 @@ pytestmark = pytest.mark.asyncio
 
 @asynccontextmanager
 async def temp_db(
-    hass: HomeAssistant, db_file: str
+    hass: HomeAssistant, db_file: str, reset: bool = True
 ) -> AsyncGenerator[SaurDatabaseHelper, None]:
     """Context manager for creating and cleaning up a test database."""
     db_helper = SaurDatabaseHelper(hass, TEST_ENTRY_ID)
     db_helper.db_path = db_file
 
     # Supprimer la base de données si elle existe
-    if os.path.exists(db_helper.db_path):
+    if reset and os.path.exists(db_helper.db_path):
         os.remove(db_helper.db_path)
 
     # initialiser la base
@@ -54,9 +66,7 @@ async def temp_db(
     finally:
         # Ensure connection is closed and db file is removed even if tests fail
         try:
-            await db_helper._async_execute_query(
-                "SELECT 1"
-            )  # Simple query to ensure connection is closed
+            await db_helper.async_close()
 
         except Exception as e:
             print(
@@ -160,6 +170,45 @@ async def test_async_init_db(db_helper: SaurDatabaseHelper) -> None:
     await db_helper._async_execute_query("SELECT 1")
 
 
+async def test_connections_are_reused(db_helper: SaurDatabaseHelper) -> None:
+    """Test that queries reuse the persistent connections."""
+    connections = db_helper._get_connections()
+    with connections.connection() as first_conn:
+        pass
+
+    await db_helper._async_execute_query("SELECT 1")
+    await db_helper._async_read_query("SELECT 1")
+
+    assert db_helper._get_connections() is connections
+    with connections.connection() as conn:
+        assert conn is first_conn
+
+
+async def test_async_close(db_helper: SaurDatabaseHelper) -> None:
+    """Test that async_close releases the connections."""
+    connections = db_helper._get_connections()
+    await db_helper.async_close()
+
+    assert not connections.is_open
+    with pytest.raises(SaurDatabaseError), connections.connection():
+        pass
+
+    # Une nouvelle requête rouvre la base à la demande
+    await db_helper._async_read_query("SELECT 1")
+
+
+async def test_queries_run_on_database_worker(
+    db_helper: SaurDatabaseHelper,
+) -> None:
+    """Test that SQL jobs are accounted by the database worker."""
+    jobs_before = db_helper.worker_stats.jobs
+    await db_helper._async_read_query("SELECT 1")
+    await db_helper._async_execute_query("SELECT 1")
+
+    assert db_helper.worker_stats.jobs == jobs_before + 2
+    assert db_helper.worker_stats.queue_depth == 0
+
+
 async def test_async_write_consumptions(db_helper: SaurDatabaseHelper) -> None:
     """Test async_write_consumptions."""
     await db_helper._async_execute_query("DELETE FROM consumptions")
@@ -178,9 +227,10 @@ async def test_async_write_consumptions(db_helper: SaurDatabaseHelper) -> None:
             ),
         ]
     )
-    await db_helper.async_write_consumptions(
+    result = await db_helper.async_write_consumptions(
         consumptions, TEST_SECTION_ID
     )  # Pass section_id
+    assert result == ConsumptionWriteResult(inserted=2, updated=0, unchanged=0)
 
     # Vérifier que les données sont bien écrites dans la base
     rows: SaurSqliteResponse = await db_helper._async_execute_query(
@@ -188,14 +238,62 @@ async def test_async_write_consumptions(db_helper: SaurDatabaseHelper) -> None:
     )
     assert rows is not None
     assert len(rows) == 2
-    assert rows[0]["date"] == "2024-01-01 00:00:00"
-    assert rows[0]["relative_value"] == 1.0
+    # Jours epoch et litres entiers
+    assert rows[0]["day"] == to_epoch_day("2024-01-01") == 19723
+    assert rows[0]["litres"] == 1000
     assert rows[0]["section_id"] == TEST_SECTION_ID
-    assert rows[1]["date"] == "2024-01-02 00:00:00"
-    assert rows[1]["relative_value"] == 2.0
+    assert rows[1]["day"] == 19724
+    assert rows[1]["litres"] == 2000
     assert rows[1]["section_id"] == TEST_SECTION_ID
 
 
+async def test_async_write_consumptions_counts(
+    db_helper: SaurDatabaseHelper,
+) -> None:
+    """Test the inserted/updated/unchanged counts of a batch write."""
+    consumptions = ConsumptionDatas(
+        [
+            ConsumptionData(
+                startDate=StrDate("2024-10-21 00:00:00"),
+                value=0.82,
+                rangeType="Day",
+            ),
+            ConsumptionData(
+                startDate=StrDate("2024-10-22 00:00:00"),
+                value=0.45,
+                rangeType="Day",
+            ),
+            ConsumptionData(
+                startDate=StrDate("2024-10-23 00:00:00"),
+                value=0.3,
+                rangeType="Day",
+            ),
+            ConsumptionData(
+                startDate=StrDate("2024-10-01 00:00:00"),
+                value=12.0,
+                rangeType="Month",
+            ),
+        ]
+    )
+
+    result = await db_helper.async_write_consumptions(
+        consumptions, TEST_SECTION_ID
+    )
+    assert result == ConsumptionWriteResult(inserted=1, updated=1, unchanged=1)
+
+    result = await db_helper.async_write_consumptions(
+        consumptions, TEST_SECTION_ID
+    )
+    assert result == ConsumptionWriteResult(inserted=0, updated=0, unchanged=3)
+
+    rows = await db_helper._async_execute_query(
+        "SELECT litres FROM consumptions WHERE section_id = ? AND day = ?",
+        (TEST_SECTION_ID, to_epoch_day("2024-10-22")),
+    )
+    assert rows is not None
+    assert rows[0]["litres"] == 450
+
+
 async def test_async_update_anchor(db_helper: SaurDatabaseHelper) -> None:
     """Test async_update_anchor."""
     anchor_data: RelevePhysique = RelevePhysique(
@@ -215,9 +313,9 @@ async def test_async_update_anchor(db_helper: SaurDatabaseHelper) -> None:
     )
     assert rows is not None
     assert len(rows) == 1
-    assert rows[0]["date"] == "2024-01-01 00:00:00"
+    assert rows[0]["day"] == to_epoch_day("2024-01-01")
     assert rows[0]["section_id"] == TEST_SECTION_ID
-    assert rows[0]["value"] == 100
+    assert rows[0]["litres"] == 100_000
 
 
 async def test_async_get_total_consumption(
@@ -514,3 +612,1309 @@ async def test_async_get_all_consumptions_with_absolute3(
         expected_date = ordered_dates[i]
         assert str(row.date) == expected_date
         assert row.indexValue == pytest.approx(expected_values[expected_date])
+
+
+async def test_absolute_index_incremental_update(
+    db_helper: SaurDatabaseHelper,
+) -> None:
+    """Test that the absolute index follows writes on both anchor sides."""
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                # Nouveau jour après l'ancre : seul le suffixe bouge
+                ConsumptionData(
+                    startDate=StrDate("2024-10-23 00:00:00"),
+                    value=0.3,
+                    rangeType="Day",
+                ),
+                # Jour rattrapé avant l'ancre : seul le préfixe bouge
+                ConsumptionData(
+                    startDate=StrDate("2024-10-18 00:00:00"),
+                    value=0.2,
+                    rangeType="Day",
+                ),
+            ]
+        ),
+        TEST_SECTION_ID,
+    )
+
+    result = await db_helper.async_get_all_consumptions_with_absolute(
+        TEST_SECTION_ID
+    )
+    assert [row.date for row in result] == [
+        "2024-10-23 00:00:00",
+        "2024-10-22 00:00:00",
+        "2024-10-21 00:00:00",
+        "2024-10-20 00:00:00",
+        "2024-10-19 00:00:00",
+        "2024-10-18 00:00:00",
+    ]
+    assert [row.indexValue for row in result] == pytest.approx(
+        [114.72, 114.42, 114.0, 113.18, 112.68, 112.17]
+    )
+
+
+async def test_absolute_index_follows_anchor(
+    db_helper: SaurDatabaseHelper,
+) -> None:
+    """Test that a new anchor recomputes the meter's absolute index."""
+    await db_helper.async_update_anchor(
+        RelevePhysique(date=StrDate("2024-10-22 00:00:00"), valeur=200.0),
+        TEST_SECTION_ID,
+    )
+
+    # Le relevé du 21/10 reste la référence des jours qui le précèdent
+    result = await db_helper.async_get_all_consumptions_with_absolute(
+        TEST_SECTION_ID
+    )
+    assert [row.indexValue for row in result] == pytest.approx(
+        [200.0, 114.0, 113.18, 112.68]
+    )
+    # L'autre compteur n'est pas affecté
+    other = await db_helper.async_get_all_consumptions_with_absolute(
+        TEST_SECTION_ID_2
+    )
+    assert other[1].indexValue == 50.0
+
+
+async def test_schema_is_migrated(db_helper: SaurDatabaseHelper) -> None:
+    """Test that async_init_db brings the schema to the latest version."""
+    rows = await db_helper._async_read_query("PRAGMA user_version")
+    assert rows is not None
+    assert rows[0][0] == SCHEMA_VERSION
+
+    # Relancer l'initialisation ne rejoue aucune migration
+    await db_helper.async_init_db()
+    rows = await db_helper._async_read_query("PRAGMA user_version")
+    assert rows is not None
+    assert rows[0][0] == SCHEMA_VERSION
+
+
+async def test_legacy_database_is_migrated(hass: HomeAssistant) -> None:
+    """Test the migration of a database created before versioning."""
+    legacy_file = "test_legacy_consommation_saur.db"
+    if os.path.exists(legacy_file):
+        os.remove(legacy_file)
+    with closing(sqlite3.connect(legacy_file)) as conn, conn:
+        conn.execute(
+            "CREATE TABLE consumptions (date TEXT NOT NULL, section_id TEXT "
+            "NOT NULL, relative_value REAL NOT NULL, is_ancre INTEGER NOT "
+            "NULL DEFAULT 0, PRIMARY KEY (date, section_id))"
+        )
+        conn.execute(
+            "CREATE TABLE anchor_value (date TEXT NOT NULL, section_id TEXT "
+            "NOT NULL, value REAL NOT NULL, PRIMARY KEY (date, section_id))"
+        )
+        conn.executemany(
+            "INSERT INTO consumptions VALUES (?, ?, ?, 0)",
+            [
+                ("2024-10-20 00:00:00", TEST_SECTION_ID, 0.5),
+                ("2024-10-21 00:00:00", TEST_SECTION_ID, 0.82),
+            ],
+        )
+        conn.execute(
+            "INSERT INTO anchor_value VALUES (?, ?, ?)",
+            ("2024-10-21 00:00:00", TEST_SECTION_ID, 114.0),
+        )
+
+    async with temp_db(hass, legacy_file, reset=False) as db_helper:
+        result = await db_helper.async_get_all_consumptions_with_absolute(
+            TEST_SECTION_ID
+        )
+        rows = await db_helper._async_read_query(
+            "SELECT day, litres FROM consumptions ORDER BY day"
+        )
+        missing = await db_helper.async_get_missing(
+            TEST_SECTION_ID, date(2024, 10, 19), date(2024, 10, 22)
+        )
+
+    assert list(missing) == [
+        (to_epoch_day("2024-10-19"), to_epoch_day("2024-10-19")),
+        (to_epoch_day("2024-10-22"), to_epoch_day("2024-10-22")),
+    ]
+    assert [row.date for row in result] == [
+        "2024-10-21 00:00:00",
+        "2024-10-20 00:00:00",
+    ]
+    assert [row.indexValue for row in result] == [114.0, 113.18]
+    assert rows is not None
+    assert [tuple(row) for row in rows] == [(20016, 500), (20017, 820)]
+
+
+async def test_hot_queries_use_indexes(db_helper: SaurDatabaseHelper) -> None:
+    """Test that no hot query needs a full table scan.
+
+    Every statement run by a typical refresh is captured on the live
+    connection, then checked with EXPLAIN QUERY PLAN. Table aliases, in
+    the statements and in the views they read, are resolved: a SCAN is
+    only allowed over the rows of a subquery or view of the same plan.
+    """
+    connections = db_helper._get_connections()
+    statements: list[str] = []
+    with connections.connection() as conn:
+        conn.set_trace_callback(statements.append)
+
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate("2024-10-23 00:00:00"),
+                    value=0.3,
+                    rangeType="Day",
+                ),
+                ConsumptionData(
+                    startDate=StrDate("2024-10-18 00:00:00"),
+                    value=0.2,
+                    rangeType="Day",
+                ),
+            ]
+        ),
+        TEST_SECTION_ID,
+    )
+    await db_helper.async_update_anchor(
+        RelevePhysique(date=StrDate("2024-10-22 00:00:00"), valeur=115.0),
+        TEST_SECTION_ID,
+    )
+    await db_helper.async_get_total_consumption(
+        datetime(2024, 10, 23), TEST_SECTION_ID
+    )
+    await db_helper.async_get_all_consumptions_with_absolute(TEST_SECTION_ID)
+    await db_helper.async_get_consumption_summary(
+        TEST_SECTION_ID, date(2024, 9, 28), date(2024, 11, 3)
+    )
+    await db_helper.async_get_gaps(TEST_SECTION_ID)
+    await db_helper.async_get_missing(
+        TEST_SECTION_ID, date(2024, 9, 1), date(2024, 11, 30)
+    )
+    await db_helper.async_is_month_complete(TEST_SECTION_ID, 2024, 10)
+    async for _ in db_helper.async_iter_consumptions(
+        TEST_SECTION_ID, start=date(2024, 10, 20), descending=True
+    ):
+        pass
+
+    with connections.connection() as conn:
+        conn.set_trace_callback(None)
+        queries = {
+            statement.strip()
+            for statement in statements
+            if statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        }
+        views = [
+            row["sql"]
+            for row in conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'view'"
+            )
+        ]
+        assert queries
+        for query in queries:
+            aliases: dict[str, set[str]] = {}
+            for name, alias in re.findall(
+                r"\b(?:FROM|JOIN)\s+(\w+)\s+(?:AS\s+)?(\w+)",
+                " ".join([query, *views]),
+                re.IGNORECASE,
+            ):
+                aliases.setdefault(alias, set()).add(name)
+            plan = [
+                row["detail"]
+                for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")
+            ]
+            subqueries = {
+                detail.split(" ", 1)[1]
+                for detail in plan
+                if detail.startswith(("CO-ROUTINE ", "MATERIALIZE "))
+            }
+            full_scans = [
+                detail
+                for detail in plan
+                if detail.startswith("SCAN ")
+                and (target := detail.split(" ", 1)[1]) not in subqueries
+                and not aliases.get(target, {target}) <= subqueries
+            ]
+            assert not full_scans, f"{query} -> {full_scans}"
+
+
+async def test_async_iter_consumptions(db_helper: SaurDatabaseHelper) -> None:
+    """Test the chunked range iterator in both orders."""
+    ascending = [
+        row
+        async for row in db_helper.async_iter_consumptions(
+            TEST_SECTION_ID, chunk_size=3
+        )
+    ]
+    assert [row.date for row in ascending] == [
+        "2024-10-19 00:00:00",
+        "2024-10-20 00:00:00",
+        "2024-10-21 00:00:00",
+        "2024-10-22 00:00:00",
+    ]
+    assert ascending[0].value == 0.51
+    assert ascending[2].indexValue == 114.0
+
+    descending = [
+        row.date
+        async for row in db_helper.async_iter_consumptions(
+            TEST_SECTION_ID,
+            start=date(2024, 10, 20),
+            end=date(2024, 10, 22),
+            descending=True,
+            chunk_size=2,
+        )
+    ]
+    assert descending == [
+        "2024-10-22 00:00:00",
+        "2024-10-21 00:00:00",
+        "2024-10-20 00:00:00",
+    ]
+
+
+async def test_async_iter_consumptions_without_anchor(
+    db_helper: SaurDatabaseHelper,
+) -> None:
+    """Test that days without an anchor have no absolute index."""
+    consumptions = ConsumptionDatas(
+        [
+            ConsumptionData(
+                startDate=StrDate("2024-10-19 00:00:00"),
+                value=0.3,
+                rangeType="Day",
+            )
+        ]
+    )
+    await db_helper.async_write_consumptions(
+        consumptions, SectionId("no_anchor")
+    )
+
+    rows = [
+        row
+        async for row in db_helper.async_iter_consumptions(
+            SectionId("no_anchor")
+        )
+    ]
+    assert len(rows) == 1
+    assert rows[0].indexValue is None
+
+
+async def test_prefix_index(
+    hass: HomeAssistant, db_helper: SaurDatabaseHelper
+) -> None:
+    """Test in-memory range totals and as-of index values."""
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                # Jour rattrapé au milieu de l'historique
+                ConsumptionData(
+                    startDate=StrDate("2024-10-20 00:00:00"),
+                    value=0.6,
+                    rangeType="Day",
+                ),
+                ConsumptionData(
+                    startDate=StrDate("2024-10-25 00:00:00"),
+                    value=0.3,
+                    rangeType="Day",
+                ),
+            ]
+        ),
+        TEST_SECTION_ID,
+    )
+
+    assert db_helper.get_range_consumption(
+        TEST_SECTION_ID, date(2024, 10, 19), date(2024, 10, 21)
+    ) == pytest.approx(0.51 + 0.6 + 0.82)
+    assert db_helper.get_range_consumption(
+        TEST_SECTION_ID, date(2024, 1, 1), date(2024, 12, 31)
+    ) == pytest.approx(0.51 + 0.6 + 0.82 + 0.42 + 0.3)
+    assert await db_helper.async_get_total_consumption(
+        datetime(2024, 10, 25), TEST_SECTION_ID
+    ) == pytest.approx(114.72)
+
+    # Même valeurs que l'index absolu matérialisé
+    absolute = await db_helper.async_get_all_consumptions_with_absolute(
+        TEST_SECTION_ID
+    )
+    for row in absolute:
+        assert db_helper.get_index_at(
+            TEST_SECTION_ID, datetime.fromisoformat(row.date).date()
+        ) == pytest.approx(row.indexValue)
+    unknown = SectionId("inconnu")
+    assert db_helper.get_index_at(unknown, date(2024, 1, 1)) is None
+
+    # Reconstruit depuis la base à l'ouverture
+    async with temp_db(hass, DB_FILE, reset=False) as reopened:
+        assert reopened.get_range_consumption(
+            TEST_SECTION_ID, date(2024, 10, 19), date(2024, 10, 25)
+        ) == pytest.approx(0.51 + 0.6 + 0.82 + 0.42 + 0.3)
+        assert reopened.get_index_at(
+            TEST_SECTION_ID, date(2024, 10, 19)
+        ) == pytest.approx(114.0 - 0.6 - 0.82)
+
+
+async def test_consumption_summary(db_helper: SaurDatabaseHelper) -> None:
+    """Test that rollups answer multi-year ranges like a daily scan."""
+    start = date(2021, 11, 27)
+    volumes = {
+        start + timedelta(days=offset): round(0.1 + (offset * 37 % 11) / 10, 2)
+        for offset in range(900)
+    }
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate(f"{day.isoformat()} 00:00:00"),
+                    value=value,
+                    rangeType="Day",
+                )
+                for day, value in volumes.items()
+            ]
+        ),
+        TEST_SECTION_ID_2,
+    )
+    # Rattrapage d'un jour déjà agrégé
+    volumes[date(2022, 6, 15)] = 3.5
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate("2022-06-15 00:00:00"),
+                    value=3.5,
+                    rangeType="Day",
+                )
+            ]
+        ),
+        TEST_SECTION_ID_2,
+    )
+
+    first, last = date(2021, 12, 3), date(2024, 3, 12)
+    expected = [value for day, value in volumes.items() if first <= day <= last]
+    summary = await db_helper.async_get_consumption_summary(
+        TEST_SECTION_ID_2, first, last
+    )
+    assert summary.volume == pytest.approx(sum(expected))
+    assert summary.days == len(expected)
+    assert summary.min_volume == pytest.approx(min(expected))
+    assert summary.max_volume == 3.5
+
+    empty = await db_helper.async_get_consumption_summary(
+        TEST_SECTION_ID, date(2020, 1, 1), date(2020, 12, 31)
+    )
+    assert empty == ConsumptionSummary(0.0, 0, None, None)
+
+
+async def test_absolute_index_multiple_anchors(
+    db_helper: SaurDatabaseHelper,
+) -> None:
+    """Test the segmented absolute index between several anchors."""
+    # Relevé plus ancien que l'ancre du 21/10 : l'écart de 0,68 m³ est
+    # réparti sur le segment du 19/10 au 21/10
+    await db_helper.async_update_anchor(
+        RelevePhysique(date=StrDate("2024-10-19 00:00:00"), valeur=112.0),
+        TEST_SECTION_ID,
+    )
+    result = await db_helper.async_get_all_consumptions_with_absolute(
+        TEST_SECTION_ID
+    )
+    assert [row.indexValue for row in result] == pytest.approx(
+        [114.42, 114.0, 112.84, 112.0]
+    )
+
+    # Un jour rattrapé dans le segment ne change que ce segment
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate("2024-10-20 00:00:00"),
+                    value=0.9,
+                    rangeType="Day",
+                ),
+            ]
+        ),
+        TEST_SECTION_ID,
+    )
+    result = await db_helper.async_get_all_consumptions_with_absolute(
+        TEST_SECTION_ID
+    )
+    assert [row.indexValue for row in result] == pytest.approx(
+        [114.42, 114.0, 113.04, 112.0]
+    )
+    for row in result:
+        assert db_helper.get_index_at(
+            TEST_SECTION_ID, datetime.fromisoformat(row.date).date()
+        ) == pytest.approx(row.indexValue)
+
+    # Le total reste calculé depuis le relevé le plus récent
+    assert await db_helper.async_get_total_consumption(
+        datetime(2024, 10, 22), TEST_SECTION_ID
+    ) == pytest.approx(114.42)
+
+
+async def test_async_get_total_consumptions(
+    db_helper: SaurDatabaseHelper,
+) -> None:
+    """Test batched totals for several meters."""
+    dates = [date(2024, 10, day) for day in range(18, 24)]
+    totals = await db_helper.async_get_total_consumptions(
+        dates, [TEST_SECTION_ID, TEST_SECTION_ID_2]
+    )
+
+    assert set(totals) == {TEST_SECTION_ID, TEST_SECTION_ID_2}
+    for section_id, values in totals.items():
+        assert values == [
+            await db_helper.async_get_total_consumption(
+                datetime.combine(target_date, datetime.min.time()), section_id
+            )
+            for target_date in dates
+        ]
+    assert totals[TEST_SECTION_ID][-1] == pytest.approx(114.42)
+
+
+async def test_async_get_gaps(db_helper: SaurDatabaseHelper) -> None:
+    """Test SQL-side gap detection."""
+    assert not await db_helper.async_get_gaps(TEST_SECTION_ID)
+
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate(f"{day} 00:00:00"),
+                    value=0.1,
+                    rangeType="Day",
+                )
+                for day in ("2024-10-15", "2024-10-17", "2024-10-26")
+            ]
+        ),
+        TEST_SECTION_ID,
+    )
+    gaps = await db_helper.async_get_gaps(TEST_SECTION_ID)
+    assert list(gaps) == [
+        (to_epoch_day("2024-10-16"), to_epoch_day("2024-10-16")),
+        (to_epoch_day("2024-10-18"), to_epoch_day("2024-10-18")),
+        (to_epoch_day("2024-10-23"), to_epoch_day("2024-10-25")),
+    ]
+    assert not await db_helper.async_get_gaps(SectionId("inconnu"))
+
+
+async def test_gaps_cached_until_write(db_helper: SaurDatabaseHelper) -> None:
+    """Test that the gap scan is cached until a write on its section."""
+    cache = db_helper.history_cache
+    cache.clear()
+    hits, misses = cache.hits, cache.misses
+
+    def day(value: str) -> ConsumptionDatas:
+        return ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate(f"{value} 00:00:00"),
+                    value=0.1,
+                    rangeType="Day",
+                )
+            ]
+        )
+
+    await db_helper.async_write_consumptions(day("2024-10-15"), TEST_SECTION_ID)
+    first = await db_helper.async_get_gaps(TEST_SECTION_ID)
+    second = await db_helper.async_get_gaps(TEST_SECTION_ID)
+    assert list(second) == list(first)
+    assert second is not first
+    assert (cache.hits - hits, cache.misses - misses) == (1, 1)
+
+    # Une écriture sur l'autre compteur laisse l'entrée en cache
+    await db_helper.async_write_consumptions(
+        day("2024-10-15"), TEST_SECTION_ID_2
+    )
+    await db_helper.async_get_gaps(TEST_SECTION_ID)
+    assert cache.hits - hits == 2
+
+    # Un jour mis en tampon invalide le compteur avant même son écriture
+    await db_helper.async_buffer_consumptions(
+        day("2024-10-17"), TEST_SECTION_ID
+    )
+    gaps = await db_helper.async_get_gaps(TEST_SECTION_ID)
+    assert (to_epoch_day("2024-10-16"), to_epoch_day("2024-10-16")) in gaps
+    assert cache.misses - misses == 2
+
+
+async def test_coverage_index(db_helper: SaurDatabaseHelper) -> None:
+    """Test missing days and complete months from the coverage bitmaps."""
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate(f"2024-09-{day:02d} 00:00:00"),
+                    value=0.1,
+                    rangeType="Day",
+                )
+                for day in range(1, 31)
+                if day not in (10, 11, 30)
+            ]
+        ),
+        TEST_SECTION_ID,
+    )
+    missing = await db_helper.async_get_missing(
+        TEST_SECTION_ID, date(2024, 9, 5), date(2024, 10, 20)
+    )
+    assert list(missing) == [
+        (to_epoch_day("2024-09-10"), to_epoch_day("2024-09-11")),
+        (to_epoch_day("2024-09-30"), to_epoch_day("2024-10-18")),
+    ]
+    assert not await db_helper.async_is_month_complete(TEST_SECTION_ID, 2024, 9)
+
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate(f"2024-09-{day:02d} 00:00:00"),
+                    value=0.1,
+                    rangeType="Day",
+                )
+                for day in (10, 11, 30)
+            ]
+        ),
+        TEST_SECTION_ID,
+    )
+    assert await db_helper.async_is_month_complete(TEST_SECTION_ID, 2024, 9)
+
+    # Un mois blacklisté n'est plus signalé comme manquant
+    await db_helper.async_set_month_flags(
+        TEST_SECTION_ID, 2024, 8, CoverageFlag.BLACKLISTED
+    )
+    missing = await db_helper.async_get_missing(
+        TEST_SECTION_ID, date(2024, 7, 30), date(2024, 9, 30)
+    )
+    assert list(missing) == [
+        (to_epoch_day("2024-07-30"), to_epoch_day("2024-07-31"))
+    ]
+
+    # Un mois estimé reste incomplet jusqu'aux relevés définitifs
+    await db_helper.async_set_month_flags(
+        TEST_SECTION_ID, 2024, 9, CoverageFlag.ESTIMATED
+    )
+    assert not await db_helper.async_is_month_complete(TEST_SECTION_ID, 2024, 9)
+    await db_helper.async_clear_month_flags(
+        TEST_SECTION_ID, 2024, 9, CoverageFlag.ESTIMATED
+    )
+    assert await db_helper.async_is_month_complete(TEST_SECTION_ID, 2024, 9)
+
+
+async def test_blacklist_survives_restart(
+    hass: HomeAssistant, db_helper: SaurDatabaseHelper
+) -> None:
+    """Test that blacklisted months are read back after a restart."""
+    await db_helper.async_set_month_flags(
+        TEST_SECTION_ID, 2024, 8, CoverageFlag.BLACKLISTED
+    )
+    await db_helper.async_set_month_flags(
+        TEST_SECTION_ID, 2024, 9, CoverageFlag.ESTIMATED
+    )
+    await db_helper.async_set_month_flags(
+        TEST_SECTION_ID_2, 2023, 12, CoverageFlag.BLACKLISTED
+    )
+    await db_helper.async_close()
+
+    restarted = SaurDatabaseHelper(hass, TEST_ENTRY_ID)
+    restarted.db_path = db_helper.db_path
+    try:
+        await restarted.async_init_db()
+        assert await restarted.async_get_flagged_months(
+            TEST_SECTION_ID, CoverageFlag.BLACKLISTED
+        ) == [(2024, 8)]
+        assert await restarted.async_get_flagged_months(
+            TEST_SECTION_ID_2, CoverageFlag.BLACKLISTED
+        ) == [(2023, 12)]
+    finally:
+        await restarted.async_close()
+
+
+async def test_change_journal(db_helper: SaurDatabaseHelper) -> None:
+    """Test dirty ranges recorded per write and consumer cursors."""
+    # Sans curseur, tout l'historique est à traiter
+    changes = await db_helper.async_get_changes("recorder")
+    assert changes.ranges == {
+        TEST_SECTION_ID: (None, None),
+        TEST_SECTION_ID_2: (None, None),
+    }
+    await db_helper.async_ack_changes("recorder", changes.seq)
+    assert not (await db_helper.async_get_changes("recorder")).ranges
+
+    new_day = ConsumptionDatas(
+        [
+            ConsumptionData(
+                startDate=StrDate("2024-10-25 00:00:00"),
+                value=0.3,
+                rangeType="Day",
+            )
+        ]
+    )
+    await db_helper.async_write_consumptions(new_day, TEST_SECTION_ID)
+    # Un lot identique ne modifie rien et n'est pas journalisé
+    await db_helper.async_write_consumptions(new_day, TEST_SECTION_ID)
+    await db_helper.async_update_anchor(
+        RelevePhysique(date=StrDate("2024-10-20 00:00:00"), valeur=49.5),
+        TEST_SECTION_ID_2,
+    )
+
+    changes = await db_helper.async_get_changes("recorder")
+    assert changes.ranges == {
+        TEST_SECTION_ID: (to_epoch_day("2024-10-25"), None),
+        TEST_SECTION_ID_2: (None, to_epoch_day("2024-10-21")),
+    }
+
+    # Le journal n'est purgé qu'une fois lu par tous les consommateurs
+    await db_helper.async_ack_changes("cache", changes.seq)
+    rows = await db_helper._async_read_query(
+        "SELECT COUNT(*) FROM change_journal"
+    )
+    assert rows is not None
+    assert rows[0][0] == 2
+    await db_helper.async_ack_changes("recorder", changes.seq)
+    rows = await db_helper._async_read_query(
+        "SELECT COUNT(*) FROM change_journal"
+    )
+    assert rows is not None
+    assert rows[0][0] == 0
+
+    # Les numéros ne sont pas réutilisés après la purge
+    await db_helper.async_update_anchor(
+        RelevePhysique(date=StrDate("2024-10-22 00:00:00"), valeur=115.0),
+        TEST_SECTION_ID,
+    )
+    changes = await db_helper.async_get_changes("recorder")
+    assert changes.seq > 0
+    assert list(changes.ranges) == [TEST_SECTION_ID]
+
+    await db_helper.async_reset_cursor("recorder")
+    changes = await db_helper.async_get_changes("recorder")
+    assert set(changes.ranges) == {TEST_SECTION_ID, TEST_SECTION_ID_2}
+
+
+async def test_change_journal_retention(
+    db_helper: SaurDatabaseHelper, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a consumer which stops acking does not block the purge."""
+    monkeypatch.setattr(saur_journal, "DB_JOURNAL_MAX_ROWS", 2)
+
+    async def journal_rows() -> int:
+        rows = await db_helper._async_read_query(
+            "SELECT COUNT(*) FROM change_journal"
+        )
+        assert rows is not None
+        return rows[0][0]
+
+    async def write_day(day: int) -> None:
+        await db_helper.async_write_consumptions(
+            ConsumptionDatas(
+                [
+                    ConsumptionData(
+                        startDate=StrDate(f"2024-11-{day:02d} 00:00:00"),
+                        value=0.1,
+                        rangeType="Day",
+                    )
+                ]
+            ),
+            TEST_SECTION_ID,
+        )
+
+    # Sans curseur, le journal ne sert à personne
+    await write_day(1)
+    assert await journal_rows() == 0
+
+    stale = await db_helper.async_get_changes("recorder:sensor.old")
+    await db_helper.async_ack_changes("recorder:sensor.old", stale.seq)
+    changes = await db_helper.async_get_changes("recorder:sensor.new")
+    for day in range(2, 6):
+        await write_day(day)
+        await db_helper.async_ack_changes("recorder:sensor.new", changes.seq)
+        changes = await db_helper.async_get_changes("recorder:sensor.new")
+    # Le curseur abandonné est oublié au-delà de la limite
+    await db_helper.async_ack_changes("recorder:sensor.new", changes.seq)
+    assert await journal_rows() == 0
+    rows = await db_helper._async_read_query(
+        "SELECT consumer FROM journal_cursors"
+    )
+    assert rows is not None
+    assert [row[0] for row in rows] == ["recorder:sensor.new"]
+
+    # Un acquittement tardif ne reprend pas au milieu d'un journal purgé
+    await db_helper.async_ack_changes("recorder:sensor.old", stale.seq)
+    changes = await db_helper.async_get_changes("recorder:sensor.old")
+    assert changes.ranges == {
+        TEST_SECTION_ID: (None, None),
+        TEST_SECTION_ID_2: (None, None),
+    }
+
+    # Un consommateur oublié ne retient plus rien
+    await write_day(6)
+    await db_helper.async_reset_cursor("recorder:sensor.new")
+    assert await journal_rows() == 0
+
+
+async def test_write_buffer(hass: HomeAssistant) -> None:
+    """Test coalesced deferred writes and read-your-writes."""
+    async with temp_db(hass, DB_FILE) as db_helper:
+        await db_helper.async_update_anchor(
+            RelevePhysique(date=StrDate("2024-10-19 00:00:00"), valeur=100.0),
+            TEST_SECTION_ID,
+        )
+        week = [
+            ConsumptionData(
+                startDate=StrDate(f"2024-10-{day} 00:00:00"),
+                value=0.1,
+                rangeType="Day",
+            )
+            for day in (20, 21, 22)
+        ]
+        await db_helper.async_buffer_consumptions(
+            ConsumptionDatas(week), TEST_SECTION_ID
+        )
+        week[-1] = ConsumptionData(
+            startDate=StrDate("2024-10-22 00:00:00"),
+            value=0.3,
+            rangeType="Day",
+        )
+        await db_helper.async_buffer_consumptions(
+            ConsumptionDatas(week), TEST_SECTION_ID
+        )
+        assert len(db_helper.write_buffer) == 3
+
+        # Rien n'est encore en base, mais les totaux en tiennent compte
+        assert (
+            await db_helper._async_read_query("SELECT * FROM consumptions")
+            is None
+        )
+        assert await db_helper.async_get_total_consumption(
+            datetime(2024, 10, 22), TEST_SECTION_ID
+        ) == pytest.approx(100.5)
+
+        # Une lecture en base vide d'abord le tampon
+        datas = await db_helper.async_get_all_consumptions_with_absolute(
+            TEST_SECTION_ID
+        )
+        assert not db_helper.write_buffer
+        assert [data.indexValue for data in datas] == pytest.approx(
+            [100.5, 100.2, 100.1]
+        )
+
+        # Une écriture directe emporte les jours en attente du compteur
+        await db_helper.async_buffer_consumptions(
+            ConsumptionDatas(week[:1]), TEST_SECTION_ID
+        )
+        result = await db_helper.async_write_consumptions(
+            ConsumptionDatas(week[1:]), TEST_SECTION_ID
+        )
+        assert result == ConsumptionWriteResult(
+            inserted=0, updated=0, unchanged=3
+        )
+        assert not db_helper.write_buffer
+
+        # Un relevé inchangé n'est pas réécrit
+        await db_helper.async_ack_changes(
+            "test", (await db_helper.async_get_changes("test")).seq
+        )
+        await db_helper.async_update_anchor(
+            RelevePhysique(date=StrDate("2024-10-19 00:00:00"), valeur=100.0),
+            TEST_SECTION_ID,
+        )
+        assert not (await db_helper.async_get_changes("test")).ranges
+
+        # Le tampon est vidé au bout du délai maximal
+        db_helper.write_buffer.max_delay = 0.01
+        await db_helper.async_buffer_consumptions(
+            ConsumptionDatas(week[:1]), TEST_SECTION_ID
+        )
+        assert db_helper.write_buffer
+        await asyncio.sleep(0.1)
+        assert not db_helper.write_buffer
+
+        # La fermeture vide le tampon
+        await db_helper.async_buffer_consumptions(
+            ConsumptionDatas(
+                [
+                    ConsumptionData(
+                        startDate=StrDate("2024-10-23 00:00:00"),
+                        value=0.2,
+                        rangeType="Day",
+                    )
+                ]
+            ),
+            TEST_SECTION_ID,
+        )
+        await db_helper.async_close()
+        with closing(sqlite3.connect(db_helper.db_path)) as conn:
+            assert conn.execute(
+                "SELECT litres FROM consumptions WHERE day = ?",
+                (to_epoch_day("2024-10-23"),),
+            ).fetchone() == (200,)
+
+
+async def test_backup_and_restore(db_helper: SaurDatabaseHelper) -> None:
+    """Test online backups, their rotation and restoring the latest one."""
+    snapshot = await db_helper.async_backup()
+    assert snapshot.exists()
+    assert await db_helper.async_backup_if_due() is None
+
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate("2024-10-23 00:00:00"),
+                    value=9.0,
+                    rangeType="Day",
+                )
+            ]
+        ),
+        TEST_SECTION_ID,
+    )
+    assert await db_helper.async_get_total_consumption(
+        datetime(2024, 10, 23), TEST_SECTION_ID
+    ) == pytest.approx(123.42)
+
+    restored = await db_helper.async_restore()
+    assert restored == snapshot
+    assert await db_helper.async_get_total_consumption(
+        datetime(2024, 10, 23), TEST_SECTION_ID
+    ) == pytest.approx(114.42)
+    datas = await db_helper.async_get_all_consumptions_with_absolute(
+        TEST_SECTION_ID
+    )
+    assert datas[0].date == "2024-10-22 00:00:00"
+
+    # Seules les sauvegardes les plus récentes sont conservées
+    for _ in range(4):
+        await db_helper.async_backup()
+    snapshots = list_backups(db_helper.db_path)
+    assert len(snapshots) == 3
+    assert snapshot not in snapshots
+    for old in snapshots:
+        old.unlink()
+    backup_dir(db_helper.db_path).rmdir()
+
+
+async def test_backup_during_writes(db_helper: SaurDatabaseHelper) -> None:
+    """Test that writes queued during a backup wait for it to finish."""
+    write = db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate("2024-10-23 00:00:00"),
+                    value=9.0,
+                    rangeType="Day",
+                )
+            ]
+        ),
+        TEST_SECTION_ID,
+    )
+    snapshot, _ = await asyncio.gather(db_helper.async_backup(), write)
+
+    # La copie est cohérente et antérieure à l'écriture
+    with closing(sqlite3.connect(snapshot)) as conn:
+        assert conn.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+        assert conn.execute(
+            "SELECT COUNT(*) FROM consumptions WHERE day = ?",
+            (to_epoch_day("2024-10-23"),),
+        ).fetchone() == (0,)
+    assert await db_helper.async_get_total_consumption(
+        datetime(2024, 10, 23), TEST_SECTION_ID
+    ) == pytest.approx(123.42)
+    snapshot.unlink()
+    backup_dir(db_helper.db_path).rmdir()
+
+
+async def test_archive_closed_years(db_helper: SaurDatabaseHelper) -> None:
+    """Test that archived years stay readable and thaw on write."""
+    section_id = SectionId("archive_section")
+    first = date(2022, 3, 10)
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate(
+                        f"{first + timedelta(days=offset)} 00:00:00"
+                    ),
+                    value=(offset % 7) / 10,
+                    rangeType="Day",
+                )
+                for offset in range(330)
+                if offset != 310
+            ]
+        ),
+        section_id,
+    )
+    await db_helper.async_update_anchor(
+        RelevePhysique(date=StrDate("2023-02-01 00:00:00"), valeur=300.0),
+        section_id,
+    )
+
+    async def snapshot() -> tuple[object, ...]:
+        return (
+            await db_helper.async_get_all_consumptions_with_absolute(
+                section_id
+            ),
+            await db_helper.async_get_gaps(section_id),
+            await db_helper.async_get_consumption_summary(
+                section_id, date(2022, 1, 1), date(2023, 12, 31)
+            ),
+            [
+                row
+                async for row in db_helper.async_iter_consumptions(
+                    section_id, start=date(2022, 12, 25)
+                )
+            ],
+        )
+
+    before = await snapshot()
+    report = await db_helper.async_compact(today=date(2024, 6, 1))
+    # 2023 a un trou : seule 2022 est archivée
+    assert (report.archived_years, report.archived_days) == (1, 297)
+    assert report.size_after <= report.size_before
+    assert await db_helper.async_maintenance_if_due() is None
+    rows = await db_helper._async_read_query(
+        "SELECT COUNT(*) FROM consumptions WHERE section_id = ?",
+        (section_id,),
+    )
+    assert rows is not None
+    assert rows[0][0] == 329 - 297
+    # L'index des jours archivés n'est plus stocké
+    rows = await db_helper._async_read_query(
+        "SELECT COUNT(*) FROM absolute_index WHERE section_id = ?",
+        (section_id,),
+    )
+    assert rows is not None
+    assert rows[0][0] == 329 - 297
+
+    assert await snapshot() == before
+    await db_helper.async_init_db()
+    assert db_helper.get_range_consumption(
+        section_id, date(2022, 1, 1), date(2022, 12, 31)
+    ) == pytest.approx(sum((offset % 7) / 10 for offset in range(297)))
+
+    # Une correction réintègre l'année archivée
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate("2022-06-01 00:00:00"),
+                    value=5.0,
+                    rangeType="Day",
+                )
+            ]
+        ),
+        section_id,
+    )
+    rows = await db_helper._async_read_query(
+        "SELECT COUNT(*) FROM consumption_archive"
+    )
+    assert rows is not None
+    assert rows[0][0] == 0
+    rows = await db_helper._async_read_query(
+        "SELECT litres FROM consumptions WHERE section_id = ? AND day = ?",
+        (section_id, to_epoch_day("2022-06-01")),
+    )
+    assert rows is not None
+    assert rows[0][0] == 5000
+    rows = await db_helper._async_read_query(
+        "SELECT COUNT(*) FROM absolute_index WHERE section_id = ?",
+        (section_id,),
+    )
+    assert rows is not None
+    assert rows[0][0] == 329
+
+    # Une archive corrompue est détectée par sa somme de contrôle
+    await db_helper.async_compact(today=date(2024, 6, 1))
+    await db_helper._async_execute_query(
+        "UPDATE consumption_archive SET total = total + 1"
+    )
+    with pytest.raises(SaurDatabaseError):
+        await db_helper.async_get_gaps(section_id)
+
+
+async def test_backfill_before_archived_days(
+    db_helper: SaurDatabaseHelper,
+) -> None:
+    """Test that a backfill before the archived days of a year thaws it."""
+    section_id = SectionId("archive_section")
+
+    async def write_days(first: date, count: int) -> None:
+        await db_helper.async_write_consumptions(
+            ConsumptionDatas(
+                [
+                    ConsumptionData(
+                        startDate=StrDate(
+                            f"{first + timedelta(days=offset)} 00:00:00"
+                        ),
+                        value=0.1,
+                        rangeType="Day",
+                    )
+                    for offset in range(count)
+                ]
+            ),
+            section_id,
+        )
+
+    await write_days(date(2020, 3, 1), 306)
+    report = await db_helper.async_compact(today=date(2022, 1, 1))
+    assert report.archived_years == 1
+
+    # Jours antérieurs à l'archive, puis une nouvelle maintenance
+    await write_days(date(2020, 2, 1), 10)
+    rows = await db_helper._async_read_query(
+        "SELECT COUNT(*) FROM consumption_archive"
+    )
+    assert rows is not None
+    assert rows[0][0] == 0
+    report = await db_helper.async_compact(today=date(2022, 1, 1))
+    # Le trou de février laisse l'année hors archive
+    assert report.archived_years == 0
+
+    await write_days(date(2020, 2, 11), 19)
+    report = await db_helper.async_compact(today=date(2022, 1, 1))
+    assert (report.archived_years, report.archived_days) == (1, 335)
+
+    # Lignes laissées à côté d'une archive : elles y sont fusionnées
+    await db_helper._async_execute_query(
+        "INSERT INTO consumptions (section_id, day, litres) VALUES (?, ?, ?)",
+        (section_id, to_epoch_day("2020-01-31"), 100),
+    )
+    report = await db_helper.async_compact(today=date(2022, 1, 1))
+    assert (report.archived_years, report.archived_days) == (1, 336)
+    await db_helper.async_init_db()
+    assert db_helper.get_range_consumption(
+        section_id, date(2020, 1, 1), date(2020, 12, 31)
+    ) == pytest.approx(33.6)
+
+
+async def test_archived_days_stay_out_of_index(
+    db_helper: SaurDatabaseHelper,
+) -> None:
+    """Test that a write before the first anchor keeps archives unindexed."""
+    section_id = SectionId("archive_section")
+    first = date(2018, 1, 1)
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate(
+                        f"{first + timedelta(days=offset)} 00:00:00"
+                    ),
+                    value=0.2,
+                    rangeType="Day",
+                )
+                for offset in range(2191)
+            ]
+        ),
+        section_id,
+    )
+    await db_helper.async_update_anchor(
+        RelevePhysique(date=StrDate("2025-06-01 00:00:00"), valeur=1234.5),
+        section_id,
+    )
+    await db_helper.async_compact(today=date(2025, 6, 1))
+    before = await db_helper.async_get_all_consumptions_with_absolute(
+        section_id
+    )
+
+    # Rattrapage de jours plus récents, avant la première ancre
+    await db_helper.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate(f"2024-03-0{day} 00:00:00"),
+                    value=0.3,
+                    rangeType="Day",
+                )
+                for day in (1, 2, 3)
+            ]
+        ),
+        section_id,
+    )
+    rows = await db_helper._async_read_query(
+        """
+        SELECT COUNT(*) FROM absolute_index i
+        JOIN consumption_archive a ON a.section_id = i.section_id
+            AND i.day BETWEEN a.first_day AND a.first_day + a.days - 1
+        """
+    )
+    assert rows is not None
+    assert rows[0][0] == 0
+    after = await db_helper.async_get_all_consumptions_with_absolute(
+        section_id
+    )
+    # Les index archivés reculent des 0,9 m³ ajoutés avant l'ancre
+    assert [data.date for data in after] == sorted(
+        [data.date for data in before]
+        + [f"2024-03-0{day} 00:00:00" for day in (1, 2, 3)],
+        reverse=True,
+    )
+    assert after[-1].indexValue == pytest.approx(before[-1].indexValue - 0.9)
+
+
+async def test_maintenance_date_survives_restart(
+    hass: HomeAssistant, db_helper: SaurDatabaseHelper
+) -> None:
+    """Test that a reopened database does not run maintenance again."""
+    assert await db_helper.async_maintenance_if_due() is not None
+    await db_helper.async_close()
+
+    restarted = SaurDatabaseHelper(hass, TEST_ENTRY_ID)
+    restarted.db_path = db_helper.db_path
+    try:
+        await restarted.async_init_db()
+        assert await restarted.async_maintenance_if_due() is None
+        assert (
+            await restarted.async_maintenance_if_due(timedelta(0))
+            is not None
+        )
+    finally:
+        await restarted.async_close()
+
+
+async def test_storage_profiles(
+    hass: HomeAssistant, db_helper: SaurDatabaseHelper
+) -> None:
+    """Test that storage profiles set the journal mode and cache size."""
+
+    def pragmas(conn: sqlite3.Connection) -> tuple[str, int, int]:
+        return (
+            conn.execute("PRAGMA journal_mode").fetchone()[0],
+            conn.execute("PRAGMA synchronous").fetchone()[0],
+            conn.execute("PRAGMA cache_size").fetchone()[0],
+        )
+
+    assert await db_helper._async_write_transaction(pragmas) == (
+        "wal",
+        1,
+        -8192,
+    )
+
+    durable = SaurDatabaseHelper(hass, TEST_ENTRY_ID, profile="durable")
+    durable.db_path = db_helper.db_path
+    await db_helper.async_close()
+    try:
+        await durable.async_init_db()
+        assert await durable._async_write_transaction(pragmas) == (
+            "delete",
+            2,
+            -2048,
+        )
+        assert await durable.async_get_total_consumption(
+            datetime(2024, 10, 22), TEST_SECTION_ID
+        ) == pytest.approx(114.42)
+    finally:
+        await durable.async_close()
+
+    with pytest.raises(ValueError, match="Profil de stockage inconnu"):
+        SaurDatabaseHelper(hass, TEST_ENTRY_ID, profile="unknown")
+
+
+async def test_integrity_check_repairs_coverage(
+    db_helper: SaurDatabaseHelper,
+) -> None:
+    """Test that the coverage index is aligned on the stored days."""
+    report = await db_helper.async_check_integrity()
+    assert report.healthy
+    assert db_helper.take_rebuild_months(TEST_SECTION_ID) == []
+
+    # Un jour perdu, un jour présent mais absent de l'index
+    await db_helper._async_execute_query(
+        "DELETE FROM consumptions WHERE section_id = ? AND day = ?",
+        (TEST_SECTION_ID, to_epoch_day("2024-10-20")),
+    )
+    await db_helper._async_execute_query(
+        "INSERT INTO consumptions (section_id, day, litres) VALUES (?, ?, ?)",
+        (TEST_SECTION_ID_2, to_epoch_day("2024-09-30"), 100),
+    )
+    report = await db_helper.async_check_integrity()
+    assert not report.healthy
+    assert report.errors == ()
+    assert report.rebuild == {TEST_SECTION_ID: [(2024, 10)]}
+    assert db_helper.take_rebuild_months(TEST_SECTION_ID) == [(2024, 10)]
+    assert db_helper.take_rebuild_months(TEST_SECTION_ID) == []
+    missing = await db_helper.async_get_missing(
+        TEST_SECTION_ID, date(2024, 10, 19), date(2024, 10, 22)
+    )
+    assert list(missing) == [
+        (to_epoch_day("2024-10-20"), to_epoch_day("2024-10-20"))
+    ]
+    missing = await db_helper.async_get_missing(
+        TEST_SECTION_ID_2, date(2024, 9, 30), date(2024, 9, 30)
+    )
+    assert list(missing) == []
+    assert (await db_helper.async_check_integrity()).healthy
+
+
+async def test_integrity_check_salvages_damaged_database(
+    hass: HomeAssistant,
+) -> None:
+    """Test that a damaged database is quarantined and salvaged."""
+    db_file = "test_integrity_saur.db"
+    first = date(2023, 1, 1)
+    async with temp_db(hass, db_file) as db_helper:
+        await db_helper.async_write_consumptions(
+            ConsumptionDatas(
+                [
+                    ConsumptionData(
+                        startDate=StrDate(
+                            f"{first + timedelta(days=offset)} 00:00:00"
+                        ),
+                        value=0.25,
+                        rangeType="Day",
+                    )
+                    for offset in range(731)
+                ]
+            ),
+            TEST_SECTION_ID,
+        )
+        await db_helper.async_update_anchor(
+            RelevePhysique(date=StrDate("2024-12-31 00:00:00"), valeur=500.0),
+            TEST_SECTION_ID,
+        )
+        await db_helper.async_close()
+
+        def corrupt() -> None:
+            """Écrase une page de feuilles au milieu de consumptions."""
+            with closing(sqlite3.connect(db_file)) as conn:
+                try:
+                    pages = [
+                        row[0]
+                        for row in conn.execute(
+                            """
+                            SELECT pageno FROM dbstat
+                            WHERE name = 'consumptions' AND pagetype = 'leaf'
+                            ORDER BY pageno
+                            """
+                        )
+                    ]
+                except sqlite3.OperationalError:
+                    pytest.skip("SQLite compilé sans dbstat")
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            with open(db_file, "r+b") as damaged:
+                damaged.seek((pages[len(pages) // 2] - 1) * page_size)
+                damaged.write(b"\xff" * page_size)
+
+        corrupt()
+
+        report = await db_helper.async_check_integrity()
+        try:
+            assert report.errors
+            assert report.quarantined is not None
+            assert os.path.exists(report.quarantined)
+            assert report.damaged_tables == ("consumptions",)
+            months = db_helper.take_rebuild_months(TEST_SECTION_ID)
+            assert months == report.rebuild[TEST_SECTION_ID]
+            assert 0 < len(months) < 24
+
+            missing = await db_helper.async_get_missing(
+                TEST_SECTION_ID, first, date(2024, 12, 31)
+            )
+            lost = sum(last - start + 1 for start, last in missing)
+            assert 0 < lost < 365
+            rows = await db_helper._async_read_query(
+                "SELECT COUNT(*) FROM consumptions"
+            )
+            assert rows is not None
+            assert rows[0][0] == 731 - lost
+            # L'ancre et l'index absolu ont survécu
+            assert await db_helper.async_get_total_consumption(
+                datetime(2024, 12, 31), TEST_SECTION_ID
+            ) == pytest.approx(500.0)
+            assert (await db_helper.async_check_integrity()).healthy
+        finally:
+            if report.quarantined is not None:
+                os.remove(report.quarantined)
@@ -0,0 +1,113 @@
+"""Tests for the EyeOnSaur shared database manager."""
+
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.eyeonsaur.helpers.const import DB_SHARED_FILE
+from custom_components.eyeonsaur.helpers.saur_db import (
+    SaurDatabaseError,
+    SaurDatabaseHelper,
+    legacy_db_file,
+)
+from custom_components.eyeonsaur.helpers.saur_manager import (
+    SaurDatabaseManager,
+)
+from custom_components.eyeonsaur.models import (
+    ConsumptionData,
+    ConsumptionDatas,
+    RelevePhysique,
+    SectionId,
+    StrDate,
+)
+
+pytestmark = pytest.mark.asyncio
+
+SECTION: SectionId = SectionId("legacy_section")
+
+
+async def test_entries_share_one_database(hass: HomeAssistant) -> None:
+    """Test that a legacy per-entry file is merged into the shared one."""
+    legacy = SaurDatabaseHelper(hass, "old_entry")
+    await legacy.async_init_db()
+    await legacy.async_write_consumptions(
+        ConsumptionDatas(
+            [
+                ConsumptionData(
+                    startDate=StrDate(f"2024-10-{day} 00:00:00"),
+                    value=0.5,
+                    rangeType="Day",
+                )
+                for day in (20, 21, 22)
+            ]
+        ),
+        SECTION,
+    )
+    await legacy.async_update_anchor(
+        RelevePhysique(date=StrDate("2024-10-20 00:00:00"), valeur=10.0),
+        SECTION,
+    )
+    await legacy.async_close()
+
+    manager = SaurDatabaseManager(hass)
+    try:
+        helper = await manager.async_acquire("old_entry")
+        assert helper.db_path == hass.config.path(DB_SHARED_FILE)
+        assert await manager.async_acquire("new_entry") is helper
+        assert manager.entries == {"old_entry", "new_entry"}
+
+        legacy_path = hass.config.path(legacy_db_file("old_entry"))
+        assert not os.path.exists(legacy_path)
+        assert os.path.exists(f"{legacy_path}.migrated")
+
+        assert await helper.async_get_total_consumption(
+            datetime(2024, 10, 22), SECTION
+        ) == pytest.approx(11.0)
+        datas = await helper.async_get_all_consumptions_with_absolute(SECTION)
+        assert [data.indexValue for data in datas] == pytest.approx(
+            [11.0, 10.5, 10.0]
+        )
+        assert not await helper.async_get_missing(
+            SECTION, datetime(2024, 10, 20), datetime(2024, 10, 22)
+        )
+        changes = await helper.async_get_changes("test")
+        assert changes.ranges == {SECTION: (None, None)}
+
+        await manager.async_release("old_entry")
+        assert await helper.async_get_gaps(SECTION) is not None
+    finally:
+        await manager.async_release("old_entry")
+        await manager.async_release("new_entry")
+    assert not manager.entries
+
+    # La base a été fermée : une nouvelle demande la rouvre
+    reopened = await manager.async_acquire("new_entry")
+    assert reopened is not helper
+    assert await reopened.async_get_total_consumption(
+        datetime(2024, 10, 22), SECTION
+    ) == pytest.approx(11.0)
+    await manager.async_release("new_entry")
+
+
+async def test_failed_check_is_retried(hass: HomeAssistant) -> None:
+    """Test that a failed integrity check is run again on the next acquire."""
+    manager = SaurDatabaseManager(hass)
+    with (
+        patch.object(
+            SaurDatabaseHelper,
+            "async_check_integrity",
+            side_effect=SaurDatabaseError("Base illisible"),
+        ),
+        pytest.raises(SaurDatabaseError),
+    ):
+        await manager.async_acquire("entry")
+    assert not manager.entries
+
+    helper = await manager.async_acquire("entry")
+    try:
+        assert await helper.async_get_gaps(SECTION) is not None
+    finally:
+        await manager.async_release("entry")
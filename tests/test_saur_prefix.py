@@ -0,0 +1,78 @@
+"""Tests for the EyeOnSaur in-memory prefix sums."""
+
+import random
+
+import pytest
+
+from custom_components.eyeonsaur.helpers.saur_prefix import (
+    FenwickTree,
+    SaurPrefixIndex,
+)
+from custom_components.eyeonsaur.models import SectionId
+
+SECTION: SectionId = SectionId("section")
+
+
+def test_fenwick_tree_matches_naive_sums() -> None:
+    """Test point updates and range sums against plain sums."""
+    rng = random.Random(42)
+    values = [rng.randint(0, 1000) for _ in range(200)]
+    tree = FenwickTree(values)
+    for _ in range(100):
+        position = rng.randrange(len(values))
+        delta = rng.randint(-500, 500)
+        values[position] += delta
+        tree.add(position, delta)
+        start = rng.randrange(len(values))
+        end = rng.randrange(start, len(values) + 1)
+        assert tree.range_sum(start, end) == sum(values[start:end])
+    assert tree.prefix_sum(len(values) + 10) == sum(values)
+    assert tree.range_sum(5, 5) == 0
+
+
+def test_prefix_index_grows_both_ways() -> None:
+    """Test writes before, inside and after the known history."""
+    prefix_index = SaurPrefixIndex()
+    prefix_index.load(SECTION, [(100, 10), (102, 30)])
+    prefix_index.update(SECTION, [(101, 20), (98, 5), (130, 7), (102, 40)])
+
+    assert prefix_index.range_sum(SECTION, 0, 1000) == 82
+    assert prefix_index.range_sum(SECTION, 99, 101) == 30
+    assert prefix_index.range_sum(SECTION, 103, 129) == 0
+    assert prefix_index.range_sum(SectionId("other"), 0, 1000) == 0
+
+
+def test_prefix_index_anchor_values() -> None:
+    """Test totals and index values around the latest anchor."""
+    prefix_index = SaurPrefixIndex()
+    prefix_index.load(SECTION, [(10, 1), (11, 2), (12, 3), (13, 4)])
+    assert prefix_index.total_at(SECTION, 13) == 0
+    assert prefix_index.index_at(SECTION, 13) is None
+
+    prefix_index.set_anchor(SECTION, 11, 100)
+    # Relevé plus ancien : l'écart de 47 litres est réparti sur 6 jours
+    prefix_index.set_anchor(SECTION, 5, 50)
+
+    assert prefix_index.total_at(SECTION, 13) == 107
+    assert prefix_index.total_at(SECTION, 10) == 100
+    assert [prefix_index.index_at(SECTION, day) for day in range(10, 14)] == [
+        90,
+        100,
+        103,
+        107,
+    ]
+
+
+def test_prefix_index_batched_totals() -> None:
+    """Test that batched totals match one lookup per day."""
+    prefix_index = SaurPrefixIndex()
+    prefix_index.load(SECTION, [(day, day % 7) for day in range(100, 200)])
+    prefix_index.set_anchor(SECTION, 120, 5000)
+    days = [90, 120, 121, 150, 150, 199, 250]
+
+    assert prefix_index.totals_at(SECTION, days) == [
+        prefix_index.total_at(SECTION, day) for day in days
+    ]
+    assert prefix_index.totals_at(SectionId("other"), days) == [0] * 7
+    with pytest.raises(ValueError, match="triés"):
+        prefix_index.totals_at(SECTION, [150, 120])
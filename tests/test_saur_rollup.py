@@ -0,0 +1,66 @@
+"""Tests for the EyeOnSaur rollup planning."""
+
+from datetime import date
+from itertools import pairwise
+
+from custom_components.eyeonsaur.helpers.dateutils import (
+    from_epoch_day,
+    to_epoch_day,
+)
+from custom_components.eyeonsaur.helpers.saur_rollup import (
+    RollupPeriod,
+    period_bounds,
+    plan_rollup_ranges,
+)
+
+
+def test_period_bounds() -> None:
+    """Test week, month and year boundaries."""
+    day = to_epoch_day(date(2024, 2, 29))
+    week = period_bounds(RollupPeriod.WEEK, day)
+    month = period_bounds(RollupPeriod.MONTH, day)
+    year = period_bounds(RollupPeriod.YEAR, day)
+
+    assert [from_epoch_day(d) for d in week] == [
+        date(2024, 2, 26),
+        date(2024, 3, 3),
+    ]
+    assert [from_epoch_day(d) for d in month] == [
+        date(2024, 2, 1),
+        date(2024, 2, 29),
+    ]
+    assert [from_epoch_day(d) for d in year] == [
+        date(2024, 1, 1),
+        date(2024, 12, 31),
+    ]
+    december = period_bounds(
+        RollupPeriod.MONTH, to_epoch_day(date(2023, 12, 5))
+    )
+    assert from_epoch_day(december[1]) == date(2023, 12, 31)
+
+
+def test_plan_uses_coarsest_periods() -> None:
+    """Test that a range is covered exactly by the coarsest pieces."""
+    first_day = to_epoch_day(date(2021, 11, 27))
+    last_day = to_epoch_day(date(2024, 3, 12))
+    pieces = plan_rollup_ranges(first_day, last_day)
+
+    # Couverture exacte et contiguë
+    assert pieces[0][1] == first_day
+    assert pieces[-1][2] == last_day
+    for previous, following in pairwise(pieces):
+        assert following[1] == previous[2] + 1
+
+    periods = [period for period, _, _ in pieces]
+    assert periods.count(RollupPeriod.YEAR) == 2
+    assert periods.count(RollupPeriod.MONTH) == 3  # déc. 2021, janv., fév.
+    assert len(pieces) < 15
+
+
+def test_plan_short_range_is_daily() -> None:
+    """Test that a range shorter than a week is a single day run."""
+    first_day = to_epoch_day(date(2024, 3, 13))
+    assert plan_rollup_ranges(first_day, first_day + 3) == [
+        (None, first_day, first_day + 3)
+    ]
+    assert plan_rollup_ranges(first_day, first_day - 1) == []
@@ -0,0 +1,51 @@
+"""Tests for the EyeOnSaur database worker thread."""
+
+import threading
+
+import pytest
+
+from custom_components.eyeonsaur.helpers.saur_worker import SaurDatabaseWorker
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_jobs_run_in_order_on_dedicated_thread() -> None:
+    """Test that jobs run sequentially on the worker thread."""
+    worker = SaurDatabaseWorker("test_eyeonsaur_db")
+    seen: list[tuple[int, str]] = []
+
+    def job(i: int) -> int:
+        seen.append((i, threading.current_thread().name))
+        return i * 2
+
+    try:
+        results = [
+            await worker.async_submit(lambda i=i: job(i)) for i in range(5)
+        ]
+    finally:
+        await worker.async_stop()
+
+    assert results == [0, 2, 4, 6, 8]
+    assert [i for i, _ in seen] == [0, 1, 2, 3, 4]
+    assert {name for _, name in seen} == {"test_eyeonsaur_db"}
+    assert worker.stats.jobs == 5
+    assert worker.queue_depth == 0
+    assert worker.stats.max_latency >= worker.stats.average_latency > 0
+
+
+async def test_job_exception_is_propagated() -> None:
+    """Test that an exception raised by a job reaches the caller."""
+    worker = SaurDatabaseWorker("test_eyeonsaur_db")
+
+    def failing_job() -> None:
+        raise ValueError("boom")
+
+    try:
+        with pytest.raises(ValueError, match="boom"):
+            await worker.async_submit(failing_job)
+        # Le thread reste utilisable après une erreur
+        assert await worker.async_submit(lambda: 42) == 42
+    finally:
+        await worker.async_stop()
+
+    assert not worker.is_running
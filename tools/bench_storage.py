@@ -0,0 +1,143 @@
+"""Banc d'essai des profils de stockage SQLite de la base Saur.
+
+Pour chaque profil de helpers/saur_storage.py, une base neuve est
+remplie comme le fait l'intégration : une transaction par semaine de
+consommations et par compteur, qui met aussi à jour l'index absolu, les
+agrégats, la couverture et le journal. Des lectures d'historique et de
+totaux sont ensuite mesurées sur la même connexion.
+
+Usage, depuis la racine du dépôt (Home Assistant installé) :
+
+    python tools/bench_storage.py [--dir /chemin/vers/la/carte/sd]
+
+Lancer le banc sur le support de la base (carte SD, SSD...) : c'est la
+latence de synchronisation qui départage les profils.
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from custom_components.eyeonsaur.helpers.saur_db import (
+    SaurConnectionManager,
+    _sync_write_consumptions,
+)
+from custom_components.eyeonsaur.helpers.saur_rollup import (
+    sync_summarize,
+)
+from custom_components.eyeonsaur.helpers.saur_schema import (
+    sync_migrate,
+)
+from custom_components.eyeonsaur.helpers.saur_storage import (
+    STORAGE_PROFILES,
+)
+from custom_components.eyeonsaur.models import SectionId
+
+_FIRST_DAY = 18262  # 2020-01-01
+
+
+def bench_writes(
+    conn: sqlite3.Connection, meters: int, weeks: int
+) -> tuple[float, int]:
+    """Écrit weeks semaines par compteur, une transaction par semaine.
+
+    Returns:
+        La durée (s) et le nombre de transactions.
+
+    """
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for week in range(weeks):
+        for meter in range(meters):
+            rows = {
+                _FIRST_DAY + week * 7 + day: rng.randrange(50, 900)
+                for day in range(7)
+            }
+            with conn:
+                _sync_write_consumptions(conn, SectionId(f"m{meter}"), rows)
+    return time.perf_counter() - start, weeks * meters
+
+
+def bench_reads(
+    conn: sqlite3.Connection, meters: int, days: int, queries: int
+) -> float:
+    """Lit des historiques de 30 jours et des totaux sur un an.
+
+    Returns:
+        La durée (s) des lectures.
+
+    """
+    rng = random.Random(2)
+    start = time.perf_counter()
+    for _ in range(queries):
+        section_id = SectionId(f"m{rng.randrange(meters)}")
+        first_day = _FIRST_DAY + rng.randrange(max(days - 365, 1))
+        conn.execute(
+            """
+            SELECT day, litres FROM daily_consumptions
+            WHERE section_id = ? AND day BETWEEN ? AND ?
+            """,
+            (section_id, first_day, first_day + 29),
+        ).fetchall()
+        sync_summarize(conn, section_id, first_day, first_day + 364)
+    return time.perf_counter() - start
+
+
+def run_profile(name: str, directory: Path, args: argparse.Namespace) -> None:
+    """Mesure un profil sur une base neuve et affiche le résultat."""
+    profile = STORAGE_PROFILES[name]
+    meters, weeks, queries = args.meters, args.weeks, args.queries
+    db_path = directory / f"bench_{name}.db"
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+    with closing(SaurConnectionManager.connect(str(db_path), profile)) as conn:
+        with conn:
+            sync_migrate(conn)
+        write_time, transactions = bench_writes(conn, meters, weeks)
+        read_time = bench_reads(conn, meters, weeks * 7, queries)
+
+    size = sum(
+        path.stat().st_size for path in directory.glob(f"{db_path.name}*")
+    )
+    print(
+        f"{name:<10} {transactions / write_time:>10.0f} "
+        f"{queries / read_time:>10.0f} {size / 1024:>10.0f}"
+    )
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+
+def main() -> None:
+    """Point d'entrée du banc d'essai."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dir", type=Path, help="Répertoire des bases (temporaire par défaut)"
+    )
+    parser.add_argument("--meters", type=int, default=2)
+    parser.add_argument("--weeks", type=int, default=156)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=sorted(STORAGE_PROFILES),
+        help="Profil à mesurer (tous par défaut)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'profil':<10} {'écritures/s':>10} {'lectures/s':>10} {'Kio':>10}")
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for name in args.profile or STORAGE_PROFILES:
+            run_profile(name, Path(directory), args)
+
+
+if __name__ == "__main__":
+    main()